@@ -0,0 +1,138 @@
+"""冷启动基准：测量导入耗时与 stdio 服务响应 initialize 的时间，超过阈值时以非零状态退出
+
+每轮都启动新的解释器进程，模拟 uvx 为每个会话拉起的 grok-search。
+同时检查启动时不应加载的重依赖（httpx、tenacity、sqlite3 等）是否被提前导入。
+
+用法：
+    python benchmarks/bench_importtime.py [--rounds 5] [--max-import-ms 0] [--max-initialize-ms 0] [--json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+# 应在首次调用工具时才导入的模块
+DEFERRED_MODULES = (
+    "httpx",
+    "tenacity",
+    "sqlite3",
+    "html.parser",
+    "grok_search.providers.grok",
+    "grok_search.local_fetch",
+    "grok_search.fetch_cache",
+)
+
+INITIALIZE = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2025-06-18",
+        "capabilities": {},
+        "clientInfo": {"name": "bench-importtime", "version": "0"},
+    },
+}
+
+
+def _env(home: str) -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC_DIR), env.get("PYTHONPATH", "")]))
+    env.setdefault("GROK_API_URL", "http://127.0.0.1:9")
+    env.setdefault("GROK_API_KEY", "bench")
+    # 独立的 HOME，避免读取或写入用户的配置与日志
+    env["HOME"] = home
+    env["GROK_CONFIG_POLL_INTERVAL"] = "0"
+    return env
+
+
+def measure_import(env: dict) -> dict:
+    """-X importtime 输出中 grok_search.server 的累计导入耗时，以及被提前导入的重依赖"""
+    code = (
+        "import sys, json, grok_search.server; "
+        f"print(json.dumps([m for m in {DEFERRED_MODULES!r} if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    cumulative_us = 0
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == "grok_search.server":
+            cumulative_us = int(parts[1])
+    return {"import_ms": cumulative_us / 1000, "eager": json.loads(result.stdout.strip().splitlines()[-1])}
+
+
+def measure_initialize(env: dict) -> float:
+    """启动 stdio 服务并发送 initialize，返回收到响应的耗时（毫秒）"""
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-c", "from grok_search.server import main; main()"],
+        env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+    )
+    try:
+        proc.stdin.write(json.dumps(INITIALIZE) + "\n")
+        proc.stdin.flush()
+        while True:
+            line = proc.stdout.readline()
+            if not line:
+                raise RuntimeError("服务在响应 initialize 前退出")
+            try:
+                message = json.loads(line)
+            except ValueError:
+                continue
+            if message.get("id") == 1:
+                return (time.perf_counter() - start) * 1000
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start benchmark")
+    parser.add_argument("--rounds", type=int, default=5, help="测量轮数（取中位数）")
+    parser.add_argument("--max-import-ms", type=float, default=0, help="导入耗时中位数上限，0 表示不检查")
+    parser.add_argument("--max-initialize-ms", type=float, default=0, help="initialize 响应耗时中位数上限，0 表示不检查")
+    parser.add_argument("--json", action="store_true", help="输出机器可读 JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        env = _env(home)
+        imports = [measure_import(env) for _ in range(args.rounds)]
+        initialize = [measure_initialize(env) for _ in range(args.rounds)]
+
+    report = {
+        "rounds": args.rounds,
+        "import_ms": round(statistics.median(r["import_ms"] for r in imports), 1),
+        "initialize_ms": round(statistics.median(initialize), 1),
+        "eager_imports": sorted({m for r in imports for m in r["eager"]}),
+    }
+    failures = []
+    if report["eager_imports"]:
+        failures.append(f"启动时提前导入了: {', '.join(report['eager_imports'])}")
+    if args.max_import_ms and report["import_ms"] > args.max_import_ms:
+        failures.append(f"导入耗时 {report['import_ms']}ms 超过上限 {args.max_import_ms}ms")
+    if args.max_initialize_ms and report["initialize_ms"] > args.max_initialize_ms:
+        failures.append(f"initialize 耗时 {report['initialize_ms']}ms 超过上限 {args.max_initialize_ms}ms")
+    report["failures"] = failures
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print(f"import grok_search.server: {report['import_ms']} ms (median of {args.rounds})")
+        print(f"initialize response:       {report['initialize_ms']} ms (median of {args.rounds})")
+        print(f"eager heavy imports:       {', '.join(report['eager_imports']) or 'none'}")
+        for failure in failures:
+            print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""提示词档位基准：对比 full / compact / minimal 的输入规模、首 token 延迟与输出有效性
+
+默认在进程内启动 mock_upstream（按请求体大小模拟 prefill 耗时）；
+传入 --api-url / --api-key 时改为请求真实上游。
+
+用法：
+    python benchmarks/bench_prompt_profiles.py [--rounds 3] [--prefill-ms-per-kb 20] [--json]
+    python benchmarks/bench_prompt_profiles.py --api-url https://api.x.ai/v1 --api-key xai-... --model grok-4-fast
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import httpx  # noqa: E402
+
+from grok_search.prompts import PROMPT_PROFILES, estimate_tokens  # noqa: E402
+from grok_search.providers.grok import GrokSearchProvider  # noqa: E402
+from grok_search.providers.results import SearchResultParseError, parse_search_results  # noqa: E402
+from grok_search.providers.sse import ChatStreamDecoder  # noqa: E402
+from mock_upstream import MockUpstreamHandler  # noqa: E402
+
+QUERY = "python asyncio structured concurrency best practices"
+FETCH_URL = "https://docs.python.org/3/library/asyncio-task.html"
+MIN_RESULTS = 3
+MAX_RESULTS = 10
+
+
+def start_mock(prefill_ms_per_kb: float) -> str:
+    MockUpstreamHandler.configure(argparse.Namespace(
+        results=MAX_RESULTS, chunk=16, token_delay=0.0, tavily_delay=0.0, prefill_ms_per_kb=prefill_ms_per_kb,
+    ))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockUpstreamHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+async def stream_once(client: httpx.AsyncClient, api_url: str, api_key: str, payload: dict) -> dict:
+    """发送一次流式请求，记录首个增量的到达时间与总耗时"""
+    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+    start = time.perf_counter()
+    ttfb = None
+    async with client.stream("POST", f"{api_url}/chat/completions", headers=headers, json=payload) as response:
+        response.raise_for_status()
+        decoder = ChatStreamDecoder(response.headers.get("content-type", ""))
+        async for line in response.aiter_lines():
+            if decoder.feed(line) is not None and ttfb is None:
+                ttfb = time.perf_counter() - start
+    return {"ttfb": ttfb or 0.0, "total": time.perf_counter() - start, "content": decoder.finish()}
+
+
+def describe_payload(payload: dict, budget: int) -> dict:
+    system = payload["messages"][0]["content"]
+    tokens = estimate_tokens(system)
+    return {
+        "system_chars": len(system),
+        "request_bytes": len(json.dumps(payload, ensure_ascii=False).encode("utf-8")),
+        "system_tokens": tokens,
+        "within_budget": tokens <= budget,
+    }
+
+
+async def run(args) -> list:
+    provider = GrokSearchProvider(args.api_url, args.api_key, args.model)
+    report = []
+    async with httpx.AsyncClient(timeout=httpx.Timeout(120.0, connect=6.0)) as client:
+        for profile in PROMPT_PROFILES.values():
+            for kind in ("search", "fetch"):
+                if kind == "search":
+                    payload = provider.build_search_payload(QUERY, "", MIN_RESULTS, MAX_RESULTS, profile)
+                else:
+                    payload = provider.build_fetch_payload(FETCH_URL, profile)
+                # 同一档位的系统提示词与查询无关，多次请求共享相同前缀
+                if kind == "search":
+                    again = provider.build_search_payload("another query", "x.com", 1, 5, profile)
+                else:
+                    again = provider.build_fetch_payload("https://example.com/", profile)
+                row = {"profile": profile.name, "kind": kind, **describe_payload(payload, profile.token_budget)}
+                row["stable_prefix"] = again["messages"][0] == payload["messages"][0]
+
+                ttfbs, totals, valid = [], [], 0
+                for _ in range(args.rounds):
+                    result = await stream_once(client, args.api_url, args.api_key, payload)
+                    ttfbs.append(result["ttfb"])
+                    totals.append(result["total"])
+                    if kind == "search":
+                        try:
+                            valid += len(parse_search_results(result["content"], MAX_RESULTS)) >= MIN_RESULTS
+                        except SearchResultParseError:
+                            pass
+                    else:
+                        valid += bool(result["content"].strip())
+                row["ttfb_ms"] = round(statistics.median(ttfbs) * 1000, 1)
+                row["total_ms"] = round(statistics.median(totals) * 1000, 1)
+                row["valid"] = f"{valid}/{args.rounds}"
+                report.append(row)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompt profile benchmark")
+    parser.add_argument("--api-url", default="", help="上游地址（默认启动本地 mock）")
+    parser.add_argument("--api-key", default="test")
+    parser.add_argument("--model", default="grok-4-fast")
+    parser.add_argument("--rounds", type=int, default=3, help="每个档位每类请求的重复次数（取中位数）")
+    parser.add_argument("--prefill-ms-per-kb", type=float, default=20.0, help="mock 每 KB 请求体增加的首 token 延迟（毫秒）")
+    parser.add_argument("--json", action="store_true", help="输出机器可读 JSON")
+    args = parser.parse_args()
+    if not args.api_url:
+        args.api_url = start_mock(args.prefill_ms_per_kb)
+
+    report = asyncio.run(run(args))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{'profile':>8} {'kind':>6} {'sys_chars':>9} {'req_bytes':>9} {'sys_tokens':>10} {'budget':>6} {'prefix':>6} {'ttfb_ms':>8} {'total_ms':>8} {'valid':>5}")
+    for row in report:
+        print(
+            f"{row['profile']:>8} {row['kind']:>6} {row['system_chars']:>9} {row['request_bytes']:>9} "
+            f"{row['system_tokens']:>10} {'ok' if row['within_budget'] else 'over':>6} "
+            f"{'same' if row['stable_prefix'] else 'diff':>6} {row['ttfb_ms']:>8} {row['total_ms']:>8} {row['valid']:>5}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""Provider 基准：离线测量 GrokSearchProvider 搜索 / 抓取在不同并发下的吞吐、延迟分位、内存峰值与重试行为
+
+在子进程中启动 mock_upstream（可模拟首字节延迟、输出速率、429 / 5xx 与流中途断开），
+进程内直接调用 Provider，不经过 MCP 层；每次调用使用不同的查询 / URL 并跳过缓存。
+重试行为来自 mock 的请求计数与客户端的 grok_search_upstream_retries_total 指标。
+
+用法：
+    python benchmarks/bench_provider.py [--concurrency 1,8,32] [--requests 64] [--kind search,fetch]
+        [--ttfb 0.05] [--chunk 16] [--token-delay 0.002] [--error-rate 0] [--disconnect-rate 0] [--json]
+
+    # 注入 10% 的 429 / 503 与 5% 的流中途断开
+    python benchmarks/bench_provider.py --error-rate 0.1 --retry-after 0.2 --disconnect-rate 0.05
+
+环境变量（如 GROK_RETRY_*、GROK_BREAKER_ENABLED、GROK_RATE_LIMIT_ENABLED）照常生效。
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "src"))
+
+# 在导入 grok_search 之前设置：独立的 HOME 避免读写用户配置、日志与抓取缓存，退避时间缩短以便快速完成
+_home = tempfile.TemporaryDirectory()
+os.environ["HOME"] = _home.name
+os.environ.setdefault("GROK_RETRY_MULTIPLIER", "0.05")
+os.environ.setdefault("GROK_RETRY_MAX_WAIT", "1")
+os.environ.setdefault("GROK_FETCH_CACHE_ENABLED", "false")
+
+import httpx  # noqa: E402
+
+from grok_search.http_client import aclose_http_client  # noqa: E402
+from grok_search.metrics import UPSTREAM_RETRIES  # noqa: E402
+from grok_search.providers.grok import GrokSearchProvider  # noqa: E402
+
+RETRY_CAUSES = ("429", "5xx", "timeout", "protocol_error", "network", "failover")
+
+
+def start_mock(args) -> tuple:
+    """以子进程启动 mock_upstream，返回 (进程, 地址)"""
+    command = [
+        sys.executable, str(BENCH_DIR / "mock_upstream.py"), "--port", "0",
+        "--chunk", str(args.chunk), "--token-delay", str(args.token_delay), "--ttfb", str(args.ttfb),
+        "--error-rate", str(args.error_rate), "--error-status", args.error_status,
+        "--retry-after", str(args.retry_after), "--disconnect-rate", str(args.disconnect_rate), "--seed", str(args.seed),
+    ]
+    proc = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline()
+    if "http://" not in line:
+        proc.kill()
+        raise RuntimeError("mock upstream 启动失败")
+    return proc, line.strip().rsplit(" ", 1)[-1]
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def retry_counts() -> dict:
+    return {cause: UPSTREAM_RETRIES.value(provider="grok", cause=cause) for cause in RETRY_CAUSES}
+
+
+async def mock_stats(api_url: str) -> dict:
+    async with httpx.AsyncClient() as client:
+        return (await client.get(f"{api_url}/_mock/stats")).json()
+
+
+async def run_level(provider: GrokSearchProvider, api_url: str, kind: str, concurrency: int, total: int, memory: bool) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], {}
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                if kind == "search":
+                    results = await provider.search(f"bench query {concurrency}-{i}", max_results=10, bypass_cache=True)
+                    if not results:
+                        raise ValueError("empty results")
+                else:
+                    content = await provider.fetch(f"https://example.com/bench/{concurrency}/{i}", bypass_cache=True)
+                    if not content:
+                        raise ValueError("empty content")
+            except Exception as exc:
+                errors[type(exc).__name__] = errors.get(type(exc).__name__, 0) + 1
+                return
+            latencies.append(time.perf_counter() - start)
+
+    stats_before, retries_before = await mock_stats(api_url), retry_counts()
+    if memory:
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    wall = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] if memory else 0
+    stats_after, retries_after = await mock_stats(api_url), retry_counts()
+
+    upstream = {k: stats_after.get(k, 0) - stats_before.get(k, 0) for k in stats_after}
+    retries = {cause: retries_after[cause] - retries_before[cause] for cause in RETRY_CAUSES}
+    return {
+        "kind": kind,
+        "concurrency": concurrency,
+        "requests": total,
+        "ok": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 1) if latencies else 0.0,
+        "peak_alloc_kb": round(peak / 1024, 1),
+        "upstream_requests": upstream.pop("requests", 0),
+        "injected": upstream,
+        "retries": {cause: int(count) for cause, count in retries.items() if count},
+    }
+
+
+async def run(args, api_url: str) -> list:
+    provider = GrokSearchProvider(api_url, "test", args.model)
+    report = []
+    try:
+        for kind in args.kind:
+            for concurrency in args.concurrency:
+                report.append(await run_level(provider, api_url, kind, concurrency, args.requests, not args.no_memory))
+    finally:
+        await aclose_http_client()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Provider benchmark against the offline mock upstream")
+    parser.add_argument("--concurrency", default="1,8,32", help="并发级别（逗号分隔）")
+    parser.add_argument("--requests", type=int, default=64, help="每个并发级别的调用次数")
+    parser.add_argument("--kind", default="search,fetch", help="测量的调用类型：search、fetch")
+    parser.add_argument("--model", default="grok-4-fast")
+    parser.add_argument("--ttfb", type=float, default=0.05, help="mock 首字节延迟（秒）")
+    parser.add_argument("--chunk", type=int, default=16, help="mock 每个 SSE 事件的字符数")
+    parser.add_argument("--token-delay", type=float, default=0.002, help="mock SSE 事件间隔（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="mock 返回错误状态码的比例")
+    parser.add_argument("--error-status", default="429,503", help="mock 注入的错误状态码")
+    parser.add_argument("--retry-after", type=float, default=0.2, help="mock 429 / 503 的 Retry-After（秒）")
+    parser.add_argument("--disconnect-rate", type=float, default=0.0, help="mock 流中途断开的比例")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="不使用 tracemalloc 统计内存峰值（其开销会降低吞吐）")
+    parser.add_argument("--json", action="store_true", help="输出机器可读 JSON")
+    args = parser.parse_args()
+    args.concurrency = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    args.kind = [k.strip() for k in args.kind.split(",") if k.strip()]
+
+    proc, api_url = start_mock(args)
+    if not args.no_memory:
+        tracemalloc.start()
+    try:
+        report = asyncio.run(run(args, api_url))
+    finally:
+        proc.kill()
+        proc.wait()
+
+    if args.json:
+        print(json.dumps({"options": {k: v for k, v in vars(args).items() if k != "json"}, "results": report}, indent=2))
+        return
+    print(f"{'kind':>6} {'conc':>5} {'ok':>7} {'rps':>8} {'p50_ms':>8} {'p99_ms':>8} {'peak_kb':>8} {'upstream':>8}  retries / errors")
+    for row in report:
+        detail = ", ".join(f"{k}={v}" for k, v in {**row["retries"], **row["errors"]}.items()) or "-"
+        print(
+            f"{row['kind']:>6} {row['concurrency']:>5} {row['ok']:>3}/{row['requests']:<3} {row['throughput_rps']:>8} "
+            f"{row['p50_ms']:>8} {row['p99_ms']:>8} {row['peak_alloc_kb']:>8} {row['upstream_requests']:>8}  {detail}"
+        )
+
+
+if __name__ == "__main__":
+    main()
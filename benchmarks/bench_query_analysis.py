@@ -0,0 +1,116 @@
+"""查询分析微基准：对比旧版 _needs_time_context 的逐关键词扫描与一次分词查表的 analyze_query
+
+旧实现每次调用都转小写并逐个检查约 50 个关键词，且只回答“是否时间敏感”；
+analyze_query 一次分析同时得到时间敏感性、语言、平台提示与复杂度，同一查询的后续调用命中 lru_cache。
+同时列出两者对时间敏感性判断不一致的查询（旧实现按子串匹配，如 know 会被识别为 now）。
+
+用法：
+    python benchmarks/bench_query_analysis.py [--rounds 2000] [--json]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from grok_search.query_analysis import analyze_query  # noqa: E402
+
+QUERIES = [
+    "python asyncio",
+    "latest news about openai",
+    "what's new in GitHub Copilot today?",
+    "react vs vue for large single page applications",
+    "I know how snowflake pricing works",
+    "今天北京天气",
+    "最新的 GitHub 热门项目",
+    "如何在 Stack Overflow 上提问？为什么问题会被关闭？",
+    "site:github.com fastmcp middleware on_call_tool",
+    "rust async runtime comparison tokio async-std smol benchmarks 2024 production experience reports",
+    "B站 up主 推荐",
+    "kubernetes pod stuck in CrashLoopBackOff after upgrading to 1.29 with containerd, how to debug",
+    "x.com posts about the eclipse right now",
+    "recently released postgres features",
+]
+
+
+def legacy_needs_time_context(query: str) -> bool:
+    """重构前 providers/grok.py 中的实现"""
+    cn_keywords = [
+        "当前", "现在", "今天", "明天", "昨天",
+        "本周", "上周", "下周", "这周",
+        "本月", "上月", "下月", "这个月",
+        "今年", "去年", "明年",
+        "最新", "最近", "近期", "刚刚", "刚才",
+        "实时", "即时", "目前",
+    ]
+    en_keywords = [
+        "current", "now", "today", "tomorrow", "yesterday",
+        "this week", "last week", "next week",
+        "this month", "last month", "next month",
+        "this year", "last year", "next year",
+        "latest", "recent", "recently", "just now",
+        "real-time", "realtime", "up-to-date",
+    ]
+
+    query_lower = query.lower()
+
+    for keyword in cn_keywords:
+        if keyword in query:
+            return True
+
+    for keyword in en_keywords:
+        if keyword in query_lower:
+            return True
+
+    return False
+
+
+def bench(fn, rounds: int) -> float:
+    """返回每次调用的平均耗时（微秒）"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for query in QUERIES:
+            fn(query)
+    return (time.perf_counter() - start) / (rounds * len(QUERIES)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query analyzer micro-benchmark")
+    parser.add_argument("--rounds", type=int, default=2000, help="遍历查询集合的次数")
+    parser.add_argument("--json", action="store_true", help="输出机器可读 JSON")
+    args = parser.parse_args()
+
+    uncached = analyze_query.__wrapped__
+    # 旧实现在一次搜索中被调用 2 次（构造提示词、计算缓存 TTL），新实现第二次命中缓存
+    report = {
+        "queries": len(QUERIES),
+        "legacy_time_check_us": round(bench(legacy_needs_time_context, args.rounds), 3),
+        "analyze_uncached_us": round(bench(uncached, args.rounds), 3),
+        "analyze_cached_us": round(bench(analyze_query, args.rounds), 3),
+        "per_search_legacy_us": round(2 * bench(legacy_needs_time_context, args.rounds), 3),
+        "per_search_analyzer_us": round(bench(uncached, args.rounds) + bench(analyze_query, args.rounds), 3),
+        "disagreements": [
+            {"query": q, "legacy": legacy_needs_time_context(q), "analyzer": analyze_query(q).time_sensitive}
+            for q in QUERIES if legacy_needs_time_context(q) != analyze_query(q).time_sensitive
+        ],
+        "analysis": {q: analyze_query(q).to_dict() for q in QUERIES},
+    }
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return
+    print(f"legacy _needs_time_context:   {report['legacy_time_check_us']:>8} us/call (time sensitivity only)")
+    print(f"analyze_query (uncached):     {report['analyze_uncached_us']:>8} us/call (time, language, platforms, complexity)")
+    print(f"analyze_query (cached):       {report['analyze_cached_us']:>8} us/call")
+    print(f"per search (2 lookups):       legacy {report['per_search_legacy_us']} us, analyzer {report['per_search_analyzer_us']} us")
+    for row in report["disagreements"]:
+        print(f"time sensitivity differs: {row['query']!r}: legacy={row['legacy']} analyzer={row['analyzer']}")
+    for query, analysis in report["analysis"].items():
+        print(f"  {query[:60]!r:<64} {analysis['complexity']:<9} {analysis['language']:<6} "
+              f"{'time' if analysis['time_sensitive'] else '':<5} {', '.join(analysis['platforms'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""SSE 解码器微基准：对比旧版字符串拼接实现与 ChatStreamDecoder
+
+用法：
+    python benchmarks/bench_sse_decoder.py [--sizes 1,4,16] [--chunk 8] [--json]
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from grok_search.providers.sse import ChatStreamDecoder  # noqa: E402
+
+
+def build_stream(total_bytes: int, chunk_chars: int):
+    """返回一个工厂：每次调用按需生成约 total_bytes 字节内容的 SSE 行（模拟网络逐行到达）"""
+    text = ("Lorem ipsum dolor sit amet, 中文内容测试。\n" * (total_bytes // 40 + 1))[:total_bytes]
+    pieces = [json.dumps(text[i:i + chunk_chars], ensure_ascii=False) for i in range(0, len(text), chunk_chars)]
+
+    def lines():
+        for piece in pieces:
+            yield 'data: {"choices":[{"index":0,"delta":{"content":' + piece + '}}]}'
+            yield ""
+        yield "data: [DONE]"
+
+    lines.events = len(pieces)
+    return lines
+
+
+def legacy_parse(lines) -> str:
+    """重构前 _parse_streaming_response 的解析逻辑"""
+    content = ""
+    full_body_buffer = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        full_body_buffer.append(line)
+        if line.startswith("data:"):
+            if line in ("data: [DONE]", "data:[DONE]"):
+                continue
+            try:
+                data = json.loads(line[5:].lstrip())
+                choices = data.get("choices", [])
+                if choices:
+                    delta = choices[0].get("delta", {})
+                    if "content" in delta:
+                        content += delta["content"]
+            except (json.JSONDecodeError, IndexError):
+                continue
+    return content
+
+
+def decoder_parse(lines) -> str:
+    decoder = ChatStreamDecoder("text/event-stream")
+    for line in lines:
+        decoder.feed(line)
+    return decoder.finish()
+
+
+def measure(fn, lines) -> dict:
+    start = time.perf_counter()
+    fn(lines())
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    fn(lines())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": round(elapsed, 4), "peak_mb": round(peak / 1024 / 1024, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SSE decoder micro-benchmark")
+    parser.add_argument("--sizes", default="1,4,16", help="输出内容大小列表（MB，逗号分隔）")
+    parser.add_argument("--chunk", type=int, default=8, help="每个 SSE 增量的字符数")
+    parser.add_argument("--json", action="store_true", help="输出机器可读 JSON")
+    args = parser.parse_args()
+
+    report = []
+    for size_mb in (float(s) for s in args.sizes.split(",")):
+        lines = build_stream(int(size_mb * 1024 * 1024), args.chunk)
+        assert legacy_parse(lines()) == decoder_parse(lines())
+        report.append({
+            "size_mb": size_mb,
+            "events": lines.events,
+            "legacy": measure(legacy_parse, lines),
+            "decoder": measure(decoder_parse, lines),
+        })
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{'size_mb':>8} {'events':>9} {'legacy_s':>9} {'decoder_s':>10} {'legacy_mb':>10} {'decoder_mb':>11}")
+    for row in report:
+        print(
+            f"{row['size_mb']:>8} {row['events']:>9} {row['legacy']['seconds']:>9} "
+            f"{row['decoder']['seconds']:>10} {row['legacy']['peak_mb']:>10} {row['decoder']['peak_mb']:>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""MCP 端到端压测：N 个并发 MCP 会话通过 http / sse 传输调用工具，统计吞吐、延迟分位、错误率与服务端 RSS 变化
+
+默认以子进程启动 mock_upstream 与 grok-search 服务（`--transport http|sse`，上游指向 mock），
+每个会话按权重随机选择工具（web_search / web_fetch / get_config_info）循环调用，持续 --duration 秒。
+传入 --url 时改为压测已运行的服务（此时仅在提供 --server-pid 时采样 RSS）。
+
+用法：
+    python benchmarks/loadtest_mcp.py [--transport http] [--sessions 16] [--duration 30]
+        [--mix web_search=6,web_fetch=3,get_config_info=1] [--distinct 0] [--ttfb 0.05] [--json]
+    python benchmarks/loadtest_mcp.py --url http://10.0.0.5:8000/mcp --sessions 64 --duration 120
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from fastmcp import Client
+
+BENCH_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCH_DIR.parent / "src"
+TOOLS = ("web_search", "web_fetch", "get_config_info")
+
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in TOOLS:
+            raise ValueError(f"未知工具: {name}（可选 {', '.join(TOOLS)}）")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def read_rss_kb(pid: int) -> int:
+    """读取 /proc/<pid>/status 的 VmRSS（仅 Linux），不可用时返回 0"""
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def start_mock(args) -> tuple:
+    command = [
+        sys.executable, str(BENCH_DIR / "mock_upstream.py"), "--port", "0",
+        "--ttfb", str(args.ttfb), "--token-delay", str(args.token_delay),
+        "--error-rate", str(args.error_rate), "--retry-after", "0.2",
+    ]
+    proc = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline()
+    if "http://" not in line:
+        proc.kill()
+        raise RuntimeError("mock upstream 启动失败")
+    return proc, line.strip().rsplit(" ", 1)[-1]
+
+
+async def start_server(args, upstream: str, home: str) -> tuple:
+    """启动 grok-search 服务并等待端口可连接，返回 (进程, MCP 地址)"""
+    port = free_port()
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC_DIR), env.get("PYTHONPATH", "")]))
+    # 独立的 HOME，避免读写用户的配置、日志与抓取缓存
+    env.update(HOME=home, GROK_API_URL=upstream, GROK_API_KEY="loadtest", GROK_CONFIG_POLL_INTERVAL="0")
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "grok_search.server", "--transport", args.transport, "--host", "127.0.0.1", "--port", str(port)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"服务启动失败（退出码 {proc.returncode}）")
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            break
+        except OSError:
+            await asyncio.sleep(0.1)
+    else:
+        proc.kill()
+        raise RuntimeError("服务启动超时")
+    path = "/mcp" if args.transport == "http" else "/sse"
+    return proc, f"http://127.0.0.1:{port}{path}"
+
+
+class Recorder:
+    """按工具记录每次调用的延迟与错误，并按采样间隔汇总完成数"""
+
+    def __init__(self, started: float):
+        self.started = started
+        self.latencies = {tool: [] for tool in TOOLS}
+        self.errors = {tool: {} for tool in TOOLS}
+        self.session_errors = {}
+        self.completed = 0
+
+    def record(self, tool: str, elapsed: float, error: str = "") -> None:
+        self.completed += 1
+        if error:
+            self.errors[tool][error] = self.errors[tool].get(error, 0) + 1
+        else:
+            self.latencies[tool].append(elapsed)
+
+
+def make_arguments(tool: str, n: int, distinct: int) -> dict:
+    # distinct > 0 时只在 distinct 个查询 / URL 之间循环，用于观察缓存命中下的表现
+    key = n % distinct if distinct else n
+    if tool == "web_search":
+        return {"query": f"loadtest query {key}"}
+    if tool == "web_fetch":
+        return {"url": f"https://example.com/loadtest/{key}", "mode": "grok"}
+    return {}
+
+
+async def ignore_log(message) -> None:
+    """丢弃服务端通过 ctx.info 推送的日志消息，避免刷屏"""
+
+
+async def session(url: str, recorder: Recorder, mix: dict, deadline: float, distinct: int, counter, rng: random.Random) -> None:
+    tools, weights = list(mix), list(mix.values())
+    try:
+        async with Client(url, timeout=120, log_handler=ignore_log) as client:
+            while time.monotonic() < deadline:
+                tool = rng.choices(tools, weights)[0]
+                start = time.monotonic()
+                error = ""
+                try:
+                    result = await client.call_tool(tool, make_arguments(tool, next(counter), distinct), raise_on_error=False)
+                    if result.is_error:
+                        error = "tool_error"
+                except Exception as exc:
+                    error = type(exc).__name__
+                recorder.record(tool, time.monotonic() - start, error)
+    except Exception as exc:
+        # 会话建立或关闭失败（如连接数耗尽）单独统计
+        name = type(exc).__name__
+        recorder.session_errors[name] = recorder.session_errors.get(name, 0) + 1
+
+
+async def sample(recorder: Recorder, pid: int, interval: float, deadline: float, timeline: list) -> None:
+    last = 0
+    while time.monotonic() < deadline:
+        await asyncio.sleep(interval)
+        done = recorder.completed
+        timeline.append({
+            "t": round(time.monotonic() - recorder.started, 1),
+            "rps": round((done - last) / interval, 1),
+            "rss_mb": round(read_rss_kb(pid) / 1024, 1) if pid else None,
+        })
+        last = done
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def summarize(recorder: Recorder, elapsed: float, timeline: list) -> dict:
+    tools = {}
+    for tool in TOOLS:
+        latencies, errors = recorder.latencies[tool], recorder.errors[tool]
+        calls = len(latencies) + sum(errors.values())
+        if not calls:
+            continue
+        tools[tool] = {
+            "calls": calls,
+            "error_rate": round(sum(errors.values()) / calls, 4),
+            "errors": errors,
+            "p50_ms": round(percentile(latencies, 0.5) * 1000, 1),
+            "p90_ms": round(percentile(latencies, 0.9) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+            "mean_ms": round(statistics.fmean(latencies) * 1000, 1) if latencies else 0.0,
+        }
+    rss = [point["rss_mb"] for point in timeline if point["rss_mb"]]
+    total = sum(t["calls"] for t in tools.values())
+    failed = sum(sum(t["errors"].values()) for t in tools.values())
+    return {
+        "elapsed_s": round(elapsed, 1),
+        "calls": total,
+        "throughput_rps": round((total - failed) / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(failed / total, 4) if total else 0.0,
+        "tools": tools,
+        "session_errors": recorder.session_errors,
+        "rss_mb": {"start": rss[0], "peak": max(rss), "end": rss[-1]} if rss else None,
+        "timeline": timeline,
+    }
+
+
+async def run(args) -> dict:
+    processes = []
+    pid = args.server_pid
+    with tempfile.TemporaryDirectory() as home:
+        try:
+            url = args.url
+            if not url:
+                mock, upstream = start_mock(args)
+                processes.append(mock)
+                server, url = await start_server(args, upstream, home)
+                processes.append(server)
+                pid = server.pid
+
+            rng = random.Random(args.seed)
+            counter = iter(range(sys.maxsize))
+            started = time.monotonic()
+            deadline = started + args.duration
+            recorder = Recorder(started)
+            timeline = []
+            sampler = asyncio.create_task(sample(recorder, pid, args.sample_interval, deadline, timeline))
+            await asyncio.gather(*(
+                session(url, recorder, args.mix, deadline, args.distinct, counter, random.Random(rng.random()))
+                for _ in range(args.sessions)
+            ))
+            elapsed = time.monotonic() - started
+            await sampler
+            report = summarize(recorder, elapsed, timeline)
+            report["options"] = {"url": url, "transport": args.transport, "sessions": args.sessions, "mix": args.mix, "distinct": args.distinct}
+            return report
+        finally:
+            for proc in processes:
+                proc.kill()
+                proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end MCP load test over http / sse")
+    parser.add_argument("--transport", choices=["http", "sse"], default="http")
+    parser.add_argument("--url", default="", help="压测已运行的服务（如 http://host:8000/mcp），默认启动本地服务")
+    parser.add_argument("--server-pid", type=int, default=0, help="--url 模式下用于采样 RSS 的服务进程 ID")
+    parser.add_argument("--sessions", type=int, default=16, help="并发 MCP 会话数")
+    parser.add_argument("--duration", type=float, default=30.0, help="压测时长（秒）")
+    parser.add_argument("--mix", default="web_search=6,web_fetch=3,get_config_info=1", help="工具调用权重")
+    parser.add_argument("--distinct", type=int, default=0, help="不同查询 / URL 的数量，0 表示每次调用都不同（不命中缓存）")
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="吞吐与 RSS 的采样间隔（秒）")
+    parser.add_argument("--ttfb", type=float, default=0.05, help="mock 首字节延迟（秒）")
+    parser.add_argument("--token-delay", type=float, default=0.002, help="mock SSE 事件间隔（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="mock 返回 429 / 503 的比例")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="输出机器可读 JSON")
+    args = parser.parse_args()
+    args.mix = parse_mix(args.mix)
+
+    report = asyncio.run(run(args))
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        return
+    print(f"{args.transport} {report['options']['url']}: {args.sessions} sessions, {report['elapsed_s']} s")
+    print(f"calls {report['calls']}, throughput {report['throughput_rps']} rps, error rate {report['error_rate']:.2%}")
+    print(f"{'tool':>16} {'calls':>7} {'err%':>6} {'p50_ms':>8} {'p90_ms':>8} {'p99_ms':>8}")
+    for tool, row in report["tools"].items():
+        print(f"{tool:>16} {row['calls']:>7} {row['error_rate']:>6.1%} {row['p50_ms']:>8} {row['p90_ms']:>8} {row['p99_ms']:>8}")
+        for error, count in row["errors"].items():
+            print(f"{'':>16} {error}: {count}")
+    for error, count in report["session_errors"].items():
+        print(f"session error {error}: {count}")
+    if report["rss_mb"]:
+        rss = report["rss_mb"]
+        print(f"server RSS: start {rss['start']} MB, peak {rss['peak']} MB, end {rss['end']} MB")
+        print("timeline (s: rps / rss MB): " + ", ".join(f"{p['t']}: {p['rps']}/{p['rss_mb']}" for p in report["timeline"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""本地上游桩服务：模拟 OpenAI 兼容的 Grok 接口与 Tavily 搜索接口，用于离线测试与基准
+
+提供的端点：
+    GET  /models             模型列表
+    GET  /page/<name>        本地抓取示例页面（static、spa、gbk、pdf）
+    GET  /_mock/stats        已处理的请求数与注入的故障数（JSON），供基准统计重试
+    POST /chat/completions   SSE 流式输出：搜索请求返回 JSON 结果数组，抓取请求返回 Markdown
+    POST /search             Tavily 搜索结果
+
+可模拟的上游行为：首字节延迟（--ttfb、--prefill-ms-per-kb）、输出速率（--chunk、--token-delay）、
+按比例返回 429 / 5xx（--error-rate、--error-status、--retry-after）与流中途断开（--disconnect-rate）。
+
+用法：
+    python benchmarks/mock_upstream.py [--port 18931] [--results 10] [--chunk 16] [--token-delay 0.005]
+        [--tavily-delay 0.2] [--prefill-ms-per-kb 0] [--ttfb 0] [--error-rate 0] [--error-status 429,503]
+        [--retry-after 1] [--disconnect-rate 0] [--seed 0]
+
+    GROK_API_URL=http://127.0.0.1:18931 GROK_API_KEY=test \\
+    TAVILY_ENABLED=true TAVILY_API_URL=http://127.0.0.1:18931 TAVILY_API_KEY=test grok-search
+"""
+import argparse
+import json
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_results(count: int, query: str = "") -> list:
+    return [
+        {
+            "title": f"Result {i} for {query}".strip(),
+            "url": f"https://example.com/{i}?utm_source=mock",
+            "description": f"Snippet {i} about {query}".strip(),
+        }
+        for i in range(count)
+    ]
+
+
+def make_page(url: str) -> str:
+    return f"# Mock page\n\nSource: {url}\n\n" + "Lorem ipsum dolor sit amet.\n\n" * 40
+
+
+def make_html(title: str, paragraphs: int = 40) -> str:
+    body = "".join(f"<p>Paragraph {i}: <b>Lorem</b> ipsum <a href='/page/static?p={i}'>dolor</a> sit amet.</p>" for i in range(paragraphs))
+    return (
+        f"<!doctype html><html><head><meta charset='utf-8'><title>{title}</title>"
+        f"<script>window.analytics = {{}};</script></head><body><h1>{title}</h1>{body}"
+        "<table><tr><th>Key</th><th>Value</th></tr><tr><td>a</td><td>1</td></tr></table>"
+        "<pre><code class='language-python'>print('hello')</code></pre></body></html>"
+    )
+
+
+# 本地抓取用的示例页面：静态页、依赖 JavaScript 的单页应用、GBK 编码页面、PDF
+PAGES = {
+    "static": ("text/html; charset=utf-8", make_html("Static page").encode("utf-8")),
+    "spa": (
+        "text/html; charset=utf-8",
+        b"<!doctype html><html><head><title>App</title><script src='/app.js'></script></head>"
+        b"<body><noscript>You need to enable JavaScript to run this app.</noscript><div id='root'></div></body></html>",
+    ),
+    "gbk": ("text/html", "<html><head><meta charset='gbk'><title>中文页面</title></head><body><p>你好，世界</p></body></html>".encode("gbk")),
+    "pdf": ("application/pdf", b"%PDF-1.4 mock"),
+}
+
+
+DEFAULT_OPTIONS = dict(
+    results=10, chunk=16, token_delay=0.005, tavily_delay=0.2, prefill_ms_per_kb=0.0,
+    ttfb=0.0, error_rate=0.0, error_status="429,503", retry_after=1.0, disconnect_rate=0.0, seed=0,
+)
+
+
+class MockStats:
+    """线程安全的计数：请求数、注入的错误（按状态码）与中途断开数"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def inc(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._counts)
+
+
+class MockUpstreamHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    options = argparse.Namespace(**DEFAULT_OPTIONS)
+    stats = MockStats()
+    rng = random.Random(0)
+    request_bytes = 0
+
+    @classmethod
+    def configure(cls, options: argparse.Namespace) -> None:
+        """设置模拟参数（缺省项取 DEFAULT_OPTIONS）并重置计数"""
+        cls.options = argparse.Namespace(**{**DEFAULT_OPTIONS, **vars(options)})
+        cls.stats = MockStats()
+        cls.rng = random.Random(cls.options.seed)
+
+    def _chance(self, rate: float) -> bool:
+        return rate > 0 and self.rng.random() < rate
+
+    def _inject_error(self) -> bool:
+        """按 --error-rate 返回 429 / 5xx（429 与 503 带 Retry-After）；已返回错误时为真"""
+        if not self._chance(self.options.error_rate):
+            return False
+        statuses = [int(code) for code in str(self.options.error_status).split(",") if code.strip()]
+        status = self.rng.choice(statuses or [503])
+        self.stats.inc(f"error_{status}")
+        body = json.dumps({"error": {"message": f"injected {status}"}}).encode("utf-8")
+        self.send_response(status)
+        if status in (429, 503):
+            self.send_header("Retry-After", f"{self.options.retry_after:g}")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        return True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, data) -> None:
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length", 0))
+        self.request_bytes = length
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return {}
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0].rstrip("/")
+        if path.endswith("/models"):
+            self._send_json(200, {"data": [{"id": "grok-4-fast"}, {"id": "grok-4.1-thinking"}]})
+        elif path.endswith("/_mock/stats"):
+            self._send_json(200, self.stats.snapshot())
+        elif path.startswith("/page/") and path[6:] in PAGES:
+            content_type, body = PAGES[path[6:]]
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        body = self._read_json()
+        path = self.path.rstrip("/")
+        self.stats.inc("requests")
+        if self._inject_error():
+            return
+        if path.endswith("/chat/completions"):
+            self._stream_completion(body)
+        elif path.endswith("/search"):
+            time.sleep(self.options.tavily_delay)
+            query = body.get("query", "")
+            results = make_results(min(int(body.get("max_results", 5)), self.options.results), query)
+            for item in results:
+                item["content"] = item.pop("description")
+                item["score"] = 0.9
+            self._send_json(200, {"query": query, "results": results, "response_time": self.options.tavily_delay})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def _stream_completion(self, body: dict) -> None:
+        messages = body.get("messages") or [{}]
+        prompt = messages[-1].get("content", "")
+        if "Markdown" in prompt:
+            text = make_page(prompt.split("\n", 1)[0])
+        else:
+            text = json.dumps(make_results(self.options.results, prompt.splitlines()[0] if prompt else ""), ensure_ascii=False, indent=2)
+
+        # 模拟上游排队与处理输入（prefill）的耗时：固定延迟加上与请求体大小成正比的部分
+        delay = self.options.ttfb + self.options.prefill_ms_per_kb * self.request_bytes / 1024 / 1000
+        if delay:
+            time.sleep(delay)
+        # 流中途断开：输出一半内容后直接关闭连接，不发送 [DONE] 与结束块
+        cut_at = len(text) // 2 if self._chance(self.options.disconnect_rate) else None
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def write(data: bytes) -> None:
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+
+        try:
+            for i in range(0, len(text), self.options.chunk):
+                if cut_at is not None and i >= cut_at:
+                    self.stats.inc("disconnects")
+                    self.close_connection = True
+                    self.connection.shutdown(socket.SHUT_RDWR)
+                    return
+                event = {"choices": [{"index": 0, "delta": {"content": text[i:i + self.options.chunk]}}]}
+                write(("data: " + json.dumps(event, ensure_ascii=False) + "\n\n").encode("utf-8"))
+                if self.options.token_delay:
+                    time.sleep(self.options.token_delay)
+            write(b"data: [DONE]\n\n")
+            write(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            # 客户端提前结束流（如已收集到足够的搜索结果）
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18931)
+    parser.add_argument("--results", type=int, default=10, help="每次搜索返回的结果数")
+    parser.add_argument("--chunk", type=int, default=16, help="每个 SSE 事件的字符数")
+    parser.add_argument("--token-delay", type=float, default=0.005, help="SSE 事件间隔（秒）")
+    parser.add_argument("--tavily-delay", type=float, default=0.2, help="Tavily 搜索响应延迟（秒）")
+    parser.add_argument("--prefill-ms-per-kb", type=float, default=0.0, help="每 KB 请求体增加的首 token 延迟（毫秒）")
+    parser.add_argument("--ttfb", type=float, default=0.0, help="发送响应头前的固定延迟（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回错误状态码的请求比例（0-1）")
+    parser.add_argument("--error-status", default="429,503", help="注入的错误状态码（逗号分隔，随机选择）")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="429 / 503 响应的 Retry-After（秒）")
+    parser.add_argument("--disconnect-rate", type=float, default=0.0, help="流中途断开连接的请求比例（0-1）")
+    parser.add_argument("--seed", type=int, default=0, help="故障注入的随机种子")
+    args = parser.parse_args()
+
+    MockUpstreamHandler.configure(args)
+    server = ThreadingHTTPServer((args.host, args.port), MockUpstreamHandler)
+    # --port 0 时由系统分配端口，输出实际地址供调用方解析
+    print(f"mock upstream listening on http://{args.host}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
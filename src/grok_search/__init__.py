@@ -1,3 +1,9 @@
-from .server import mcp
-
 __all__ = ["mcp"]
+
+
+def __getattr__(name: str):
+    # 按需导入 server（fastmcp 较重），导入 grok_search 的子模块时不加载
+    if name == "mcp":
+        from .server import mcp
+        return mcp
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,134 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from .config import config
+from .metrics import register_cache
+
+
+def _estimate_size(value: Any) -> int:
+    """粗略估算缓存值占用的字节数"""
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (list, tuple)):
+        return sum(_estimate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sum(_estimate_size(k) + _estimate_size(v) for k, v in value.items())
+    to_dict = getattr(value, "to_dict", None)
+    if callable(to_dict):
+        return _estimate_size(to_dict())
+    return len(repr(value))
+
+
+class TTLCache:
+    """带过期时间的 LRU 缓存，同时按条目数和总字节数淘汰
+
+    过期条目在读取时惰性删除，超出容量时从 LRU 头部淘汰；
+    每隔 sweep_interval 秒最多做一次全量清理，回收长期未被读取的过期条目。
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, sizeof: Callable[[Any], int] = _estimate_size,
+                 sweep_interval: float = 60.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self._sizeof = sizeof
+        self._next_sweep = time.monotonic() + sweep_interval
+        # key -> (expires_at, size, value)，按最近访问顺序排列
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, size, value = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def contains(self, key: Hashable) -> bool:
+        """检查键是否存在且未过期；不计入命中统计，也不改变 LRU 顺序"""
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] > time.monotonic()
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        size = self._sizeof(value)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        now = time.monotonic()
+        self._entries[key] = (now + ttl, size, value)
+        self._total_bytes += size
+        if now >= self._next_sweep:
+            self._sweep(now)
+        self._evict(now)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._total_bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._total_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._total_bytes -= size
+
+    def _sweep(self, now: float) -> None:
+        for key in [k for k, (expires_at, _, _) in self._entries.items() if expires_at <= now]:
+            self._remove(key)
+        self._next_sweep = now + self.sweep_interval
+
+    def _evict(self, now: float) -> None:
+        # 按 LRU 顺序从头部淘汰直到满足容量限制；已过期的条目不计入淘汰数
+        while self._entries and (len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes):
+            key, (expires_at, _, _) = next(iter(self._entries.items()))
+            self._remove(key)
+            if expires_at > now:
+                self.evictions += 1
+
+
+def search_cache_key(query: str, platform: str, min_results: int, max_results: int, model: str) -> tuple:
+    """构造搜索缓存键：查询与平台忽略大小写和多余空白"""
+    normalized_query = " ".join(query.split()).casefold()
+    platforms = sorted(p.strip().casefold() for p in platform.split(",") if p.strip())
+    return (normalized_query, ",".join(platforms), min_results, max_results, model)
+
+
+_search_cache: Optional[TTLCache] = None
+register_cache("search", lambda: _search_cache)
+
+
+def get_search_cache() -> TTLCache:
+    """获取 web_search 结果缓存（进程内共享）"""
+    global _search_cache
+    if _search_cache is None:
+        _search_cache = TTLCache(config.search_cache_max_entries, config.search_cache_max_bytes)
+    return _search_cache
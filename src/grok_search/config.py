@@ -1,124 +1,421 @@
 import os
 import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, fields, replace
 from pathlib import Path
+from typing import Mapping, Optional, Tuple
 
-class Config:
-    _instance = None
-    _SETUP_COMMAND = (
-        'claude mcp add-json grok-search --scope user '
-        '\'{"type":"stdio","command":"uvx","args":["--from",'
-        '"git+https://github.com/GuDaStudio/GrokSearch","grok-search"],'
-        '"env":{"GROK_API_URL":"your-api-url","GROK_API_KEY":"your-api-key"}}\''
-    )
-    _DEFAULT_MODEL = "grok-4.1-thinking"
+from .prompts import AUTO_PROFILE, PROMPT_PROFILES
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._config_file = None
-            cls._instance._cached_model = None
-        return cls._instance
+_SETUP_COMMAND = (
+    'claude mcp add-json grok-search --scope user '
+    '\'{"type":"stdio","command":"uvx","args":["--from",'
+    '"git+https://github.com/GuDaStudio/GrokSearch","grok-search"],'
+    '"env":{"GROK_API_URL":"your-api-url","GROK_API_KEY":"your-api-key"}}\''
+)
+_DEFAULT_MODEL = "grok-4.1-thinking"
+_SEARCH_ROUTING_MODES = ("grok", "tavily", "grok_first", "tavily_first")
+_FETCH_MODES = ("auto", "local", "grok")
+_PROMPT_PROFILE_NAMES = (*PROMPT_PROFILES, AUTO_PROFILE)
+_LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+_LOG_FORMATS = ("json", "text")
+_TRUE_VALUES = ("true", "1", "yes")
 
-    @property
-    def config_file(self) -> Path:
-        if self._config_file is None:
-            config_dir = Path.home() / ".config" / "grok-search"
-            config_dir.mkdir(parents=True, exist_ok=True)
-            self._config_file = config_dir / "config.json"
-        return self._config_file
 
-    def _load_config_file(self) -> dict:
-        if not self.config_file.exists():
-            return {}
+def _env(name: str, default, transform=None, restart: bool = False, secret: bool = False, choices: Tuple[str, ...] = ()):
+    """声明从环境变量读取的字段（环境变量未设置时读取 config.json 中的同名键）
+
+    restart=True 表示该值只在组件创建时读取一次（连接池、缓存容量等），重载后需重启才生效；
+    choices 非空时取值必须是其中之一。
+    """
+    return field(metadata={
+        "env": name, "default": default, "transform": transform, "restart": restart, "secret": secret, "choices": choices,
+    })
+
+
+def _parse(name: str, raw, default):
+    """按默认值的类型解析原始值；config.json 中的非字符串值先转换为 JSON 文本"""
+    if not isinstance(raw, str):
+        raw = json.dumps(raw)
+    raw = raw.strip()
+    if isinstance(default, bool):
+        return raw.lower() in _TRUE_VALUES
+    if isinstance(default, (int, float)):
         try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            return {}
+            return type(default)(raw)
+        except ValueError:
+            raise ValueError(f"{name} 必须是{'整数' if isinstance(default, int) else '数字'}: {raw}")
+    return raw
 
-    def _save_config_file(self, config_data: dict) -> None:
+
+def _parse_endpoints(raw: str, default_key: str) -> Tuple[dict, ...]:
+    """解析 GROK_API_ENDPOINTS：JSON 数组 [{"url", "key", "weight"}]，或逗号 / 换行分隔的 url|key|weight"""
+    raw = raw.strip()
+    if not raw:
+        return ()
+    if raw.startswith("["):
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config_data, f, ensure_ascii=False, indent=2)
-        except IOError as e:
-            raise ValueError(f"无法保存配置文件: {str(e)}")
+            items = json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"GROK_API_ENDPOINTS 不是合法的 JSON: {e}")
+    else:
+        items = []
+        for part in raw.replace("\n", ",").split(","):
+            values = [f.strip() for f in part.split("|")]
+            if not values[0]:
+                continue
+            item = {"url": values[0]}
+            if len(values) > 1 and values[1]:
+                item["key"] = values[1]
+            if len(values) > 2 and values[2]:
+                item["weight"] = values[2]
+            items.append(item)
 
-    @property
-    def debug_enabled(self) -> bool:
-        return os.getenv("GROK_DEBUG", "false").lower() in ("true", "1", "yes")
+    endpoints = []
+    for item in items:
+        if not isinstance(item, dict) or not item.get("url"):
+            raise ValueError(f"GROK_API_ENDPOINTS 中的端点缺少 url: {item}")
+        key = item.get("key") or default_key
+        if not key:
+            raise ValueError(f"GROK_API_ENDPOINTS 中的端点 {item['url']} 缺少 key，且未配置 GROK_API_KEY")
+        try:
+            weight = float(item.get("weight", 1.0))
+        except (TypeError, ValueError):
+            raise ValueError(f"GROK_API_ENDPOINTS 中的端点 {item['url']} 权重无效: {item.get('weight')}")
+        endpoints.append({"url": str(item["url"]), "key": str(key), "weight": weight})
+    return tuple(endpoints)
 
-    @property
-    def retry_max_attempts(self) -> int:
-        return int(os.getenv("GROK_RETRY_MAX_ATTEMPTS", "3"))
 
-    @property
-    def retry_multiplier(self) -> float:
-        return float(os.getenv("GROK_RETRY_MULTIPLIER", "1"))
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """不可变配置快照：启动时解析并校验一次，重载时整体替换
+
+    必填项（API URL / Key）在访问时才报错；启动时枚举项与端点列表的校验错误记录在 errors 中，
+    以便服务在配置不完整时仍能启动并通过 get_config_info 诊断。重载时任何校验错误都会直接抛出。
+    """
+
+    debug_enabled: bool = _env("GROK_DEBUG", False)
+    retry_max_attempts: int = _env("GROK_RETRY_MAX_ATTEMPTS", 3)
+    retry_multiplier: float = _env("GROK_RETRY_MULTIPLIER", 1.0)
+    retry_max_wait: int = _env("GROK_RETRY_MAX_WAIT", 10)
+    http_max_connections: int = _env("GROK_HTTP_MAX_CONNECTIONS", 100, restart=True)
+    http_max_keepalive_connections: int = _env("GROK_HTTP_MAX_KEEPALIVE", 20, restart=True)
+    http_keepalive_expiry: float = _env("GROK_HTTP_KEEPALIVE_EXPIRY", 30.0, restart=True)
+    http2_enabled: bool = _env("GROK_HTTP2", True, restart=True)
+    search_cache_max_entries: int = _env("GROK_SEARCH_CACHE_MAX_ENTRIES", 256, restart=True)
+    search_cache_max_bytes: int = _env("GROK_SEARCH_CACHE_MAX_BYTES", 8 * 1024 * 1024, restart=True)
+    search_cache_ttl: float = _env("GROK_SEARCH_CACHE_TTL", 600.0)
+    search_cache_time_sensitive_ttl: float = _env("GROK_SEARCH_CACHE_TIME_SENSITIVE_TTL", 60.0)
+    fetch_cache_enabled: bool = _env("GROK_FETCH_CACHE_ENABLED", True)
+    fetch_cache_path_override: str = _env("GROK_FETCH_CACHE_PATH", "", restart=True)
+    fetch_cache_ttl: float = _env("GROK_FETCH_CACHE_TTL", 86400.0)
+    fetch_cache_max_bytes: int = _env("GROK_FETCH_CACHE_MAX_BYTES", 256 * 1024 * 1024, restart=True)
+    fetch_mode: str = _env("GROK_FETCH_MODE", "auto", str.lower, choices=_FETCH_MODES)
+    fetch_timeout: float = _env("GROK_FETCH_TIMEOUT", 20.0)
+    fetch_max_bytes: int = _env("GROK_FETCH_MAX_BYTES", 5 * 1024 * 1024)
+    fetch_min_text_chars: int = _env("GROK_FETCH_MIN_TEXT_CHARS", 200)
+    fetch_allow_private: bool = _env("GROK_FETCH_ALLOW_PRIVATE", False)
+    fetch_page_chars: int = _env("GROK_FETCH_PAGE_CHARS", 20000)
+    page_store_max_documents: int = _env("GROK_PAGE_STORE_MAX_DOCUMENTS", 64, restart=True)
+    page_store_max_bytes: int = _env("GROK_PAGE_STORE_MAX_BYTES", 64 * 1024 * 1024, restart=True)
+    page_store_ttl: float = _env("GROK_PAGE_STORE_TTL", 3600.0, restart=True)
+    prompt_profile: str = _env("GROK_PROMPT_PROFILE", "full", str.lower, choices=_PROMPT_PROFILE_NAMES)
+    # 复杂查询（对比、长查询、多个问题）改用的模型，空表示始终使用 GROK_MODEL
+    complex_query_model: str = _env("GROK_COMPLEX_QUERY_MODEL", "")
+    stream_progress_enabled: bool = _env("GROK_STREAM_PROGRESS", False)
+    stream_progress_tokens: int = _env("GROK_STREAM_PROGRESS_TOKENS", 50)
+    stream_progress_interval_ms: int = _env("GROK_STREAM_PROGRESS_INTERVAL_MS", 1000)
+    batch_concurrency: int = _env("GROK_BATCH_CONCURRENCY", 5)
+    batch_per_host_concurrency: int = _env("GROK_BATCH_PER_HOST_CONCURRENCY", 2)
+    rate_limit_enabled: bool = _env("GROK_RATE_LIMIT_ENABLED", True)
+    rate_limit_initial: float = _env("GROK_RATE_LIMIT_INITIAL", 10.0, restart=True)
+    rate_limit_min: float = _env("GROK_RATE_LIMIT_MIN", 0.2, restart=True)
+    rate_limit_max: float = _env("GROK_RATE_LIMIT_MAX", 50.0, restart=True)
+    rate_limit_burst: int = _env("GROK_RATE_LIMIT_BURST", 5, restart=True)
+    rate_limit_max_requeues: int = _env("GROK_RATE_LIMIT_MAX_REQUEUES", 5)
+    breaker_enabled: bool = _env("GROK_BREAKER_ENABLED", True)
+    breaker_failure_rate: float = _env("GROK_BREAKER_FAILURE_RATE", 0.5, restart=True)
+    breaker_min_requests: int = _env("GROK_BREAKER_MIN_REQUESTS", 5, restart=True)
+    breaker_window: float = _env("GROK_BREAKER_WINDOW", 60.0, restart=True)
+    breaker_open_seconds: float = _env("GROK_BREAKER_OPEN_SECONDS", 30.0, restart=True)
+    endpoints_raw: str = _env("GROK_API_ENDPOINTS", "", restart=True, secret=True)
+    endpoint_health_interval: float = _env("GROK_ENDPOINT_HEALTH_INTERVAL", 30.0)
+    endpoint_eject_seconds: float = _env("GROK_ENDPOINT_EJECT_SECONDS", 30.0, restart=True)
+    api_url_raw: str = _env("GROK_API_URL", "")
+    api_key_raw: str = _env("GROK_API_KEY", "", secret=True)
+    tavily_enabled: bool = _env("TAVILY_ENABLED", False)
+    tavily_api_key_raw: str = _env("TAVILY_API_KEY", "", secret=True)
+    tavily_api_url: str = _env("TAVILY_API_URL", "https://api.tavily.com")
+    tavily_search_depth: str = _env("TAVILY_SEARCH_DEPTH", "basic")
+    tavily_timeout: float = _env("TAVILY_TIMEOUT", 15.0)
+    search_routing_raw: str = _env("GROK_SEARCH_ROUTING", "grok_first", str.lower, choices=_SEARCH_ROUTING_MODES)
+    # 主 Provider 超过该秒数未返回即切换到备用 Provider（0 表示仅在出错时切换）
+    search_primary_timeout: float = _env("GROK_SEARCH_PRIMARY_TIMEOUT", 0.0)
+    log_level: str = _env("GROK_LOG_LEVEL", "INFO", str.upper, restart=True, choices=_LOG_LEVELS)
+    log_dir_raw: str = _env("GROK_LOG_DIR", "logs", restart=True)
+    log_format: str = _env("GROK_LOG_FORMAT", "json", str.lower, restart=True, choices=_LOG_FORMATS)
+    log_max_bytes: int = _env("GROK_LOG_MAX_BYTES", 10 * 1024 * 1024, restart=True)
+    log_backup_count: int = _env("GROK_LOG_BACKUP_COUNT", 5, restart=True)
+    # 工具调用耗时超过该毫秒数时把耗时分解写入日志，0 表示关闭
+    trace_slow_ms: float = _env("GROK_TRACE_SLOW_MS", 0.0)
+    # 轮询 config.json 修改时间的间隔（秒），0 表示关闭
+    config_poll_interval: float = _env("GROK_CONFIG_POLL_INTERVAL", 5.0, restart=True)
+
+    config_file: Path = Path()
+    grok_model: str = _DEFAULT_MODEL
+    # 派生项的解析结果：(值, 错误信息)，错误在访问时以 ValueError 抛出
+    endpoints_parsed: Tuple[Tuple[dict, ...], str] = ((), "")
+    errors: Tuple[str, ...] = ()
+    source_mtime: Optional[float] = None
+    loaded_at: float = 0.0
+
+    @classmethod
+    def load(cls, environ: Mapping[str, str], file_data: dict, config_file: Path, source_mtime: Optional[float] = None,
+             strict: bool = True) -> "ConfigSnapshot":
+        """从环境变量与 config.json 内容构建快照；数值格式错误时抛出 ValueError
+
+        strict=True 时枚举项或端点列表无效也抛出 ValueError（列出全部错误），
+        否则记录在 errors 中，由访问对应属性或 get_config_info 时报告。
+        """
+        values = {}
+        errors = []
+        for f in fields(cls):
+            meta = f.metadata
+            if "env" not in meta:
+                continue
+            raw = environ.get(meta["env"])
+            if raw is None or raw == "":
+                raw = file_data.get(meta["env"])
+            if raw is None or raw == "":
+                value = meta["default"]
+            else:
+                value = _parse(meta["env"], raw, meta["default"])
+            if meta["transform"] is not None:
+                value = meta["transform"](value)
+            if meta["choices"] and value not in meta["choices"]:
+                errors.append(f"{meta['env']} 无效: {value}，可选值: {', '.join(meta['choices'])}")
+            values[f.name] = value
+
+        try:
+            endpoints_parsed = (_parse_endpoints(values["endpoints_raw"], values["api_key_raw"]), "")
+        except ValueError as e:
+            endpoints_parsed = ((), str(e))
+            errors.append(str(e))
+        if errors and strict:
+            raise ValueError("；".join(errors))
+
+        return cls(
+            **values,
+            config_file=config_file,
+            grok_model=file_data.get("model") or _DEFAULT_MODEL,
+            endpoints_parsed=endpoints_parsed,
+            errors=tuple(errors),
+            source_mtime=source_mtime,
+            loaded_at=time.time(),
+        )
 
     @property
-    def retry_max_wait(self) -> int:
-        return int(os.getenv("GROK_RETRY_MAX_WAIT", "10"))
+    def api_endpoints(self) -> Tuple[dict, ...]:
+        endpoints, error = self.endpoints_parsed
+        if error:
+            raise ValueError(error)
+        return endpoints
 
     @property
     def grok_api_url(self) -> str:
-        url = os.getenv("GROK_API_URL")
+        url = self.api_url_raw
+        if not url and self.api_endpoints:
+            url = self.api_endpoints[0]["url"]
         if not url:
             raise ValueError(
                 f"Grok API URL 未配置！\n"
-                f"请使用以下命令配置 MCP 服务器：\n{self._SETUP_COMMAND}"
+                f"请使用以下命令配置 MCP 服务器：\n{_SETUP_COMMAND}"
             )
         return url
 
     @property
     def grok_api_key(self) -> str:
-        key = os.getenv("GROK_API_KEY")
+        key = self.api_key_raw
+        if not key and self.api_endpoints:
+            key = self.api_endpoints[0]["key"]
         if not key:
             raise ValueError(
                 f"Grok API Key 未配置！\n"
-                f"请使用以下命令配置 MCP 服务器：\n{self._SETUP_COMMAND}"
+                f"请使用以下命令配置 MCP 服务器：\n{_SETUP_COMMAND}"
             )
         return key
 
     @property
-    def tavily_enabled(self) -> bool:
-        return os.getenv("TAVILY_ENABLED", "false").lower() in ("true", "1", "yes")
+    def tavily_api_key(self) -> str | None:
+        return self.tavily_api_key_raw or None
 
     @property
-    def tavily_api_key(self) -> str | None:
-        return os.getenv("TAVILY_API_KEY")
+    def search_routing(self) -> str:
+        """搜索路由策略；未启用 Tavily 时固定为 grok，启用后默认 grok_first"""
+        if not self.tavily_enabled:
+            return "grok"
+        routing = self.search_routing_raw
+        if routing not in _SEARCH_ROUTING_MODES:
+            raise ValueError(
+                f"GROK_SEARCH_ROUTING 无效: {routing}，可选值: {', '.join(_SEARCH_ROUTING_MODES)}"
+            )
+        return routing
 
     @property
-    def log_level(self) -> str:
-        return os.getenv("GROK_LOG_LEVEL", "INFO").upper()
+    def fetch_cache_path(self) -> Path:
+        if self.fetch_cache_path_override:
+            return Path(self.fetch_cache_path_override).expanduser()
+        return self.config_file.parent / "fetch_cache.sqlite3"
 
     @property
     def log_dir(self) -> Path:
-        log_dir_str = os.getenv("GROK_LOG_DIR", "logs")
-        if Path(log_dir_str).is_absolute():
-            return Path(log_dir_str)
-        user_log_dir = Path.home() / ".config" / "grok-search" / log_dir_str
-        user_log_dir.mkdir(parents=True, exist_ok=True)
-        return user_log_dir
+        """日志目录（不在此处创建，由日志模块在首次写入前创建）"""
+        if Path(self.log_dir_raw).is_absolute():
+            return Path(self.log_dir_raw)
+        return self.config_file.parent / self.log_dir_raw
+
+    def diff(self, other: "ConfigSnapshot") -> dict:
+        """对比两个快照，返回 {环境变量名: {"old", "new", "restart_required"}}（敏感值已脱敏）"""
+        changes = {}
+        for f in fields(self):
+            old, new = getattr(other, f.name), getattr(self, f.name)
+            if f.name in ("source_mtime", "loaded_at", "endpoints_parsed", "errors", "config_file") or old == new:
+                continue
+            meta = f.metadata
+            if meta.get("secret"):
+                old, new = Config._mask_api_key(old) if old else "", Config._mask_api_key(new) if new else ""
+            changes[meta.get("env", f.name)] = {
+                "old": str(old) if isinstance(old, Path) else old,
+                "new": str(new) if isinstance(new, Path) else new,
+                "restart_required": meta.get("restart", False),
+            }
+        return changes
+
+
+# 当前工具调用绑定的快照（见 Config.bind_snapshot）；未绑定时读取全局快照
+_bound_snapshot: ContextVar[Optional[ConfigSnapshot]] = ContextVar("grok_search_config_snapshot", default=None)
+
+
+class Config:
+    """全局配置入口：属性访问转发到当前快照，重载时整体替换快照
+
+    工具调用由请求中间件通过 bind_snapshot 绑定快照，调用期间（包括其创建的子任务）
+    所有 config.xxx 读取都来自同一快照，重载只影响之后开始的请求。
+    """
+
+    _instance = None
+    _SETUP_COMMAND = _SETUP_COMMAND
+    _DEFAULT_MODEL = _DEFAULT_MODEL
+    _SEARCH_ROUTING_MODES = _SEARCH_ROUTING_MODES
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+            cls._instance._config_file = None
+            cls._instance._snapshot = None
+            cls._instance._rejected_mtime = None
+        return cls._instance
 
     @property
-    def grok_model(self) -> str:
-        if self._cached_model is not None:
-            return self._cached_model
+    def config_file(self) -> Path:
+        if self._config_file is None:
+            self._config_file = Path.home() / ".config" / "grok-search" / "config.json"
+        return self._config_file
 
-        config_data = self._load_config_file()
-        file_model = config_data.get("model")
-        if file_model:
-            self._cached_model = file_model
-            return file_model
+    def _config_mtime(self) -> Optional[float]:
+        try:
+            return self.config_file.stat().st_mtime
+        except OSError:
+            return None
 
-        self._cached_model = self._DEFAULT_MODEL
-        return self._DEFAULT_MODEL
+    def _load_config_file(self) -> dict:
+        if not self.config_file.exists():
+            return {}
+        try:
+            with open(self.config_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _save_config_file(self, config_data: dict) -> None:
+        try:
+            self.config_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.config_file, 'w', encoding='utf-8') as f:
+                json.dump(config_data, f, ensure_ascii=False, indent=2)
+        except IOError as e:
+            raise ValueError(f"无法保存配置文件: {str(e)}")
+
+    def _build_snapshot(self, strict: bool = True) -> ConfigSnapshot:
+        # 先取修改时间再读文件：读取期间文件被修改时，下一次轮询仍会重新加载
+        mtime = self._config_mtime()
+        return ConfigSnapshot.load(os.environ, self._load_config_file(), self.config_file, mtime, strict)
+
+    def _current_snapshot(self) -> ConfigSnapshot:
+        """全局快照（不考虑当前请求绑定的快照）"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            # 首次加载不因枚举项无效而失败，错误由 get_config_info 报告
+            snapshot = self._snapshot = self._build_snapshot(strict=False)
+        return snapshot
+
+    def _swap_snapshot(self, snapshot: ConfigSnapshot) -> None:
+        self._snapshot = snapshot
+        # 在工具调用中重载 / 切换模型时，该调用自身随后读到新值
+        if _bound_snapshot.get() is not None:
+            _bound_snapshot.set(snapshot)
+
+    @property
+    def snapshot(self) -> ConfigSnapshot:
+        snapshot = _bound_snapshot.get()
+        if snapshot is None:
+            snapshot = self._current_snapshot()
+        return snapshot
+
+    @contextmanager
+    def bind_snapshot(self):
+        """在当前上下文中固定配置快照，产出该快照"""
+        snapshot = self._current_snapshot()
+        token = _bound_snapshot.set(snapshot)
+        try:
+            yield snapshot
+        finally:
+            _bound_snapshot.reset(token)
+
+    def __getattr__(self, name: str):
+        # 仅在实例与类上找不到属性时调用，即所有配置项都从当前快照读取
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.snapshot, name)
+
+    def reload(self) -> dict:
+        """重新读取环境变量与 config.json 并原子替换快照，返回变更项
+
+        新配置校验失败时抛出 ValueError，并继续使用当前快照。
+        """
+        old = self._current_snapshot()
+        new = self._build_snapshot()
+        self._swap_snapshot(new)
+        return new.diff(old)
+
+    def reload_if_changed(self) -> Optional[dict]:
+        """config.json 的修改时间变化时重载，未变化时返回 None（校验失败的同一版本文件不重复尝试）"""
+        mtime = self._config_mtime()
+        if mtime == self._current_snapshot().source_mtime or mtime == self._rejected_mtime:
+            return None
+        try:
+            return self.reload()
+        except ValueError:
+            self._rejected_mtime = mtime
+            raise
 
     def set_model(self, model: str) -> None:
         config_data = self._load_config_file()
         config_data["model"] = model
         self._save_config_file(config_data)
-        self._cached_model = model
+        self._swap_snapshot(replace(self._current_snapshot(), grok_model=model, source_mtime=self._config_mtime()))
 
     @staticmethod
     def _mask_api_key(key: str) -> str:
@@ -129,25 +426,39 @@ class Config:
 
     def get_config_info(self) -> dict:
         """获取配置信息（API Key 已脱敏）"""
+        snapshot = self.snapshot
         try:
-            api_url = self.grok_api_url
-            api_key_raw = self.grok_api_key
+            if snapshot.errors:
+                raise ValueError("；".join(snapshot.errors))
+            api_url = snapshot.grok_api_url
+            api_key_raw = snapshot.grok_api_key
             api_key_masked = self._mask_api_key(api_key_raw)
+            endpoint_count = len(snapshot.api_endpoints) or "未配置"
+            search_routing = snapshot.search_routing
             config_status = "✅ 配置完整"
         except ValueError as e:
             api_url = "未配置"
             api_key_masked = "未配置"
+            endpoint_count = "未配置"
+            search_routing = "未配置"
             config_status = f"❌ 配置错误: {str(e)}"
 
         return {
             "GROK_API_URL": api_url,
             "GROK_API_KEY": api_key_masked,
-            "GROK_MODEL": self.grok_model,
-            "GROK_DEBUG": self.debug_enabled,
-            "GROK_LOG_LEVEL": self.log_level,
-            "GROK_LOG_DIR": str(self.log_dir),
-            "TAVILY_ENABLED": self.tavily_enabled,
-            "TAVILY_API_KEY": self._mask_api_key(self.tavily_api_key) if self.tavily_api_key else "未配置",
+            "GROK_MODEL": snapshot.grok_model,
+            "GROK_DEBUG": snapshot.debug_enabled,
+            "GROK_LOG_LEVEL": snapshot.log_level,
+            "GROK_LOG_DIR": str(snapshot.log_dir),
+            "GROK_HTTP2": snapshot.http2_enabled,
+            "GROK_FETCH_MODE": snapshot.fetch_mode,
+            "GROK_PROMPT_PROFILE": snapshot.prompt_profile,
+            "GROK_COMPLEX_QUERY_MODEL": snapshot.complex_query_model or "未配置",
+            "GROK_API_ENDPOINTS": endpoint_count,
+            "TAVILY_ENABLED": snapshot.tavily_enabled,
+            "TAVILY_API_KEY": self._mask_api_key(snapshot.tavily_api_key) if snapshot.tavily_api_key else "未配置",
+            "GROK_SEARCH_ROUTING": search_routing,
+            "config_loaded_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(snapshot.loaded_at)),
             "config_status": config_status
         }
 
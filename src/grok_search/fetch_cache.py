@@ -0,0 +1,154 @@
+import asyncio
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import closing
+from pathlib import Path
+from typing import Optional
+
+from .config import config
+from .metrics import register_cache
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fetch_cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_fetch_cache_last_access ON fetch_cache (last_access);
+"""
+
+
+class FetchCache:
+    """web_fetch 结果的持久化缓存（SQLite + zlib 压缩），支持多进程并发访问"""
+
+    def __init__(self, path: Path, max_bytes: int):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        # 每次操作使用独立连接：可在任意线程中调用，WAL + busy_timeout 处理多进程竞争
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    with closing(sqlite3.connect(self.path, timeout=10.0, isolation_level=None)) as conn:
+                        conn.execute("PRAGMA journal_mode = WAL")
+                        conn.executescript(_SCHEMA)
+                    self._initialized = True
+        conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout = 10000")
+        return conn
+
+    @staticmethod
+    def make_key(url: str, model: str) -> str:
+        return f"{model}\n{url}"
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT value, expires_at FROM fetch_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, expires_at = row
+            if expires_at <= now:
+                conn.execute("DELETE FROM fetch_cache WHERE key = ?", (key,))
+                self.misses += 1
+                return None
+            conn.execute("UPDATE fetch_cache SET last_access = ? WHERE key = ?", (now, key))
+        self.hits += 1
+        return zlib.decompress(value).decode("utf-8")
+
+    def set(self, key: str, content: str, ttl: float) -> None:
+        if ttl <= 0:
+            return
+        blob = zlib.compress(content.encode("utf-8"), 6)
+        size = len(blob)
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO fetch_cache (key, value, size, created_at, expires_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, blob, size, now, now + ttl, now),
+                )
+                self._evict(conn, now)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """删除过期条目，并按最近访问时间淘汰直到总大小不超过上限"""
+        conn.execute("DELETE FROM fetch_cache WHERE expires_at <= ?", (now,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM fetch_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        freed = 0
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM fetch_cache ORDER BY last_access ASC"):
+            victims.append((key,))
+            freed += size
+            if total - freed <= self.max_bytes:
+                break
+        conn.executemany("DELETE FROM fetch_cache WHERE key = ?", victims)
+
+    def stats(self) -> dict:
+        with closing(self._connect()) as conn:
+            entries, total = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM fetch_cache"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "path": str(self.path),
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    # 异步接口在线程池中执行；缓存故障（锁超时、磁盘错误）视为未命中，不影响抓取
+    async def aget(self, key: str) -> Optional[str]:
+        try:
+            return await asyncio.to_thread(self.get, key)
+        except (sqlite3.Error, zlib.error, OSError):
+            return None
+
+    async def aset(self, key: str, content: str, ttl: float) -> None:
+        try:
+            await asyncio.to_thread(self.set, key, content, ttl)
+        except (sqlite3.Error, OSError):
+            pass
+
+    async def astats(self) -> dict:
+        return await asyncio.to_thread(self.stats)
+
+
+_fetch_cache: Optional[FetchCache] = None
+register_cache("fetch", lambda: _fetch_cache)
+
+
+def get_fetch_cache() -> Optional[FetchCache]:
+    """获取 web_fetch 持久化缓存；未启用时返回 None"""
+    global _fetch_cache
+    if not config.fetch_cache_enabled:
+        return None
+    if _fetch_cache is None:
+        _fetch_cache = FetchCache(config.fetch_cache_path, config.fetch_cache_max_bytes)
+    return _fetch_cache
@@ -0,0 +1,432 @@
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+# 非内容标签：其中的文本全部丢弃（只包含有结束标签的元素；embed 等空元素没有内容，直接忽略即可）
+_SKIP_TAGS = {"script", "style", "noscript", "iframe", "template", "svg", "canvas", "object", "select", "button"}
+_BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "header", "footer", "nav", "aside", "figure", "figcaption",
+    "address", "details", "summary", "dl", "dt", "dd", "form", "fieldset", "center", "body",
+}
+_HEADING_TAGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+_INLINE_MARKERS = {"strong": "**", "b": "**", "em": "*", "i": "*", "del": "~~", "s": "~~", "strike": "~~", "code": "`"}
+_CODE_LANG_RE = re.compile(r"(?:^|\s)(?:language|lang|highlight-source|highlight)-([\w+#.-]+)")
+_WS_RE = re.compile(r"\s+")
+_META_KEYS = {
+    "description": "description",
+    "og:description": "description",
+    "author": "author",
+    "article:author": "author",
+    "article:published_time": "published",
+    "date": "published",
+    "og:title": "og_title",
+}
+
+
+class _Buffer:
+    __slots__ = ("kind", "parts", "attrs")
+
+    def __init__(self, kind: str, attrs: Optional[dict] = None):
+        self.kind = kind
+        self.parts: List[str] = []
+        self.attrs = attrs or {}
+
+    def text(self) -> str:
+        return "".join(self.parts)
+
+
+class _Table:
+    __slots__ = ("rows",)
+
+    def __init__(self):
+        self.rows: List[List[str]] = []
+
+
+def _tidy(markdown: str) -> str:
+    """去除行尾空白、合并多余空行（代码块内保持原样）"""
+    lines = []
+    in_fence = False
+    fence = ""
+    blank = False
+    for line in markdown.split("\n"):
+        stripped = line.strip()
+        if in_fence:
+            lines.append(line)
+            if stripped == fence:
+                in_fence = False
+            continue
+        if stripped.startswith("```"):
+            in_fence = True
+            fence = stripped[:len(stripped) - len(stripped.lstrip("`"))]
+        line = line.rstrip()
+        if not line:
+            if not blank and lines:
+                lines.append("")
+            blank = True
+            continue
+        blank = False
+        lines.append(line)
+    return "\n".join(lines).strip("\n") + "\n"
+
+
+class HTMLToMarkdown(HTMLParser):
+    """流式 HTML → Markdown 转换器
+
+    可分块 feed，close() 返回 Markdown。转换规则与 fetch_prompt 一致：
+    标题、段落、粗体/斜体、列表（含嵌套）、表格、代码块（含语言标识）、引用、
+    分隔线、图片与链接（相对地址按 base_url 解析），移除 script/style/iframe/noscript 等非内容标签。
+    """
+
+    def __init__(self, base_url: str = ""):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.title = ""
+        self.meta: Dict[str, str] = {}
+        self.lang = ""
+        # 用于判断页面是否依赖 JavaScript 渲染
+        self.text_chars = 0
+        self.script_count = 0
+        self._stack: List[_Buffer] = [_Buffer("root")]
+        self._skip_depth = 0
+        self._pre_depth = 0
+        self._in_title = False
+        self._title_parts: List[str] = []
+        self._lists: List[list] = []
+        self._tables: List[_Table] = []
+        self._media: Optional[list] = None
+        self._after_marker = False
+        # 列表项内后续段落的缩进：写入下一段非空文本前补上，使段落留在列表项内
+        self._pending_indent = ""
+        self._result: Optional[str] = None
+
+    # ---- 输出工具 ----
+
+    def _write(self, text: str) -> None:
+        if self._pending_indent and text.strip():
+            text = self._pending_indent + text.lstrip(" ")
+            self._pending_indent = ""
+        self._stack[-1].parts.append(text)
+        if self._after_marker and text.strip():
+            self._after_marker = False
+
+    def _block(self) -> None:
+        # 列表项内的段落只换行并按列表项内容缩进（开头的段落直接接在标记之后），保持列表紧凑
+        if self._lists:
+            if not self._after_marker:
+                self._newline()
+                self._pending_indent = " " * sum(level[2] for level in self._lists)
+        else:
+            self._pending_indent = ""
+            self._write("\n\n")
+
+    def _newline(self) -> None:
+        for buf in reversed(self._stack):
+            for part in reversed(buf.parts):
+                if part:
+                    if part[-1] != "\n":
+                        self._write("\n")
+                    return
+
+    def _tail_is_space(self) -> bool:
+        for buf in reversed(self._stack):
+            for part in reversed(buf.parts):
+                if part:
+                    return part[-1].isspace()
+        return True
+
+    def _push(self, kind: str, attrs: Optional[dict] = None) -> _Buffer:
+        if self._pending_indent:
+            # 内层缓冲区的文本会被重新排版，缩进写在外层
+            self._stack[-1].parts.append(self._pending_indent)
+            self._pending_indent = ""
+        buf = _Buffer(kind, attrs)
+        self._stack.append(buf)
+        return buf
+
+    def _pop(self, kind: str) -> Optional[_Buffer]:
+        """弹出最近的 kind 缓冲区；处理未闭合的内层标签（内容并入上层）"""
+        for idx in range(len(self._stack) - 1, 0, -1):
+            if self._stack[idx].kind == kind:
+                break
+        else:
+            return None
+        while len(self._stack) - 1 > idx:
+            inner = self._stack.pop()
+            self._stack[-1].parts.append(inner.text())
+        return self._stack.pop()
+
+    def _url(self, value: Optional[str]) -> str:
+        value = (value or "").strip()
+        if not value or value.startswith(("javascript:", "data:")):
+            return ""
+        return urljoin(self.base_url, value) if self.base_url else value
+
+    # ---- HTMLParser 回调 ----
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {k: (v or "") for k, v in attrs}
+        if tag in _SKIP_TAGS:
+            if tag == "script":
+                self.script_count += 1
+            self._skip_depth += 1
+            return
+        if self._skip_depth:
+            return
+
+        if tag == "html":
+            self.lang = attrs.get("lang", "")
+        elif tag == "title":
+            self._in_title = True
+        elif tag == "meta":
+            key = (attrs.get("name") or attrs.get("property") or "").lower()
+            if key in _META_KEYS and attrs.get("content") and _META_KEYS[key] not in self.meta:
+                self.meta[_META_KEYS[key]] = attrs["content"].strip()
+        elif tag in _HEADING_TAGS:
+            self._push(tag)
+        elif tag == "pre":
+            self._pre_depth += 1
+            if self._pre_depth == 1:
+                self._push("pre", {"lang": self._code_lang(attrs)})
+        elif self._pre_depth:
+            if tag == "code" and not self._stack[-1].attrs.get("lang"):
+                self._stack[-1].attrs["lang"] = self._code_lang(attrs)
+            elif tag == "br":
+                self._write("\n")
+        elif tag in _INLINE_MARKERS:
+            self._push(tag)
+        elif tag == "a":
+            self._push("a", {"href": self._url(attrs.get("href")), "title": attrs.get("title", "")})
+        elif tag == "img":
+            self._image(attrs)
+        elif tag == "br":
+            self._write("\n")
+        elif tag == "hr":
+            self._write("\n\n---\n\n")
+        elif tag in ("ul", "ol", "menu"):
+            start = attrs.get("start", "1")
+            self._lists.append([tag, int(start) - 1 if start.isdigit() else 0, 0])
+            self._newline()
+        elif tag == "li":
+            self._list_item()
+        elif tag == "blockquote":
+            self._push("blockquote")
+        elif tag == "table":
+            self._tables.append(_Table())
+        elif tag == "tr":
+            if self._tables:
+                self._tables[-1].rows.append([])
+        elif tag in ("td", "th"):
+            if self._tables:
+                self._push("cell", {"colspan": attrs.get("colspan", "1")})
+        elif tag in ("video", "audio"):
+            self._media = ["视频" if tag == "video" else "音频", attrs.get("title", ""), False]
+            if attrs.get("src"):
+                self._media_link(attrs["src"])
+        elif tag == "source" and self._media is not None:
+            self._media_link(attrs.get("src"))
+        elif tag in _BLOCK_TAGS:
+            self._block()
+
+    def handle_startendtag(self, tag, attrs):
+        # <br/>、<img/> 等自闭合标签不会触发 endtag
+        self.handle_starttag(tag, attrs)
+        if tag in _SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_endtag(self, tag):
+        if tag in _SKIP_TAGS:
+            if self._skip_depth:
+                self._skip_depth -= 1
+            return
+        if self._skip_depth:
+            return
+
+        if tag == "title":
+            self._in_title = False
+            self.title = self.title or _WS_RE.sub(" ", "".join(self._title_parts)).strip()
+        elif tag in _HEADING_TAGS:
+            buf = self._pop(tag)
+            if buf is not None:
+                text = _WS_RE.sub(" ", buf.text()).strip()
+                if text:
+                    self._write(f"\n\n{'#' * _HEADING_TAGS[tag]} {text}\n\n")
+        elif tag == "pre":
+            if self._pre_depth:
+                self._pre_depth -= 1
+                if not self._pre_depth:
+                    self._code_block(self._pop("pre"))
+        elif self._pre_depth:
+            return
+        elif tag in _INLINE_MARKERS:
+            buf = self._pop(tag)
+            if buf is not None:
+                self._inline(buf.text(), _INLINE_MARKERS[tag])
+        elif tag == "a":
+            buf = self._pop("a")
+            if buf is not None:
+                self._link(buf)
+        elif tag in ("ul", "ol", "menu"):
+            if self._lists:
+                self._lists.pop()
+            self._block()
+        elif tag == "li":
+            self._newline()
+        elif tag == "blockquote":
+            buf = self._pop("blockquote")
+            if buf is not None:
+                body = _tidy(buf.text()).strip("\n")
+                if body:
+                    quoted = "\n".join(f"> {line}" if line else ">" for line in body.split("\n"))
+                    self._write(f"\n\n{quoted}\n\n")
+        elif tag in ("td", "th"):
+            self._cell()
+        elif tag == "table":
+            if self._tables:
+                table = self._tables.pop()
+                # 嵌套表格无法在 Markdown 单元格中表示，展开为单元格内的文本行
+                self._write(self._flatten_table(table) if self._tables else self._render_table(table))
+        elif tag in ("video", "audio"):
+            self._media = None
+        elif tag in _BLOCK_TAGS:
+            self._block()
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        if self._in_title:
+            self._title_parts.append(data)
+            return
+        if self._pre_depth:
+            self._write(data)
+            return
+        text = _WS_RE.sub(" ", data)
+        if text.startswith(" ") and self._tail_is_space():
+            text = text[1:]
+        if text:
+            self._write(text)
+            self.text_chars += len(text.strip())
+
+    # ---- 元素转换 ----
+
+    @staticmethod
+    def _code_lang(attrs: dict) -> str:
+        match = _CODE_LANG_RE.search(attrs.get("class", ""))
+        return match.group(1) if match else attrs.get("data-lang", "")
+
+    def _inline(self, text: str, marker: str) -> None:
+        stripped = text.strip()
+        if not stripped:
+            self._write(text)
+            return
+        if marker == "`" and "`" in stripped:
+            marker = "``"
+            stripped = f" {stripped} "
+        lead = " " if text[:1].isspace() and not self._tail_is_space() else ""
+        trail = " " if text[-1:].isspace() else ""
+        self._write(f"{lead}{marker}{stripped}{marker}{trail}")
+
+    def _link(self, buf: _Buffer) -> None:
+        text = _WS_RE.sub(" ", buf.text()).strip()
+        href = buf.attrs["href"]
+        if not text:
+            return
+        if not href:
+            self._write(text)
+            return
+        title = buf.attrs["title"].replace('"', "'")
+        self._write(f'[{text}]({href} "{title}")' if title else f"[{text}]({href})")
+
+    def _image(self, attrs: dict) -> None:
+        # 懒加载图片的真实地址通常在 data-src 中
+        src = self._url(attrs.get("data-src") or attrs.get("src"))
+        if not src:
+            return
+        alt = _WS_RE.sub(" ", attrs.get("alt", "")).strip().replace("]", "\\]")
+        title = attrs.get("title", "").replace('"', "'")
+        self._write(f'![{alt}]({src} "{title}")' if title else f"![{alt}]({src})")
+
+    def _media_link(self, src: Optional[str]) -> None:
+        url = self._url(src)
+        if url and not self._media[2]:
+            self._media[2] = True
+            self._write(f"[{self._media[0]}: {self._media[1] or url}]({url})")
+
+    def _list_item(self) -> None:
+        self._pending_indent = ""
+        self._newline()
+        if not self._lists:
+            self._write("- ")
+            self._after_marker = True
+            return
+        # 嵌套列表按父级列表标记宽度缩进
+        indent = " " * sum(level[2] for level in self._lists[:-1])
+        current = self._lists[-1]
+        if current[0] == "ol":
+            current[1] += 1
+            marker = f"{current[1]}. "
+        else:
+            marker = "- "
+        current[2] = len(marker)
+        self._write(f"{indent}{marker}")
+        self._after_marker = True
+
+    def _code_block(self, buf: Optional[_Buffer]) -> None:
+        if buf is None:
+            return
+        code = buf.text().strip("\n").rstrip()
+        if not code:
+            return
+        fence = "```"
+        while fence in code:
+            fence += "`"
+        self._write(f"\n\n{fence}{buf.attrs.get('lang', '')}\n{code}\n{fence}\n\n")
+
+    def _cell(self) -> None:
+        buf = self._pop("cell")
+        if buf is None or not self._tables:
+            return
+        table = self._tables[-1]
+        if not table.rows:
+            table.rows.append([])
+        text = _tidy(buf.text()).strip()
+        text = re.sub(r"\s*\n\s*", "<br>", text).replace("|", "\\|")
+        row = table.rows[-1]
+        span = buf.attrs["colspan"]
+        row.append(text)
+        # 合并单元格：补齐被合并的列
+        row.extend([""] * (int(span) - 1 if span.isdigit() and int(span) > 1 else 0))
+
+    @staticmethod
+    def _render_table(table: _Table) -> str:
+        rows = [row for row in table.rows if any(cell for cell in row)]
+        if not rows:
+            return ""
+        width = max(len(row) for row in rows)
+        rows = [row + [""] * (width - len(row)) for row in rows]
+        lines = ["| " + " | ".join(rows[0]) + " |", "|" + "---|" * width]
+        lines.extend("| " + " | ".join(row) + " |" for row in rows[1:])
+        return "\n\n" + "\n".join(lines) + "\n\n"
+
+    @staticmethod
+    def _flatten_table(table: _Table) -> str:
+        rows = (" ".join(cell for cell in row if cell) for row in table.rows)
+        return "\n".join(row for row in rows if row)
+
+    def close(self) -> str:
+        """结束解析并返回 Markdown（可重复调用）"""
+        if self._result is None:
+            super().close()
+            while len(self._stack) > 1:
+                inner = self._stack.pop()
+                self._stack[-1].parts.append(inner.text())
+            while self._tables:
+                self._write(self._render_table(self._tables.pop()))
+            self._result = _tidy(self._stack[0].text())
+        return self._result
+
+
+def html_to_markdown(html: str, base_url: str = "") -> str:
+    converter = HTMLToMarkdown(base_url)
+    converter.feed(html)
+    return converter.close()
@@ -0,0 +1,65 @@
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Optional
+
+from .config import config
+
+if TYPE_CHECKING:
+    import httpx
+
+# 每个事件循环一个共享客户端：httpx.AsyncClient 的连接池不能跨事件循环复用
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def _http2_available() -> bool:
+    """检查 HTTP/2 依赖（h2）是否已安装"""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _build_client() -> "httpx.AsyncClient":
+    # httpx 在首次创建客户端时才导入，缩短服务启动时间
+    import httpx
+
+    limits = httpx.Limits(
+        max_connections=config.http_max_connections,
+        max_keepalive_connections=config.http_max_keepalive_connections,
+        keepalive_expiry=config.http_keepalive_expiry,
+    )
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(connect=6.0, read=120.0, write=10.0, pool=None),
+        limits=limits,
+        http2=config.http2_enabled and _http2_available(),
+        follow_redirects=True,
+    )
+
+
+def get_http_client() -> "httpx.AsyncClient":
+    """获取当前事件循环的共享 HTTP 客户端（复用 DNS/TCP/TLS 连接）"""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = _build_client()
+        _clients[loop] = client
+    return client
+
+
+async def aclose_http_client() -> None:
+    """关闭当前事件循环的共享 HTTP 客户端"""
+    loop = asyncio.get_running_loop()
+    client: Optional["httpx.AsyncClient"] = _clients.pop(loop, None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+@asynccontextmanager
+async def http_client_lifespan(server=None):
+    """服务生命周期：退出时关闭共享连接池"""
+    try:
+        yield {}
+    finally:
+        await aclose_http_client()
@@ -0,0 +1,246 @@
+import asyncio
+import codecs
+import ipaddress
+import json
+import re
+import socket
+from datetime import datetime, timezone
+from typing import Callable, Optional
+from urllib.parse import urljoin, urlsplit
+from urllib.request import getproxies, proxy_bypass
+
+import httpx
+
+from .config import config
+from .fetch_cache import FetchCache, get_fetch_cache
+from .html_markdown import HTMLToMarkdown
+from .http_client import get_http_client
+from .logger import log_info
+from .singleflight import SingleFlight
+from .utils import canonicalize_url
+
+USER_AGENT = "Mozilla/5.0 (compatible; grok-search/1.0; +https://github.com/GuDaStudio/GrokSearch)"
+_HTML_TYPES = {"text/html", "application/xhtml+xml"}
+_TEXT_TYPES = {"text/plain", "text/markdown", "text/x-markdown"}
+_JSON_TYPES = {"application/json", "application/ld+json"}
+_MAX_REDIRECTS = 5
+_SNIFF_BYTES = 4096
+_SNIFF_TEXT_CHARS = 32768
+_META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([A-Za-z0-9_.:-]+)""", re.IGNORECASE)
+# 常见的"需要启用 JavaScript"提示
+_JS_REQUIRED_RE = re.compile(r"(enable|turn on) javascript|javascript (is )?(required|disabled)|启用 ?javascript", re.IGNORECASE)
+
+_flight = SingleFlight()
+
+
+class LocalFetchError(Exception):
+    """本地抓取失败，可改用 Grok 抓取"""
+
+
+class UnsupportedContentError(LocalFetchError):
+    """内容类型无法在本地转换（PDF、图片等）"""
+
+
+class BlockedAddressError(LocalFetchError):
+    """目标地址属于本机或内网，默认禁止访问"""
+
+
+class LocalPage:
+    __slots__ = ("url", "markdown", "content_type", "truncated", "needs_js")
+
+    def __init__(self, url: str, markdown: str, content_type: str, truncated: bool = False, needs_js: bool = False):
+        self.url = url
+        self.markdown = markdown
+        self.content_type = content_type
+        self.truncated = truncated
+        self.needs_js = needs_js
+
+
+def _detect_charset(content_type: str, head: bytes) -> str:
+    """按 Content-Type → BOM → <meta charset> 的顺序识别编码，默认 UTF-8"""
+    candidates = []
+    for param in content_type.split(";")[1:]:
+        key, _, value = param.partition("=")
+        if key.strip().lower() == "charset":
+            candidates.append(value.strip().strip("\"'"))
+    if head.startswith(codecs.BOM_UTF8):
+        candidates.insert(0, "utf-8-sig")
+    elif head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        candidates.insert(0, "utf-16")
+    match = _META_CHARSET_RE.search(head)
+    if match:
+        candidates.append(match.group(1).decode("ascii", "ignore"))
+    for name in candidates:
+        try:
+            return codecs.lookup(name).name
+        except LookupError:
+            continue
+    return "utf-8"
+
+
+async def _check_address(url: str) -> None:
+    """拒绝解析到本机、内网或保留地址的 URL（GROK_FETCH_ALLOW_PRIVATE=true 时放行）"""
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise LocalFetchError(f"不支持的 URL: {url}")
+    if config.fetch_allow_private:
+        return
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(parts.hostname, parts.port or 443, type=socket.SOCK_STREAM)
+    except OSError as e:
+        raise LocalFetchError(f"无法解析主机 {parts.hostname}: {e}")
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%", 1)[0])
+        if not address.is_global:
+            raise BlockedAddressError(f"禁止抓取内网或本机地址: {parts.hostname} ({address})")
+
+
+def _check_peer(url: str, response: httpx.Response) -> None:
+    """读取响应体前检查实际连接的对端地址，防止 DNS 重绑定绕过 _check_address 的解析结果
+
+    经代理访问时对端是代理服务器，由代理负责解析目标主机，此时跳过检查。
+    """
+    if config.fetch_allow_private:
+        return
+    parts = urlsplit(url)
+    if parts.scheme in getproxies() and not proxy_bypass(parts.hostname):
+        return
+    stream = response.extensions.get("network_stream")
+    server_addr = stream.get_extra_info("server_addr") if stream is not None else None
+    if not server_addr:
+        return
+    address = ipaddress.ip_address(str(server_addr[0]).split("%", 1)[0])
+    if not address.is_global:
+        raise BlockedAddressError(f"禁止抓取内网或本机地址: {parts.hostname} ({address})")
+
+
+class LocalFetcher:
+    """本地抓取网页并转换为 Markdown，不经过大模型"""
+
+    async def fetch(self, url: str, ctx=None, bypass_cache: bool = False) -> LocalPage:
+        cache = get_fetch_cache()
+        cache_key = FetchCache.make_key(canonicalize_url(url), "local")
+        if cache is not None and not bypass_cache:
+            cached = await cache.aget(cache_key)
+            if cached is not None:
+                await log_info(ctx, "Fetch cache hit", config.debug_enabled)
+                return LocalPage(url, cached, "cached")
+
+        async def fetch_and_cache():
+            page = await self._fetch_upstream(url, ctx)
+            # 依赖 JavaScript 的页面内容不完整，不写入缓存
+            if cache is not None and page.markdown and not page.needs_js:
+                await cache.aset(cache_key, page.markdown, config.fetch_cache_ttl)
+            return page
+
+        return await _flight.do(cache_key, fetch_and_cache)
+
+    async def _fetch_upstream(self, url: str, ctx=None) -> LocalPage:
+        client = get_http_client()
+        timeout = httpx.Timeout(config.fetch_timeout, connect=6.0)
+        headers = {
+            "User-Agent": USER_AGENT,
+            "Accept": "text/html,application/xhtml+xml,text/plain;q=0.9,*/*;q=0.5",
+        }
+
+        # 手动跟随重定向，逐跳检查解析结果与实际连接的地址
+        current = url
+        for _ in range(_MAX_REDIRECTS + 1):
+            await _check_address(current)
+            async with client.stream("GET", current, headers=headers, timeout=timeout, follow_redirects=False) as response:
+                _check_peer(current, response)
+                if response.is_redirect and response.headers.get("location"):
+                    current = urljoin(current, response.headers["location"])
+                    continue
+                response.raise_for_status()
+                return await self._read_page(str(response.url), response, ctx)
+        raise LocalFetchError(f"重定向次数过多: {url}")
+
+    async def _read_page(self, url: str, response: httpx.Response, ctx) -> LocalPage:
+        content_type = response.headers.get("content-type", "")
+        mime = content_type.split(";", 1)[0].strip().lower()
+        if mime and mime not in _HTML_TYPES | _TEXT_TYPES | _JSON_TYPES:
+            raise UnsupportedContentError(f"不支持本地转换的内容类型: {mime}")
+
+        if mime in _TEXT_TYPES or mime in _JSON_TYPES:
+            parts = []
+            truncated = await self._read_body(response, content_type, parts.append)
+            body = "".join(parts)
+            await log_info(ctx, f"Local fetch: {url} ({mime}, {len(body)} chars)", config.debug_enabled)
+            if mime in _TEXT_TYPES:
+                return LocalPage(url, body, mime, truncated)
+            try:
+                body = json.dumps(json.loads(body), ensure_ascii=False, indent=2)
+            except ValueError:
+                pass
+            return LocalPage(url, f"```json\n{body}\n```\n", mime, truncated)
+
+        # HTML 边下载边解析，不在内存中保留完整页面
+        converter = HTMLToMarkdown(url)
+        head_parts = []
+
+        def feed(text: str) -> None:
+            if sum(map(len, head_parts)) < _SNIFF_TEXT_CHARS:
+                head_parts.append(text)
+            converter.feed(text)
+
+        truncated = await self._read_body(response, content_type, feed)
+        content = converter.close()
+        await log_info(ctx, f"Local fetch: {url} ({mime or 'unknown'}, {len(content)} chars)", config.debug_enabled)
+        needs_js = converter.text_chars < config.fetch_min_text_chars and (
+            converter.script_count > 0 or bool(_JS_REQUIRED_RE.search("".join(head_parts)))
+        )
+
+        header = ["---", f"source: {url}"]
+        title = converter.title or converter.meta.get("og_title", "")
+        if title:
+            header.append(f"title: {title}")
+        for key in ("author", "published", "description"):
+            if converter.meta.get(key):
+                header.append(f"{key}: {converter.meta[key]}")
+        header.append(f"fetched_at: {datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}")
+        if truncated:
+            header.append(f"truncated: true (超过 {config.fetch_max_bytes} 字节的部分未抓取)")
+        header.append("---")
+        return LocalPage(url, "\n".join(header) + "\n\n" + content, mime or "text/html", truncated, needs_js)
+
+    @staticmethod
+    async def _read_body(response: httpx.Response, content_type: str, sink: Callable[[str], None]) -> bool:
+        """流式读取响应体并按识别出的编码增量解码后交给 sink；超过 GROK_FETCH_MAX_BYTES 时截断，返回是否截断"""
+        max_bytes = config.fetch_max_bytes
+        received = 0
+        truncated = False
+        head = b""
+        decoder = None
+
+        async for chunk in response.aiter_bytes():
+            if received + len(chunk) > max_bytes:
+                chunk = chunk[:max_bytes - received]
+                truncated = True
+            received += len(chunk)
+            if decoder is None:
+                # 先缓存开头部分用于识别 <meta charset>
+                head += chunk
+                if len(head) < _SNIFF_BYTES and not truncated:
+                    continue
+                decoder = codecs.getincrementaldecoder(_detect_charset(content_type, head))(errors="replace")
+                chunk = head
+            sink(decoder.decode(chunk))
+            if truncated:
+                break
+
+        if decoder is None:
+            decoder = codecs.getincrementaldecoder(_detect_charset(content_type, head))(errors="replace")
+            sink(decoder.decode(head))
+        sink(decoder.decode(b"", final=True))
+        return truncated
+
+
+_fetcher: Optional[LocalFetcher] = None
+
+
+def get_local_fetcher() -> LocalFetcher:
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = LocalFetcher()
+    return _fetcher
@@ -1,29 +1,168 @@
+import atexit
+import json
 import logging
+import os
+import queue
+import threading
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
-from pathlib import Path
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Callable, Optional
+
 from .config import config
 
-LOG_DIR = config.log_dir
-LOG_DIR.mkdir(parents=True, exist_ok=True)
-LOG_FILE = LOG_DIR / f"grok_search_{datetime.now().strftime('%Y%m%d')}.log"
+# 当前请求的 ID：由工具调用中间件设置，写入每条日志
+request_id_var: ContextVar[str] = ContextVar("grok_search_request_id", default="")
+
+# 结构化字段：通过 logger.info(..., extra={...}) 传入，原样写入 JSON 行
+_EXTRA_FIELDS = ("event", "tool", "status", "elapsed_ms", "ttfb_ms", "url", "endpoint", "spans")
+
+
+class DailyRotatingFileHandler(RotatingFileHandler):
+    """按日期切换日志文件（grok_search_YYYYMMDD.log），单个文件超过 max_bytes 时按序号轮转
+
+    首次写入时才创建目录与文件。
+    """
+
+    def __init__(self, log_dir, max_bytes: int, backup_count: int):
+        self.log_dir = str(log_dir)
+        self._day = self._today()
+        super().__init__(self._path(self._day), maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now().strftime("%Y%m%d")
+
+    def _path(self, day: str) -> str:
+        return os.path.join(self.log_dir, f"grok_search_{day}.log")
+
+    def _open(self):
+        os.makedirs(self.log_dir, exist_ok=True)
+        return super()._open()
+
+    def shouldRollover(self, record) -> bool:
+        return self._today() != self._day or super().shouldRollover(record)
+
+    def doRollover(self) -> None:
+        today = self._today()
+        if today == self._day:
+            super().doRollover()
+            return
+        # 跨天：关闭当前文件，下一次写入时打开新日期的文件
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        self._day = today
+        self.baseFilename = os.path.abspath(self._path(today))
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """每条日志输出一行 JSON：时间、级别、消息、请求 ID 与结构化字段"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "msg": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", "")
+        if request_id:
+            entry["request_id"] = request_id
+        for name in _EXTRA_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                entry[name] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _RequestIdFilter(logging.Filter):
+    """在调用方线程读取 contextvar，写入日志记录（后台线程中无法读取请求上下文）"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get()
+        return True
+
+
+def _build_file_handler() -> logging.Handler:
+    handler = DailyRotatingFileHandler(config.log_dir, config.log_max_bytes, config.log_backup_count)
+    if config.log_format == "text":
+        handler.setFormatter(logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        ))
+    else:
+        handler.setFormatter(JsonLinesFormatter())
+    return handler
+
 
 logger = logging.getLogger("grok_search")
-logger.setLevel(getattr(logging, config.log_level))
+# 无效的日志级别在首次加载时只记录错误（见 get_config_info），此处退回 INFO
+logger.setLevel(getattr(logging, config.log_level, logging.INFO))
+logger.propagate = False
+
+# 事件循环只把日志记录放入队列，格式化与文件写入由 QueueListener 的后台线程完成
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_queue_handler = QueueHandler(_log_queue)
+_queue_handler.addFilter(_RequestIdFilter())
+logger.addHandler(_queue_handler)
+
+_listener: Optional[QueueListener] = QueueListener(_log_queue, _build_file_handler(), respect_handler_level=True)
+_listener.start()
+_listener_lock = threading.Lock()
+
+
+def shutdown_logging() -> None:
+    """停止后台写入线程，写出队列中剩余的日志；可重复调用
+
+    正常退出时由 atexit 调用；os._exit 不会执行 atexit，退出前需显式调用。
+    """
+    global _listener
+    with _listener_lock:
+        listener, _listener = _listener, None
+    if listener is None:
+        return
+    listener.stop()
+    for handler in listener.handlers:
+        handler.flush()
 
-file_handler = logging.FileHandler(LOG_FILE, encoding='utf-8')
-file_handler.setLevel(getattr(logging, config.log_level))
 
-formatter = logging.Formatter(
-    '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
-file_handler.setFormatter(formatter)
+atexit.register(shutdown_logging)
+
+
+@contextmanager
+def request_context(request_id: str = ""):
+    """在当前上下文中绑定请求 ID（未指定时生成随机 ID）"""
+    token = request_id_var.set(request_id or uuid.uuid4().hex[:12])
+    try:
+        yield request_id_var.get()
+    finally:
+        request_id_var.reset(token)
+
+
+def log_event(event: str, message: str = "", level: int = logging.INFO, **fields) -> None:
+    """写入一条带结构化字段的日志（如 tool、status、elapsed_ms）"""
+    if logger.isEnabledFor(level):
+        logger.log(level, message or event, extra={"event": event, **fields})
 
-logger.addHandler(file_handler)
 
 async def log_info(ctx, message: str, is_debug: bool = False):
     if is_debug:
         logger.info(message)
-        
+
     if ctx:
         await ctx.info(message)
+
+
+async def log_debug(ctx, message: Callable[[], str]):
+    """仅在 GROK_DEBUG 开启时构造并输出消息（用于完整提示词、响应内容等大段文本）"""
+    if not config.debug_enabled:
+        return
+    text = message()
+    logger.info(text)
+    if ctx:
+        await ctx.info(text)
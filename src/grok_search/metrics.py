@@ -0,0 +1,246 @@
+import math
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .tracing import record_span
+
+# 延迟类直方图的默认分桶（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+LabelValues = Tuple[str, ...]
+# 采集器返回 (指标名, 类型, 说明, [(标签字典, 值)])，在导出时调用
+Sample = Tuple[Dict[str, str], float]
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: LabelValues, **extra) -> Dict[str, str]:
+        labels = dict(zip(self.labelnames, key))
+        labels.update(extra)
+        return labels
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self._render_samples())
+        return lines
+
+    def _render_samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _render_samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self._labels(k))} {_format_value(v)}" for k, v in self._values.items()]
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        self._values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track(self, **labels):
+        """进入时加一、退出时减一（用于统计进行中的请求）"""
+        self.inc(1, **labels)
+        try:
+            yield
+        finally:
+            self.dec(1, **labels)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 标签 -> [各分桶计数（非累计）, 总和, 总数]
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                state[0][i] += 1
+                break
+        state[1] += value
+        state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _render_samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(self._labels(key, le=_format_value(bound)))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(self._labels(key, le='+Inf'))} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self._labels(key))} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self._labels(key))} {count}")
+        return lines
+
+
+class Registry:
+    """进程内指标注册表，导出为 Prometheus 文本格式（text/plain; version=0.0.4）"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Collector] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector: Collector) -> None:
+        """注册导出时才计算的指标（如缓存命中率），避免在热路径上维护重复计数"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for name, metric_type, documentation, samples in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+TOOL_REQUESTS = REGISTRY.counter("grok_search_tool_requests_total", "MCP tool calls by tool and result.", ("tool", "status"))
+TOOL_DURATION = REGISTRY.histogram("grok_search_tool_duration_seconds", "MCP tool call latency.", ("tool",))
+TOOL_IN_FLIGHT = REGISTRY.gauge("grok_search_tool_in_flight", "MCP tool calls currently running.", ("tool",))
+
+UPSTREAM_REQUESTS = REGISTRY.counter("grok_search_upstream_requests_total", "Upstream HTTP requests by provider and status code.", ("provider", "status"))
+UPSTREAM_IN_FLIGHT = REGISTRY.gauge("grok_search_upstream_in_flight", "Upstream requests currently running.", ("provider",))
+UPSTREAM_CONNECT = REGISTRY.histogram("grok_search_upstream_connect_seconds", "Time to open a new upstream connection (TCP + TLS).", ("provider",))
+UPSTREAM_TTFB = REGISTRY.histogram("grok_search_upstream_ttfb_seconds", "Time from sending an upstream request to its response headers.", ("provider",))
+UPSTREAM_FIRST_TOKEN = REGISTRY.histogram("grok_search_upstream_first_token_seconds", "Time from sending a streaming request to its first content delta.", ("provider",))
+UPSTREAM_STREAM = REGISTRY.histogram("grok_search_upstream_stream_seconds", "Total duration of upstream requests including the response body.", ("provider",))
+UPSTREAM_RETRIES = REGISTRY.counter("grok_search_upstream_retries_total", "Upstream retries by cause (429, 5xx, timeout, protocol_error, network, failover).", ("provider", "cause"))
+UPSTREAM_BYTES = REGISTRY.counter("grok_search_upstream_response_bytes_total", "Response bytes received from upstream.", ("provider",))
+
+
+# 缓存名 -> 返回缓存对象（带 hits / misses 计数）的函数；缓存未创建时返回 None
+_caches: Dict[str, Callable[[], Optional[object]]] = {}
+
+
+def register_cache(name: str, get_cache: Callable[[], Optional[object]]) -> None:
+    """登记缓存，导出时读取其 hits / misses 计数"""
+    _caches[name] = get_cache
+
+
+def _collect_caches():
+    hits, misses, ratios = [], [], []
+    for name, get_cache in _caches.items():
+        cache = get_cache()
+        if cache is None:
+            continue
+        labels = {"cache": name}
+        lookups = cache.hits + cache.misses
+        hits.append((labels, cache.hits))
+        misses.append((labels, cache.misses))
+        ratios.append((labels, cache.hits / lookups if lookups else 0.0))
+    if not hits:
+        return []
+    return [
+        ("grok_search_cache_hits_total", "counter", "Cache hits.", hits),
+        ("grok_search_cache_misses_total", "counter", "Cache misses.", misses),
+        ("grok_search_cache_hit_ratio", "gauge", "Cache hit ratio since start.", ratios),
+    ]
+
+
+REGISTRY.register_collector(_collect_caches)
+
+
+class ConnectTimer:
+    """httpx 的 trace 扩展回调：新建连接时记录 TCP 连接与 TLS 握手耗时（复用连接时不触发）"""
+
+    __slots__ = ("provider", "_started", "_connected")
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self._started: Optional[float] = None
+        self._connected: Optional[float] = None
+
+    async def __call__(self, event_name: str, info: dict) -> None:
+        if event_name == "connection.connect_tcp.started":
+            self._started, self._connected = time.monotonic(), None
+        elif event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+            self._connected = time.monotonic()
+        elif self._connected is not None and not event_name.startswith("connection."):
+            # 连接建立阶段结束（TLS 握手完成或无需 TLS），开始发送请求
+            UPSTREAM_CONNECT.observe(self._connected - self._started, provider=self.provider)
+            record_span("connect", self._started, self._connected, provider=self.provider)
+            self._started = self._connected = None
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
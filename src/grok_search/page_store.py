@@ -0,0 +1,156 @@
+import hashlib
+import re
+from typing import List, Optional, Tuple
+
+from .cache import TTLCache
+from .config import config
+from .metrics import register_cache
+
+_HEADING_RE = re.compile(r"^#{1,6}\s")
+_FENCE_RE = re.compile(r"^\s*(`{3,}|~{3,})")
+RESOURCE_URI_TEMPLATE = "resource://grok-search/fetch/{doc_id}/{page}"
+
+
+def _sections(markdown: str) -> List[str]:
+    """按标题切分为章节（代码块内的 # 不视为标题）"""
+    sections = []
+    current: List[str] = []
+    fence = ""
+    for line in markdown.splitlines(keepends=True):
+        match = _FENCE_RE.match(line)
+        if fence:
+            if match and match.group(1).startswith(fence):
+                fence = ""
+        elif match:
+            fence = match.group(1)
+        elif _HEADING_RE.match(line) and current:
+            sections.append("".join(current))
+            current = []
+        current.append(line)
+    if current:
+        sections.append("".join(current))
+    return sections
+
+
+def _split_oversized(section: str, page_chars: int) -> List[str]:
+    """超长章节按空行（段落）切分，单个段落仍超长时按字符数硬切"""
+    pieces = []
+    current = ""
+    for paragraph in re.split(r"(?<=\n\n)", section):
+        if len(current) + len(paragraph) > page_chars and current:
+            pieces.append(current)
+            current = ""
+        while len(paragraph) > page_chars:
+            pieces.append(paragraph[:page_chars])
+            paragraph = paragraph[page_chars:]
+        current += paragraph
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_markdown(markdown: str, page_chars: int) -> List[str]:
+    """将 Markdown 切分为不超过 page_chars 的页面，尽量在标题处分页"""
+    if page_chars <= 0 or len(markdown) <= page_chars:
+        return [markdown]
+    pages: List[str] = []
+    current = ""
+    for section in _sections(markdown):
+        if len(current) + len(section) <= page_chars:
+            current += section
+            continue
+        if len(section) <= page_chars:
+            pages.append(current)
+            current = section
+        else:
+            # 超长章节先填满当前页，剩余部分按段落继续分页
+            pieces = _split_oversized(current + section, page_chars)
+            pages.extend(pieces[:-1])
+            current = pieces[-1]
+    if current:
+        pages.append(current)
+    return pages
+
+
+class PageStore:
+    """服务端保存长文档的分页内容，按文档数、总字节数与过期时间淘汰"""
+
+    def __init__(self, max_documents: int, max_bytes: int, ttl: float):
+        self.ttl = ttl
+        # doc_id -> (url, pages)
+        self._documents = TTLCache(max_documents, max_bytes)
+
+    @staticmethod
+    def make_doc_id(url: str, markdown: str) -> str:
+        return hashlib.sha256(f"{url}\n{markdown}".encode("utf-8")).hexdigest()[:16]
+
+    def put(self, url: str, pages: List[str]) -> str:
+        doc_id = self.make_doc_id(url, "".join(pages))
+        self._documents.set(doc_id, (url, pages), self.ttl)
+        return doc_id
+
+    def contains(self, doc_id: str) -> bool:
+        return self._documents.contains(doc_id)
+
+    def get_page(self, doc_id: str, page: int) -> Optional[Tuple[str, str, int]]:
+        """返回 (url, 页面内容, 总页数)；文档已淘汰或页码越界时返回 None"""
+        document = self._documents.get(doc_id)
+        if document is None:
+            return None
+        url, pages = document
+        if not 1 <= page <= len(pages):
+            return None
+        return url, pages[page - 1], len(pages)
+
+    def stats(self) -> dict:
+        return self._documents.stats()
+
+
+def make_cursor(doc_id: str, page: int) -> str:
+    return f"{doc_id}:{page}"
+
+
+def parse_cursor(cursor: str) -> Optional[Tuple[str, int]]:
+    doc_id, _, page = cursor.strip().partition(":")
+    if not doc_id or not page.isdigit():
+        return None
+    return doc_id, int(page)
+
+
+def render_page(doc_id: str, url: str, content: str, page: int, total: int) -> str:
+    """页面内容附加分页说明，提示如何读取下一页"""
+    footer = f"\n\n---\n[第 {page}/{total} 页] 来源: {url}"
+    if page < total:
+        footer += (
+            f"\n下一页: 调用 web_fetch_page(cursor=\"{make_cursor(doc_id, page + 1)}\")，"
+            f"或读取资源 {RESOURCE_URI_TEMPLATE.format(doc_id=doc_id, page=page + 1)}"
+        )
+    return content.rstrip("\n") + footer + "\n"
+
+
+_page_store: Optional[PageStore] = None
+register_cache("page_store", lambda: _page_store._documents if _page_store is not None else None)
+
+
+def get_page_store() -> PageStore:
+    global _page_store
+    if _page_store is None:
+        _page_store = PageStore(
+            max_documents=config.page_store_max_documents,
+            max_bytes=config.page_store_max_bytes,
+            ttl=config.page_store_ttl,
+        )
+    return _page_store
+
+
+def paginate(url: str, markdown: str) -> str:
+    """短文档原样返回；超过 GROK_FETCH_PAGE_CHARS 的文档存入 PageStore，只返回第一页"""
+    pages = split_markdown(markdown, config.fetch_page_chars)
+    if len(pages) == 1:
+        return markdown
+    store = get_page_store()
+    doc_id = store.put(url, pages)
+    if not store.contains(doc_id):
+        # 文档超出存储上限，无法分页时原样返回
+        return markdown
+    return render_page(doc_id, url, pages[0], 1, len(pages))
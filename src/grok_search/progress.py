@@ -0,0 +1,43 @@
+import time
+from typing import List
+
+
+class StreamProgress:
+    """将上游流式增量节流为 MCP 进度通知：每 N 个增量或每 M 毫秒发送一次"""
+
+    def __init__(self, ctx, every_tokens: int, interval_ms: int):
+        self._ctx = ctx
+        self._every_tokens = max(1, every_tokens)
+        self._interval = max(0, interval_ms) / 1000.0
+        self._pending: List[str] = []
+        self._tokens = 0
+        self._last_flush = time.monotonic()
+        self._enabled = ctx is not None
+
+    async def update(self, delta: str) -> None:
+        if not self._enabled:
+            return
+        self._tokens += 1
+        self._pending.append(delta)
+        if (
+            len(self._pending) >= self._every_tokens
+            or time.monotonic() - self._last_flush >= self._interval
+        ):
+            await self._flush()
+
+    async def finish(self) -> None:
+        if self._enabled and self._pending:
+            await self._flush()
+
+    async def _flush(self) -> None:
+        text = "".join(self._pending)
+        self._pending.clear()
+        self._last_flush = time.monotonic()
+        try:
+            # progress 为累计增量数（跨重试单调递增），部分输出通过日志通知发送
+            await self._ctx.report_progress(self._tokens)
+            if text:
+                await self._ctx.info(text)
+        except Exception:
+            # 客户端通知失败不影响最终结果，后续不再发送
+            self._enabled = False
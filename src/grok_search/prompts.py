@@ -0,0 +1,86 @@
+import re
+from typing import Dict
+
+from .utils import fetch_prompt, search_prompt
+
+# 提示词档位：系统提示词在同一档位下逐字节固定（时间、查询等可变内容只放在 user 消息中），
+# 上游可以对相同前缀做缓存；token_budget 为系统提示词的估算 token 上限
+_COMPACT_SEARCH_PROMPT = """You are a web search tool. Search the web thoroughly for the user's query: try several keyword variations and prefer authoritative sources (official docs, GitHub, Stack Overflow, reputable news).
+
+Output ONLY a JSON array, with no prose and no code fences:
+[{"title": "...", "url": "https://...", "description": "..."}]
+
+Rules:
+- url: the real, complete source URL; never invent links
+- description: 1-2 sentences with the key facts, in the language of the query
+- order by relevance, merge duplicates, use "" instead of null
+- return the requested number of results
+"""
+
+_COMPACT_FETCH_PROMPT = """You fetch a web page and return its complete content as Markdown.
+
+Start with this header:
+---
+source: <url>
+title: <page title>
+fetched_at: <ISO 8601 time>
+---
+
+Then reproduce the main content unchanged and untranslated: every heading (# to ######), paragraph, list, table (| a | b | with |---|), code block with its language, quote, image ![alt](src) and link [text](href). Drop scripts, styles, ads and share buttons. Never summarize or shorten.
+"""
+
+_MINIMAL_SEARCH_PROMPT = """Search the web for the query. Reply with only a JSON array of {"title","url","description"} objects for real sources, no other text.
+"""
+
+_MINIMAL_FETCH_PROMPT = """Return the complete content of the given URL as Markdown, without summarizing or translating. Output only the Markdown.
+"""
+
+_CJK_RE = re.compile(r"[\u3000-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uff00-\uffef]")
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算 token 数：CJK 字符约 1 token/字，其余约 4 字符/token"""
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+class PromptProfile:
+    __slots__ = ("name", "search", "fetch", "token_budget")
+
+    def __init__(self, name: str, search: str, fetch: str, token_budget: int):
+        self.name = name
+        self.search = search
+        self.fetch = fetch
+        self.token_budget = token_budget
+
+    def stats(self) -> dict:
+        return {
+            "search_tokens": estimate_tokens(self.search),
+            "fetch_tokens": estimate_tokens(self.fetch),
+            "token_budget": self.token_budget,
+        }
+
+
+PROMPT_PROFILES: Dict[str, PromptProfile] = {
+    "full": PromptProfile("full", search_prompt, fetch_prompt, token_budget=4096),
+    "compact": PromptProfile("compact", _COMPACT_SEARCH_PROMPT, _COMPACT_FETCH_PROMPT, token_budget=256),
+    "minimal": PromptProfile("minimal", _MINIMAL_SEARCH_PROMPT, _MINIMAL_FETCH_PROMPT, token_budget=64),
+}
+
+
+# auto：按查询复杂度选择档位（见 query_analysis），抓取请求使用 full
+AUTO_PROFILE = "auto"
+
+
+def normalize_prompt_profile(name: str) -> str:
+    """校验档位名称，返回规范化的名称（包括 auto）"""
+    key = name.strip().lower()
+    if key != AUTO_PROFILE and key not in PROMPT_PROFILES:
+        raise ValueError(f"未知的提示词档位: {name}，可选值: {', '.join(PROMPT_PROFILES)}, {AUTO_PROFILE}")
+    return key
+
+
+def get_prompt_profile(name: str, suggested: str = "full") -> PromptProfile:
+    """按名称获取档位；名称为 auto 时使用 suggested"""
+    key = normalize_prompt_profile(name)
+    return PROMPT_PROFILES[suggested if key == AUTO_PROFILE else key]
@@ -1,4 +1,19 @@
-from .base import BaseSearchProvider, SearchResult
-from .grok import GrokSearchProvider
+from importlib import import_module
 
-__all__ = ["BaseSearchProvider", "SearchResult", "GrokSearchProvider"]
+# 按需导入：Provider 依赖 httpx / tenacity，避免在启动时加载
+_EXPORTS = {
+    "BaseSearchProvider": ".base",
+    "SearchResult": ".base",
+    "GrokSearchProvider": ".grok",
+    "TavilySearchProvider": ".tavily",
+    "FallbackSearchProvider": ".router",
+}
+
+__all__ = ["BaseSearchProvider", "SearchResult", "GrokSearchProvider", "TavilySearchProvider", "FallbackSearchProvider"]
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(module, __name__), name)
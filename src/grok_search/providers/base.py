@@ -1,8 +1,10 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 
 class SearchResult:
+    __slots__ = ("title", "url", "snippet", "source", "published_date")
+
     def __init__(
         self,
         title: str,
@@ -17,6 +19,27 @@ class SearchResult:
         self.source = source
         self.published_date = published_date
 
+    @classmethod
+    def from_dict(cls, data: dict) -> Optional["SearchResult"]:
+        """从模型输出的结果对象构造，缺少有效 URL 时返回 None"""
+        def text(*keys: str) -> str:
+            for key in keys:
+                value = data.get(key)
+                if isinstance(value, str) and value.strip():
+                    return value.strip()
+            return ""
+
+        url = text("url", "link", "href")
+        if not url:
+            return None
+        return cls(
+            title=text("title", "name") or url,
+            url=url,
+            snippet=text("description", "snippet", "summary", "content"),
+            source=text("source", "site"),
+            published_date=text("published_date", "date", "published"),
+        )
+
     def to_dict(self) -> Dict[str, str]:
         return {
             "title": self.title,
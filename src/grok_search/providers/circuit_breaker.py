@@ -0,0 +1,149 @@
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+import httpx
+
+from ..config import config
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """上游端点熔断中，请求被快速拒绝"""
+
+    def __init__(self, api_url: str, retry_in: float):
+        self.api_url = api_url
+        self.retry_in = retry_in
+        super().__init__(
+            f"上游服务 {api_url} 近期连续失败，已熔断，约 {retry_in:.0f} 秒后重新探测。"
+            f"可使用 get_config_info 检查连接状态"
+        )
+
+
+def _is_endpoint_failure(exc: BaseException) -> bool:
+    """判断异常是否说明端点不可用（超时、网络错误、5xx）；4xx/429 说明端点可达"""
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status >= 500 or status == 408
+    return isinstance(exc, (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError))
+
+
+class CircuitBreaker:
+    """单个上游端点的熔断器：滑动窗口内失败率过高时打开，冷却后半开放行单个探测请求"""
+
+    def __init__(self, api_url: str, failure_rate: float, min_requests: int, window: float, open_seconds: float):
+        self.api_url = api_url
+        self.failure_rate = failure_rate
+        self.min_requests = max(1, min_requests)
+        self.window = window
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self.opened_total = 0
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def before_request(self) -> None:
+        """请求前检查：熔断中直接抛出 CircuitOpenError，半开状态只放行一个探测请求"""
+        if self.state == OPEN:
+            remaining = self._opened_at + self.open_seconds - time.monotonic()
+            if remaining > 0:
+                raise CircuitOpenError(self.api_url, remaining)
+            self.state = HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == HALF_OPEN:
+            if self._probe_in_flight:
+                raise CircuitOpenError(self.api_url, self.open_seconds)
+            self._probe_in_flight = True
+
+    def is_available(self) -> bool:
+        """不改变状态地判断当前是否会放行请求"""
+        if self.state == OPEN:
+            return time.monotonic() >= self._opened_at + self.open_seconds
+        if self.state == HALF_OPEN:
+            return not self._probe_in_flight
+        return True
+
+    def record_success(self) -> None:
+        if self.state == HALF_OPEN:
+            self._close()
+            return
+        self._record(True)
+
+    def record_exception(self, exc: BaseException) -> None:
+        if _is_endpoint_failure(exc):
+            if self.state == HALF_OPEN:
+                self._open()
+            else:
+                self._record(False)
+        elif isinstance(exc, httpx.HTTPStatusError):
+            # 4xx/429 说明端点可达
+            self.record_success()
+        elif self.state == HALF_OPEN:
+            # 取消等与端点无关的异常：不计入统计，释放半开探测名额
+            self._probe_in_flight = False
+
+    def _record(self, ok: bool) -> None:
+        if self.state == OPEN:
+            # 熔断前已发出的请求结果不再计入
+            return
+        now = time.monotonic()
+        self._outcomes.append((now, ok))
+        while self._outcomes and self._outcomes[0][0] < now - self.window:
+            self._outcomes.popleft()
+        if ok or len(self._outcomes) < self.min_requests:
+            return
+        failures = sum(1 for _, outcome in self._outcomes if not outcome)
+        if failures / len(self._outcomes) >= self.failure_rate:
+            self._open()
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_total += 1
+        self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+        self._outcomes.clear()
+
+    def _close(self) -> None:
+        self.state = CLOSED
+        self._probe_in_flight = False
+        self._outcomes.clear()
+
+    def stats(self) -> dict:
+        failures = sum(1 for _, outcome in self._outcomes if not outcome)
+        info = {
+            "state": self.state,
+            "window_requests": len(self._outcomes),
+            "window_failures": failures,
+            "opened_total": self.opened_total,
+        }
+        if self.state == OPEN:
+            info["retry_in_seconds"] = round(max(0.0, self._opened_at + self.open_seconds - time.monotonic()), 1)
+        return info
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(api_url: str) -> Optional[CircuitBreaker]:
+    """获取指定上游端点的熔断器；未启用时返回 None"""
+    if not config.breaker_enabled:
+        return None
+    breaker = _breakers.get(api_url)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            api_url,
+            failure_rate=config.breaker_failure_rate,
+            min_requests=config.breaker_min_requests,
+            window=config.breaker_window,
+            open_seconds=config.breaker_open_seconds,
+        )
+        _breakers[api_url] = breaker
+    return breaker
+
+
+def get_circuit_breaker_stats() -> Dict[str, dict]:
+    return {api_url: breaker.stats() for api_url, breaker in _breakers.items()}
@@ -0,0 +1,253 @@
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Iterable, List, Optional, Tuple
+
+import httpx
+
+from .circuit_breaker import get_circuit_breaker
+from .retry import is_retryable_exception, parse_retry_after
+from ..config import config
+
+# 这些状态码说明端点暂不可用（鉴权失败、限流、服务端错误），应暂时摘除
+EJECT_STATUS_CODES = {401, 403, 429, 500, 502, 503, 504}
+# 尚无延迟样本的端点按该值估算，保证新端点也能被选中
+_DEFAULT_LATENCY = 1.0
+_EWMA_ALPHA = 0.3
+# 失败的请求按实际耗时与当前估计值的该倍数中较大者计入延迟，避免快速返回的错误拉低延迟估计
+_FAILURE_PENALTY = 2.0
+
+
+async def probe_models(client: httpx.AsyncClient, api_url: str, api_key: str, timeout: float = 10.0) -> Tuple[bool, dict]:
+    """请求 /models 端点测试连通性，返回 (是否可用, 测试结果)"""
+    test_result = {
+        "status": "未测试",
+        "message": "",
+        "response_time_ms": 0
+    }
+    ok = False
+
+    try:
+        models_url = f"{api_url.rstrip('/')}/models"
+        start_time = time.time()
+
+        response = await client.get(
+            models_url,
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json"
+            },
+            timeout=timeout,
+        )
+
+        response_time = (time.time() - start_time) * 1000  # 转换为毫秒
+
+        if response.status_code == 200:
+            ok = True
+            test_result["status"] = "✅ 连接成功"
+            test_result["message"] = f"成功获取模型列表 (HTTP {response.status_code})"
+            test_result["response_time_ms"] = round(response_time, 2)
+
+            # 尝试解析返回的模型列表
+            try:
+                models_data = response.json()
+                if "data" in models_data and isinstance(models_data["data"], list):
+                    model_count = len(models_data["data"])
+                    test_result["message"] += f"，共 {model_count} 个模型"
+
+                    # 提取所有模型的 ID/名称
+                    model_names = []
+                    for model in models_data["data"]:
+                        if isinstance(model, dict) and "id" in model:
+                            model_names.append(model["id"])
+
+                    if model_names:
+                        test_result["available_models"] = model_names
+            except:
+                pass
+        else:
+            test_result["status"] = "⚠️ 连接异常"
+            test_result["message"] = f"HTTP {response.status_code}: {response.text[:100]}"
+            test_result["response_time_ms"] = round(response_time, 2)
+
+    except httpx.TimeoutException:
+        test_result["status"] = "❌ 连接超时"
+        test_result["message"] = f"请求超时（{timeout:g}秒），请检查网络连接或 API URL"
+    except httpx.RequestError as e:
+        test_result["status"] = "❌ 连接失败"
+        test_result["message"] = f"网络错误: {str(e)}"
+    except Exception as e:
+        test_result["status"] = "❌ 测试失败"
+        test_result["message"] = f"未知错误: {str(e)}"
+
+    return ok, test_result
+
+
+class Endpoint:
+    __slots__ = (
+        "name", "url", "key", "weight", "latency", "probe_latency", "in_flight", "ejected_until", "throttled_until", "last_error",
+    )
+
+    def __init__(self, url: str, key: str, weight: float = 1.0, name: str = ""):
+        self.url = url.rstrip("/")
+        # 同一 URL 配置多个 Key 时用 name 区分限速器与熔断器
+        self.name = name or self.url
+        self.key = key
+        self.weight = max(weight, 0.01)
+        # 请求的首字节延迟（EWMA），用于选择端点
+        self.latency: Optional[float] = None
+        # 最近一次健康探测（/models）的往返时间，仅用于展示
+        self.probe_latency: Optional[float] = None
+        self.in_flight = 0
+        self.ejected_until = 0.0
+        # 因 429 摘除的截止时间（至少到 Retry-After），健康探测成功也不提前恢复
+        self.throttled_until = 0.0
+        self.last_error = ""
+
+    def available(self, now: float) -> bool:
+        if now < self.ejected_until:
+            return False
+        breaker = get_circuit_breaker(self.name)
+        return breaker is None or breaker.is_available()
+
+    def score(self) -> float:
+        """越小越优先：近期延迟 × (在途请求数 + 1) / 权重"""
+        latency = self.latency if self.latency is not None else _DEFAULT_LATENCY
+        return latency * (self.in_flight + 1) / self.weight
+
+
+class EndpointPool:
+    """多端点 / 多 Key 负载均衡：选择延迟最低、在途请求最少的端点，出错端点自动摘除"""
+
+    def __init__(self, endpoints: Iterable[Endpoint], eject_seconds: float):
+        self.endpoints: List[Endpoint] = list(endpoints)
+        self.eject_seconds = eject_seconds
+
+    def select(self, exclude: Iterable[Endpoint] = ()) -> Endpoint:
+        now = time.monotonic()
+        excluded = set(exclude)
+        candidates = [e for e in self.endpoints if e not in excluded and e.available(now)]
+        if not candidates:
+            # 全部不可用时选择最早恢复的端点，交由熔断器 / 重试决定结果
+            candidates = [e for e in self.endpoints if e not in excluded] or self.endpoints
+            return min(candidates, key=lambda e: e.ejected_until)
+        best = min(e.score() for e in candidates)
+        return random.choice([e for e in candidates if e.score() == best])
+
+    def has_alternative(self, exclude: Iterable[Endpoint]) -> bool:
+        now = time.monotonic()
+        excluded = set(exclude)
+        return any(e not in excluded and e.available(now) for e in self.endpoints)
+
+    def observe_latency(self, endpoint: Endpoint, seconds: float) -> None:
+        if endpoint.latency is None:
+            endpoint.latency = seconds
+        else:
+            endpoint.latency = _EWMA_ALPHA * seconds + (1 - _EWMA_ALPHA) * endpoint.latency
+
+    def eject(self, endpoint: Endpoint, reason: str, seconds: Optional[float] = None) -> None:
+        endpoint.ejected_until = max(
+            endpoint.ejected_until, time.monotonic() + (seconds if seconds is not None else self.eject_seconds),
+        )
+        endpoint.last_error = reason
+
+    def report_exception(self, endpoint: Endpoint, exc: BaseException, elapsed: Optional[float] = None) -> bool:
+        """记录端点请求失败：错误状态码与连接 / 超时等传输错误会摘除端点，返回是否已摘除
+
+        elapsed 为本次请求已耗费的秒数，失败的请求同样计入延迟估计（带惩罚）。
+        """
+        seconds = None
+        if isinstance(exc, httpx.HTTPStatusError):
+            if exc.response.status_code not in EJECT_STATUS_CODES:
+                return False
+            reason = f"HTTP {exc.response.status_code}"
+            if exc.response.status_code == 429:
+                seconds = max(parse_retry_after(exc.response) or 0.0, self.eject_seconds)
+                endpoint.throttled_until = time.monotonic() + seconds
+        elif is_retryable_exception(exc):
+            reason = type(exc).__name__
+        else:
+            return False
+        if elapsed is not None:
+            current = endpoint.latency if endpoint.latency is not None else _DEFAULT_LATENCY
+            self.observe_latency(endpoint, max(elapsed, current * _FAILURE_PENALTY))
+        self.eject(endpoint, reason, seconds)
+        return True
+
+    @asynccontextmanager
+    async def track(self, endpoint: Endpoint):
+        """统计在途请求数"""
+        endpoint.in_flight += 1
+        try:
+            yield endpoint
+        finally:
+            endpoint.in_flight -= 1
+
+    async def check_health(self, client: httpx.AsyncClient) -> None:
+        """通过 /models 探测所有端点：可用则恢复（429 摘除保留到 Retry-After 截止），不可用则摘除到下次探测
+
+        探测耗时单独记录，不计入请求延迟估计（/models 的往返时间与对话请求的首字节延迟不可比）。
+        """
+        async def check(endpoint: Endpoint):
+            ok, result = await probe_models(client, endpoint.url, endpoint.key)
+            if ok:
+                if endpoint.throttled_until > time.monotonic():
+                    endpoint.ejected_until = endpoint.throttled_until
+                else:
+                    endpoint.ejected_until = 0.0
+                    endpoint.last_error = ""
+                endpoint.probe_latency = result["response_time_ms"] / 1000
+            else:
+                self.eject(endpoint, result["message"], config.endpoint_health_interval)
+
+        await asyncio.gather(*(check(endpoint) for endpoint in self.endpoints))
+
+    def stats(self) -> List[dict]:
+        now = time.monotonic()
+        return [
+            {
+                "name": e.name,
+                "url": e.url,
+                "api_key": config._mask_api_key(e.key),
+                "weight": e.weight,
+                "available": e.available(now),
+                "latency_ms": round(e.latency * 1000, 2) if e.latency is not None else None,
+                "probe_ms": round(e.probe_latency * 1000, 2) if e.probe_latency is not None else None,
+                "in_flight": e.in_flight,
+                "ejected_for_seconds": round(max(0.0, e.ejected_until - now), 1),
+                "last_error": e.last_error,
+            }
+            for e in self.endpoints
+        ]
+
+
+_pool: Optional[EndpointPool] = None
+
+
+def get_endpoint_pool() -> Optional[EndpointPool]:
+    """获取多端点池；仅配置了 GROK_API_ENDPOINTS 时启用"""
+    global _pool
+    if _pool is None:
+        endpoints = config.api_endpoints
+        if not endpoints:
+            return None
+        urls = [e["url"].rstrip("/") for e in endpoints]
+        _pool = EndpointPool(
+            (
+                Endpoint(e["url"], e["key"], e.get("weight", 1.0), name=f"{url}#{i}" if urls.count(url) > 1 else url)
+                for i, (e, url) in enumerate(zip(endpoints, urls))
+            ),
+            eject_seconds=config.endpoint_eject_seconds,
+        )
+    return _pool
+
+
+async def run_health_checks(pool: EndpointPool, client_factory) -> None:
+    """后台定期探测端点健康状态，直到任务被取消"""
+    while True:
+        try:
+            await pool.check_health(client_factory())
+        except Exception:
+            pass
+        await asyncio.sleep(config.endpoint_health_interval)
@@ -1,15 +1,25 @@
-import httpx
 import json
+import time
 from datetime import datetime, timezone
-from email.utils import parsedate_to_datetime
 from typing import List, Optional
-from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_random_exponential
-from tenacity.wait import wait_base
-from zoneinfo import ZoneInfo
 from .base import BaseSearchProvider, SearchResult
-from ..utils import search_prompt, fetch_prompt
-from ..logger import log_info
+from .sse import ChatStreamDecoder
+from .results import SearchResultCollector, parse_search_results
+from .retry import upstream_retrying
+from .upstream import upstream_request
+from .endpoint_pool import Endpoint, EndpointPool
+from ..utils import canonicalize_url
+from ..prompts import PromptProfile, get_prompt_profile
+from ..query_analysis import analyze_query
+from ..logger import log_debug, log_info
 from ..config import config
+from ..http_client import get_http_client
+from ..cache import get_search_cache, search_cache_key
+from ..fetch_cache import FetchCache, get_fetch_cache
+from ..singleflight import SingleFlight
+from ..progress import StreamProgress
+from ..tracing import record_span, span
+from ..metrics import UPSTREAM_FIRST_TOKEN, UPSTREAM_RETRIES
 
 
 def get_local_time_info() -> str:
@@ -19,6 +29,8 @@ def get_local_time_info() -> str:
         # 优先使用 TZ 环境变量指定的时区
         tz_name = os.environ.get("TZ", "")
         if tz_name:
+            from zoneinfo import ZoneInfo
+
             local_tz = ZoneInfo(tz_name)
         else:
             local_tz = datetime.now().astimezone().tzinfo
@@ -39,102 +51,49 @@ def get_local_time_info() -> str:
     )
 
 
-def _needs_time_context(query: str) -> bool:
-    """检查查询是否需要时间上下文"""
-    # 中文时间相关关键词
-    cn_keywords = [
-        "当前", "现在", "今天", "明天", "昨天",
-        "本周", "上周", "下周", "这周",
-        "本月", "上月", "下月", "这个月",
-        "今年", "去年", "明年",
-        "最新", "最近", "近期", "刚刚", "刚才",
-        "实时", "即时", "目前",
-    ]
-    # 英文时间相关关键词
-    en_keywords = [
-        "current", "now", "today", "tomorrow", "yesterday",
-        "this week", "last week", "next week",
-        "this month", "last month", "next month",
-        "this year", "last year", "next year",
-        "latest", "recent", "recently", "just now",
-        "real-time", "realtime", "up-to-date",
-    ]
-
-    query_lower = query.lower()
-
-    for keyword in cn_keywords:
-        if keyword in query:
-            return True
-
-    for keyword in en_keywords:
-        if keyword in query_lower:
-            return True
-
-    return False
-
-RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
-
-
-def _is_retryable_exception(exc) -> bool:
-    """检查异常是否可重试"""
-    if isinstance(exc, (httpx.TimeoutException, httpx.NetworkError, httpx.ConnectError, httpx.RemoteProtocolError)):
-        return True
-    if isinstance(exc, httpx.HTTPStatusError):
-        return exc.response.status_code in RETRYABLE_STATUS_CODES
-    return False
-
-
-class _WaitWithRetryAfter(wait_base):
-    """等待策略：优先使用 Retry-After 头，否则使用指数退避"""
-
-    def __init__(self, multiplier: float, max_wait: int):
-        self._base_wait = wait_random_exponential(multiplier=multiplier, max=max_wait)
-        self._protocol_error_base = 3.0
-
-    def __call__(self, retry_state):
-        if retry_state.outcome and retry_state.outcome.failed:
-            exc = retry_state.outcome.exception()
-            if isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code == 429:
-                retry_after = self._parse_retry_after(exc.response)
-                if retry_after is not None:
-                    return retry_after
-            if isinstance(exc, httpx.RemoteProtocolError):
-                return self._base_wait(retry_state) + self._protocol_error_base
-        return self._base_wait(retry_state)
-
-    def _parse_retry_after(self, response: httpx.Response) -> Optional[float]:
-        """解析 Retry-After 头（支持秒数或 HTTP 日期格式）"""
-        header = response.headers.get("Retry-After")
-        if not header:
-            return None
-        header = header.strip()
-
-        if header.isdigit():
-            return float(header)
-
-        try:
-            retry_dt = parsedate_to_datetime(header)
-            if retry_dt.tzinfo is None:
-                retry_dt = retry_dt.replace(tzinfo=timezone.utc)
-            delay = (retry_dt - datetime.now(timezone.utc)).total_seconds()
-            return max(0.0, delay)
-        except (TypeError, ValueError):
-            return None
-
+# 进程内合并相同的并发搜索/抓取请求
+_search_flight = SingleFlight()
+_fetch_flight = SingleFlight()
 
 class GrokSearchProvider(BaseSearchProvider):
-    def __init__(self, api_url: str, api_key: str, model: str = "grok-4-fast"):
+    def __init__(self, api_url: str, api_key: str, model: str = "grok-4-fast", endpoint_pool: Optional[EndpointPool] = None):
         super().__init__(api_url, api_key)
         self.model = model
+        # 配置了多端点时按负载选择端点，否则固定使用 api_url / api_key
+        self.endpoint_pool = endpoint_pool
 
     def get_provider_name(self) -> str:
         return "Grok"
 
-    async def search(self, query: str, platform: str = "", min_results: int = 3, max_results: int = 10, ctx=None) -> List[SearchResult]:
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
+    async def search(self, query: str, platform: str = "", min_results: int = 3, max_results: int = 10, ctx=None, bypass_cache: bool = False, prompt_profile: str = "") -> List[SearchResult]:
+        with span("analyze_query") as attrs:
+            analysis = analyze_query(query)
+            attrs.update(analysis.to_dict())
+        # 提示词档位（auto 时）、模型与缓存 TTL 均由查询分析结果决定
+        profile = get_prompt_profile(prompt_profile or config.prompt_profile, analysis.suggested_profile)
+        model = analysis.choose_model(self.model, config.complex_query_model)
+        cache = get_search_cache()
+        cache_key = search_cache_key(query, platform, min_results, max_results, f"{model}/{profile.name}")
+        if not bypass_cache:
+            with span("cache_lookup", cache="search") as attrs:
+                cached = cache.get(cache_key)
+                attrs["hit"] = cached is not None
+            if cached is not None:
+                await log_info(ctx, "Search cache hit", config.debug_enabled)
+                return cached
+
+        async def search_and_cache():
+            results = await self._search_upstream(query, platform, min_results, max_results, profile, ctx, model)
+            if results:
+                # 时间敏感的查询结果过期更快
+                cache.set(cache_key, results, analysis.cache_ttl(config))
+            return results
+
+        return await _search_flight.do(cache_key, search_and_cache)
+
+    def build_search_payload(self, query: str, platform: str, min_results: int, max_results: int, profile: PromptProfile, model: str = "") -> dict:
+        """构造搜索请求体：系统提示词固定为档位内容，查询、平台与时间等可变信息只放在 user 消息中"""
+        analysis = analyze_query(query)
         platform_prompt = ""
         return_prompt = ""
 
@@ -145,105 +104,141 @@ class GrokSearchProvider(BaseSearchProvider):
             return_prompt = "\n\nYou should return the results in a JSON format, and the results should at least be " + str(min_results) + " and at most be " + str(max_results) + " results."
 
         # 仅在查询包含时间相关关键词时注入当前时间信息
-        if _needs_time_context(query):
+        if analysis.time_sensitive:
             time_context = get_local_time_info() + "\n"
         else:
             time_context = ""
 
-        payload = {
-            "model": self.model,
+        return {
+            "model": model or self.model,
             "messages": [
                 {
                     "role": "system",
-                    "content": search_prompt,
+                    "content": profile.search,
                 },
                 {"role": "user", "content": time_context + query + platform_prompt + return_prompt },
             ],
             "stream": True,
         }
 
-        if time_context:
-            await log_info(ctx, f"time_context: {time_context.strip()}", config.debug_enabled)
-        await log_info(ctx, f"platform_prompt: { query + platform_prompt + return_prompt}", config.debug_enabled)
-
-        return await self._execute_stream_with_retry(headers, payload, ctx)
-
-    async def fetch(self, url: str, ctx=None) -> str:
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
-        payload = {
+    async def _search_upstream(self, query: str, platform: str, min_results: int, max_results: int, profile: PromptProfile, ctx=None, model: str = "") -> List[SearchResult]:
+        payload = self.build_search_payload(query, platform, min_results, max_results, profile, model)
+        await log_debug(ctx, lambda: f"model: {payload['model']}, prompt_profile: {profile.name}, user_prompt: {payload['messages'][-1]['content']}")
+
+        content = await self._execute_stream_with_retry(payload, ctx, max_items=max_results)
+        with span("parse"):
+            return parse_search_results(content, max_results)
+
+    async def fetch(self, url: str, ctx=None, bypass_cache: bool = False, prompt_profile: str = "") -> str:
+        profile = get_prompt_profile(prompt_profile or config.prompt_profile)
+        cache = get_fetch_cache()
+        cache_key = FetchCache.make_key(canonicalize_url(url), f"{self.model}/{profile.name}")
+        if cache is not None and not bypass_cache:
+            with span("cache_lookup", cache="fetch") as attrs:
+                cached = await cache.aget(cache_key)
+                attrs["hit"] = cached is not None
+            if cached is not None:
+                await log_info(ctx, "Fetch cache hit", config.debug_enabled)
+                return cached
+
+        async def fetch_and_cache():
+            content = await self._fetch_upstream(url, profile, ctx)
+            if cache is not None and content:
+                await cache.aset(cache_key, content, config.fetch_cache_ttl)
+            return content
+
+        return await _fetch_flight.do(cache_key, fetch_and_cache)
+
+    def build_fetch_payload(self, url: str, profile: PromptProfile) -> dict:
+        return {
             "model": self.model,
             "messages": [
                 {
                     "role": "system",
-                    "content": fetch_prompt,
+                    "content": profile.fetch,
                 },
                 {"role": "user", "content": url + "\n获取该网页内容并返回其结构化Markdown格式" },
             ],
             "stream": True,
         }
-        return await self._execute_stream_with_retry(headers, payload, ctx)
 
-    async def _parse_streaming_response(self, response, ctx=None) -> str:
-        content = ""
-        full_body_buffer = [] 
-        
+    async def _fetch_upstream(self, url: str, profile: PromptProfile, ctx=None) -> str:
+        return await self._execute_stream_with_retry(self.build_fetch_payload(url, profile), ctx)
+
+    async def _parse_streaming_response(self, response, ctx=None, progress: Optional[StreamProgress] = None, max_items: int = 0,
+                                        sent_at: Optional[float] = None) -> str:
+        decoder = ChatStreamDecoder(response.headers.get("content-type", ""))
+        # 搜索请求：边接收边解析 JSON 数组，凑够 max_items 个有效结果即提前结束
+        collector = SearchResultCollector(max_items) if max_items else None
+
         async for line in response.aiter_lines():
-            line = line.strip()
-            if not line:
+            delta = decoder.feed(line)
+            if not delta:
                 continue
-            
-            full_body_buffer.append(line)
-
-            # 兼容 "data: {...}" 和 "data:{...}" 两种 SSE 格式
-            if line.startswith("data:"):
-                if line in ("data: [DONE]", "data:[DONE]"):
-                    continue
-                try:
-                    # 去掉 "data:" 前缀，并去除可能的空格
-                    json_str = line[5:].lstrip()
-                    data = json.loads(json_str)
-                    choices = data.get("choices", [])
-                    if choices and len(choices) > 0:
-                        delta = choices[0].get("delta", {})
-                        if "content" in delta:
-                            content += delta["content"]
-                except (json.JSONDecodeError, IndexError):
-                    continue
-                
-        if not content and full_body_buffer:
-            try:
-                full_text = "".join(full_body_buffer)
-                data = json.loads(full_text)
-                if "choices" in data and len(data["choices"]) > 0:
-                    message = data["choices"][0].get("message", {})
-                    content = message.get("content", "")
-            except json.JSONDecodeError:
-                pass
-        
-        await log_info(ctx, f"content: {content}", config.debug_enabled)
+            if sent_at is not None:
+                UPSTREAM_FIRST_TOKEN.observe(time.monotonic() - sent_at, provider="grok")
+                record_span("first_token", sent_at)
+                sent_at = None
+            if progress is not None:
+                await progress.update(delta)
+            if collector is not None and collector.feed(delta):
+                break
+
+        if collector is not None and collector.enough:
+            # 提前终止时丢弃未完成的尾部，只保留已完整的结果对象
+            content = json.dumps(collector.items, ensure_ascii=False)
+            await log_info(ctx, f"Stream closed early after {max_items} results", config.debug_enabled)
+        else:
+            content = decoder.finish()
+
+        if progress is not None:
+            await progress.finish()
+
+        await log_debug(ctx, lambda: f"content: {content}")
 
         return content
 
-    async def _execute_stream_with_retry(self, headers: dict, payload: dict, ctx=None) -> str:
+    async def _execute_stream_with_retry(self, payload: dict, ctx=None, max_items: int = 0) -> str:
         """执行带重试机制的流式 HTTP 请求"""
-        timeout = httpx.Timeout(connect=6.0, read=120.0, write=10.0, pool=None)
-
-        async with httpx.AsyncClient(timeout=timeout, follow_redirects=True) as client:
-            async for attempt in AsyncRetrying(
-                stop=stop_after_attempt(config.retry_max_attempts + 1),
-                wait=_WaitWithRetryAfter(config.retry_multiplier, config.retry_max_wait),
-                retry=retry_if_exception(_is_retryable_exception),
-                reraise=True,
-            ):
-                with attempt:
-                    async with client.stream(
-                        "POST",
-                        f"{self.api_url}/chat/completions",
-                        headers=headers,
-                        json=payload,
-                    ) as response:
-                        response.raise_for_status()
-                        return await self._parse_streaming_response(response, ctx)
+        client = get_http_client()
+        progress = None
+        if ctx is not None and config.stream_progress_enabled:
+            progress = StreamProgress(ctx, config.stream_progress_tokens, config.stream_progress_interval_ms)
+
+        async for attempt in upstream_retrying("grok"):
+            with attempt, span("attempt", number=attempt.retry_state.attempt_number):
+                if self.endpoint_pool is None:
+                    return await self._attempt(client, self.api_url, self.api_key, self.api_url, payload, ctx, progress, max_items)
+
+                # 多端点：被摘除的端点（401/429/5xx、连接失败、超时）立即切换到其他端点，不消耗重试次数
+                tried = []
+                while True:
+                    endpoint = self.endpoint_pool.select(exclude=tried)
+                    tried.append(endpoint)
+                    started = time.monotonic()
+                    try:
+                        async with self.endpoint_pool.track(endpoint):
+                            return await self._attempt(
+                                client, endpoint.url, endpoint.key, endpoint.name, payload, ctx, progress, max_items,
+                                endpoint=endpoint, requeue_throttled=not self.endpoint_pool.has_alternative(tried),
+                            )
+                    except Exception as exc:
+                        ejected = self.endpoint_pool.report_exception(endpoint, exc, time.monotonic() - started)
+                        if not ejected or not self.endpoint_pool.has_alternative(tried):
+                            raise
+                        UPSTREAM_RETRIES.inc(provider="grok", cause="failover")
+                        await log_info(ctx, f"Endpoint {endpoint.name} failed ({endpoint.last_error}), failing over", config.debug_enabled)
+
+    async def _attempt(self, client, api_url: str, api_key: str, name: str, payload: dict, ctx, progress, max_items: int,
+                       endpoint: Optional[Endpoint] = None, requeue_throttled: bool = True) -> str:
+        """向单个端点发起一次请求（经过该端点的熔断器与限速器）并解析流式响应"""
+        headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        }
+        async with upstream_request(client, "grok", name, f"{api_url}/chat/completions", headers, payload, ctx,
+                                    requeue_throttled) as call:
+            if endpoint is not None:
+                # 只记录成功响应的首字节延迟，失败由 report_exception 计入
+                self.endpoint_pool.observe_latency(endpoint, call.ttfb)
+            return await self._parse_streaming_response(call.response, ctx, progress, max_items, call.sent_at)
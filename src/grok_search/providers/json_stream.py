@@ -0,0 +1,115 @@
+import json
+from typing import List
+
+
+class IncrementalJSONArrayParser:
+    """增量解析模型输出中的 JSON 数组，流式到达时即可取出已完整的对象
+
+    从第一个后跟 `{` 的 `[` 开始解析（兼容 ```json 代码块或前置说明文字中的 [1]、[链接](url) 等），
+    某个数组结束时仍未解析出任何对象则从其后的下一个候选 `[` 重新开始。
+    数组中的非对象元素与无法解析的对象会被跳过。
+    """
+
+    def __init__(self):
+        self.items: List[dict] = []
+        self.done = False
+        self._buf: List[str] = []
+        # 尚未定位数组起点时，保留以 `[` 开头、后续字符尚未到达的末尾文本
+        self._pending = ""
+        self._started = False
+        self._array_items = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._collecting = False
+
+    def feed(self, text: str) -> List[dict]:
+        """输入一段文本，返回本次新解析出的完整对象"""
+        new_items: List[dict] = []
+        while text and not self.done:
+            if not self._started:
+                text = self._locate(text)
+                if not self._started:
+                    break
+            text = self._consume(text, new_items)
+        self.items.extend(new_items)
+        return new_items
+
+    def _locate(self, text: str) -> str:
+        """查找数组起点，找到时返回 `[` 之后的文本"""
+        text = self._pending + text
+        self._pending = ""
+        pos = 0
+        while True:
+            idx = text.find("[", pos)
+            if idx < 0:
+                return ""
+            rest = text[idx + 1:].lstrip()
+            if not rest:
+                # `[` 之后的内容还未到达
+                self._pending = text[idx:]
+                return ""
+            if rest[0] == "{":
+                self._started = True
+                return text[idx + 1:]
+            pos = idx + 1
+
+    def _consume(self, text: str, new_items: List[dict]) -> str:
+        """解析数组内容；数组结束但没有解析出对象时重置状态，返回剩余文本以便重新定位"""
+        seg_start = 0 if self._collecting else None
+        for i, ch in enumerate(text):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                if self._depth == 0 and ch == "{":
+                    self._collecting = True
+                    seg_start = i
+                self._depth += 1
+            elif ch in "}]":
+                if self._depth == 0:
+                    # 顶层数组结束
+                    if self._array_items:
+                        self.done = True
+                        return ""
+                    self._reset()
+                    return text[i + 1:]
+                self._depth -= 1
+                if self._depth == 0 and self._collecting:
+                    self._buf.append(text[seg_start:i + 1])
+                    item = self._complete()
+                    if item is not None:
+                        self._array_items += 1
+                        new_items.append(item)
+                    seg_start = None
+
+        if self._collecting and seg_start is not None:
+            self._buf.append(text[seg_start:])
+        return ""
+
+    def _reset(self) -> None:
+        self._buf.clear()
+        self._started = False
+        self._array_items = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._collecting = False
+
+    def _complete(self):
+        raw = "".join(self._buf)
+        self._buf.clear()
+        self._collecting = False
+        try:
+            item = json.loads(raw)
+        except ValueError:
+            return None
+        return item if isinstance(item, dict) else None
@@ -0,0 +1,106 @@
+import asyncio
+import time
+from typing import Dict, Optional
+
+from ..config import config
+
+
+class AdaptiveRateLimiter:
+    """进程级自适应限速器：令牌桶控制发送速率，AIMD 根据 429 / Retry-After 调整速率
+
+    - 每次成功请求速率加性增加，收到 429 时乘性减少（同一冷却窗口内只减一次）
+    - Retry-After 会暂停整个桶，排队中的请求等待而不是各自消耗重试次数
+    """
+
+    def __init__(
+        self,
+        initial_rate: float,
+        min_rate: float,
+        max_rate: float,
+        burst: int,
+        increase: float = 0.5,
+        decrease_factor: float = 0.5,
+    ):
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, min_rate)
+        self.rate = min(max(initial_rate, self.min_rate), self.max_rate)
+        self.burst = max(1, burst)
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.queue_depth = 0
+        self.throttled = 0
+        self._next_slot = 0.0
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+
+    async def acquire(self) -> None:
+        """等待一个发送配额（按到达顺序预约时间槽）"""
+        self.queue_depth += 1
+        try:
+            while True:
+                now = time.monotonic()
+                interval = 1.0 / self.rate
+                # 允许最多 burst 个请求立即发出，其余按速率排队
+                slot = max(self._next_slot, now - (self.burst - 1) * interval, self._blocked_until)
+                self._next_slot = slot + interval
+                if slot > now:
+                    try:
+                        await asyncio.sleep(slot - now)
+                    except asyncio.CancelledError:
+                        self._refund(interval)
+                        raise
+                if time.monotonic() >= self._blocked_until:
+                    return
+                # 等待期间收到新的 Retry-After：归还本次时间槽后重新排队
+                self._refund(interval)
+        finally:
+            self.queue_depth -= 1
+
+    def _refund(self, interval: float) -> None:
+        """归还一个未使用的时间槽，后续请求提前一个间隔发出，保持实际发送速率"""
+        self._next_slot -= interval
+
+    def on_success(self) -> None:
+        self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        now = time.monotonic()
+        self.throttled += 1
+        # 并发请求往往同时收到 429，冷却窗口（一个发送间隔）内只降速一次
+        if now - self._last_decrease >= 1.0 / self.rate:
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            self._last_decrease = now
+        pause = retry_after if retry_after is not None else 1.0 / self.rate
+        self._blocked_until = max(self._blocked_until, now + pause)
+        self._next_slot = max(self._next_slot, self._blocked_until)
+
+    def stats(self) -> dict:
+        return {
+            "rate_per_second": round(self.rate, 3),
+            "queue_depth": self.queue_depth,
+            "throttled_total": self.throttled,
+            "paused_for_seconds": round(max(0.0, self._blocked_until - time.monotonic()), 3),
+        }
+
+
+_limiters: Dict[str, AdaptiveRateLimiter] = {}
+
+
+def get_rate_limiter(api_url: str) -> Optional[AdaptiveRateLimiter]:
+    """获取指定上游端点的共享限速器；未启用时返回 None"""
+    if not config.rate_limit_enabled:
+        return None
+    limiter = _limiters.get(api_url)
+    if limiter is None:
+        limiter = AdaptiveRateLimiter(
+            initial_rate=config.rate_limit_initial,
+            min_rate=config.rate_limit_min,
+            max_rate=config.rate_limit_max,
+            burst=config.rate_limit_burst,
+        )
+        _limiters[api_url] = limiter
+    return limiter
+
+
+def get_rate_limiter_stats() -> Dict[str, dict]:
+    return {api_url: limiter.stats() for api_url, limiter in _limiters.items()}
@@ -0,0 +1,123 @@
+import json
+import re
+from typing import Iterable, List, Optional
+
+from .base import SearchResult
+from .json_stream import IncrementalJSONArrayParser
+from ..utils import canonicalize_url
+
+_FENCE_RE = re.compile(r"```[a-zA-Z]*\s*\n?(.*?)```", re.DOTALL)
+_TRAILING_COMMA_RE = re.compile(r",\s*([\]}])")
+_RESULT_LIST_KEYS = ("results", "data", "items")
+
+
+class SearchResultParseError(ValueError):
+    """模型输出中找不到结果数组或结果对象；content 保留原始输出以便调用方降级返回"""
+
+    def __init__(self, content: str):
+        super().__init__("未能从模型输出中解析出搜索结果")
+        self.content = content
+
+
+def _normalize(item: dict) -> Optional[SearchResult]:
+    """校验单个结果对象：必须包含 http(s) 链接，URL 统一规范化"""
+    result = SearchResult.from_dict(item)
+    if result is None:
+        return None
+    url = canonicalize_url(result.url)
+    if not url.startswith(("http://", "https://")):
+        return None
+    if result.title == result.url:
+        result.title = url
+    result.url = url
+    return result
+
+
+def _extract_items(content: str) -> Optional[List[dict]]:
+    """从模型输出中提取结果对象，兼容代码块、前后说明文字与常见的 JSON 格式错误
+
+    输出中没有任何可解析的 JSON 结构时返回 None（区别于模型明确返回的空数组）。
+    """
+    fenced = _FENCE_RE.search(content)
+    text = fenced.group(1) if fenced else content
+
+    parser = IncrementalJSONArrayParser()
+    parser.feed(text)
+    if parser.items:
+        return parser.items
+
+    # 完整解析：修复尾随逗号，兼容 {"results": [...]} 包装与单个对象
+    try:
+        data = json.loads(_TRAILING_COMMA_RE.sub(r"\1", text.strip()))
+    except ValueError:
+        data = None
+    if isinstance(data, list):
+        # 空数组表示模型明确没有结果；只含非对象元素（如 [1, 2]）视为无法解析
+        items = [item for item in data if isinstance(item, dict)]
+        return items if items or not data else None
+    if isinstance(data, dict):
+        for key in _RESULT_LIST_KEYS:
+            if isinstance(data.get(key), list):
+                return [item for item in data[key] if isinstance(item, dict)]
+        return [data]
+
+    # 最后尝试：未包裹在数组中的连续对象
+    start = text.find("{")
+    if start < 0:
+        return None
+    parser = IncrementalJSONArrayParser()
+    parser.feed("[" + _TRAILING_COMMA_RE.sub(r"\1", text[start:]))
+    return parser.items or None
+
+
+def dedupe_results(results: Iterable[SearchResult]) -> List[SearchResult]:
+    """按规范化 URL 去重，保留首次出现的结果并用重复项补全空字段"""
+    unique = {}
+    for result in results:
+        kept = unique.get(result.url)
+        if kept is None:
+            unique[result.url] = result
+            continue
+        for field in ("snippet", "source", "published_date"):
+            if not getattr(kept, field) and getattr(result, field):
+                setattr(kept, field, getattr(result, field))
+    return list(unique.values())
+
+
+def results_from_items(items: Iterable[dict], max_results: int = 0) -> List[SearchResult]:
+    """结果对象列表 → 校验、规范化、去重后的 SearchResult 列表"""
+    results = dedupe_results(
+        result for result in map(_normalize, items) if result is not None
+    )
+    return results[:max_results] if max_results else results
+
+
+def parse_search_results(content: str, max_results: int = 0) -> List[SearchResult]:
+    """模型输出 → 校验、规范化、去重后的 SearchResult 列表；无法解析时抛出 SearchResultParseError"""
+    items = _extract_items(content)
+    if items is None:
+        raise SearchResultParseError(content)
+    return results_from_items(items, max_results)
+
+
+class SearchResultCollector:
+    """流式接收搜索输出，统计有效且不重复的结果数，用于提前结束上游流"""
+
+    def __init__(self, max_results: int):
+        self.max_results = max_results
+        self.items: List[dict] = []
+        self._parser = IncrementalJSONArrayParser()
+        self._seen = set()
+
+    @property
+    def enough(self) -> bool:
+        return len(self.items) >= self.max_results
+
+    def feed(self, text: str) -> bool:
+        """输入增量文本，已收集到 max_results 个结果时返回 True"""
+        for item in self._parser.feed(text):
+            result = _normalize(item)
+            if result is not None and result.url not in self._seen:
+                self._seen.add(result.url)
+                self.items.append(item)
+        return self.enough
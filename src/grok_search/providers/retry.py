@@ -0,0 +1,95 @@
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import httpx
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+from tenacity.wait import wait_base
+
+from ..config import config
+from ..metrics import UPSTREAM_RETRIES
+from ..tracing import record_span
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+def is_retryable_exception(exc) -> bool:
+    """检查异常是否可重试"""
+    if isinstance(exc, (httpx.TimeoutException, httpx.NetworkError, httpx.ConnectError, httpx.RemoteProtocolError)):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRYABLE_STATUS_CODES
+    return False
+
+
+def retry_cause(exc) -> str:
+    """重试原因分类，用作指标标签"""
+    if isinstance(exc, httpx.HTTPStatusError):
+        code = exc.response.status_code
+        return "429" if code == 429 else f"{code // 100}xx"
+    if isinstance(exc, httpx.TimeoutException):
+        return "timeout"
+    if isinstance(exc, httpx.RemoteProtocolError):
+        return "protocol_error"
+    if isinstance(exc, (httpx.NetworkError, httpx.ConnectError)):
+        return "network"
+    return "other"
+
+
+def parse_retry_after(response: httpx.Response) -> Optional[float]:
+    """解析 Retry-After 头（支持秒数或 HTTP 日期格式）"""
+    header = response.headers.get("Retry-After")
+    if not header:
+        return None
+    header = header.strip()
+
+    if header.isdigit():
+        return float(header)
+
+    try:
+        retry_dt = parsedate_to_datetime(header)
+        if retry_dt.tzinfo is None:
+            retry_dt = retry_dt.replace(tzinfo=timezone.utc)
+        delay = (retry_dt - datetime.now(timezone.utc)).total_seconds()
+        return max(0.0, delay)
+    except (TypeError, ValueError):
+        return None
+
+
+class WaitWithRetryAfter(wait_base):
+    """等待策略：优先使用 Retry-After 头，否则使用指数退避"""
+
+    def __init__(self, multiplier: float, max_wait: int):
+        self._base_wait = wait_random_exponential(multiplier=multiplier, max=max_wait)
+        self._protocol_error_base = 3.0
+
+    def __call__(self, retry_state):
+        if retry_state.outcome and retry_state.outcome.failed:
+            exc = retry_state.outcome.exception()
+            if isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code == 429:
+                retry_after = parse_retry_after(exc.response)
+                if retry_after is not None:
+                    return retry_after
+            if isinstance(exc, httpx.RemoteProtocolError):
+                return self._base_wait(retry_state) + self._protocol_error_base
+        return self._base_wait(retry_state)
+
+
+def upstream_retrying(provider: str) -> AsyncRetrying:
+    """所有上游 Provider 共用的重试策略（次数与退避由 GROK_RETRY_* 配置），按原因统计重试次数并记录退避等待"""
+    cfg = config.snapshot
+
+    def count_retry(retry_state) -> None:
+        cause = retry_cause(retry_state.outcome.exception())
+        UPSTREAM_RETRIES.inc(provider=provider, cause=cause)
+        now = time.monotonic()
+        record_span("backoff", now, now + retry_state.next_action.sleep, provider=provider, cause=cause)
+
+    return AsyncRetrying(
+        stop=stop_after_attempt(cfg.retry_max_attempts + 1),
+        wait=WaitWithRetryAfter(cfg.retry_multiplier, cfg.retry_max_wait),
+        retry=retry_if_exception(is_retryable_exception),
+        before_sleep=count_retry,
+        reraise=True,
+    )
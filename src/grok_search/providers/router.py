@@ -0,0 +1,41 @@
+import asyncio
+from typing import List
+
+from .base import BaseSearchProvider, SearchResult
+from ..config import config
+from ..logger import log_info
+
+
+class FallbackSearchProvider(BaseSearchProvider):
+    """先使用主 Provider 搜索，出错、超时或无结果时改用备用 Provider"""
+
+    def __init__(self, primary: BaseSearchProvider, fallback: BaseSearchProvider, primary_timeout: float = 0):
+        super().__init__(primary.api_url, primary.api_key)
+        self.primary = primary
+        self.fallback = fallback
+        self.primary_timeout = primary_timeout
+
+    def get_provider_name(self) -> str:
+        return f"{self.primary.get_provider_name()} → {self.fallback.get_provider_name()}"
+
+    async def search(self, query: str, platform: str = "", min_results: int = 3, max_results: int = 10, ctx=None, bypass_cache: bool = False, prompt_profile: str = "") -> List[SearchResult]:
+        primary_search = self.primary.search(query, platform, min_results, max_results, ctx, bypass_cache=bypass_cache, prompt_profile=prompt_profile)
+        try:
+            if self.primary_timeout > 0:
+                results = await asyncio.wait_for(primary_search, self.primary_timeout)
+            else:
+                results = await primary_search
+            if results:
+                return results
+            reason = "no results"
+        except asyncio.TimeoutError:
+            reason = f"timed out after {self.primary_timeout:g}s"
+        except Exception as e:
+            reason = f"{type(e).__name__}: {e}"
+
+        await log_info(
+            ctx,
+            f"{self.primary.get_provider_name()} search failed ({reason}), falling back to {self.fallback.get_provider_name()}",
+            config.debug_enabled,
+        )
+        return await self.fallback.search(query, platform, min_results, max_results, ctx, bypass_cache=bypass_cache, prompt_profile=prompt_profile)
@@ -0,0 +1,91 @@
+import json
+from typing import List, Optional
+
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:  # 可选加速依赖，未安装时使用标准库
+    _json_loads = json.loads
+
+_SSE_FIELD_PREFIXES = ("data:", "event:", "id:", "retry:", ":")
+# 小增量先暂存，攒够后合并为一个块，避免大量短字符串对象的内存开销
+_COMPACT_EVERY = 256
+
+
+class ChatStreamDecoder:
+    """OpenAI 兼容 /chat/completions 流式响应的增量解码器
+
+    逐行输入，线性时间拼接增量内容；仅在响应不是 SSE 时才缓存原始行，
+    以便按普通 JSON 响应解析。
+    """
+
+    def __init__(self, content_type: str = ""):
+        self._chunks: List[str] = []
+        self._pending: List[str] = []
+        self._raw_lines: List[str] = []
+        # "sse" / "raw"，None 表示尚未根据首行判定
+        self._mode: Optional[str] = "sse" if "text/event-stream" in content_type.lower() else None
+        self.done = False
+
+    @property
+    def is_sse(self) -> bool:
+        return self._mode == "sse"
+
+    def feed(self, line: str) -> Optional[str]:
+        """输入一行，返回该行携带的增量文本（无增量时返回 None）"""
+        line = line.strip()
+        if not line:
+            return None
+
+        if self._mode is None:
+            self._mode = "sse" if line.startswith(_SSE_FIELD_PREFIXES) else "raw"
+
+        if self._mode == "raw":
+            self._raw_lines.append(line)
+            return None
+
+        # 兼容 "data: {...}" 和 "data:{...}" 两种 SSE 格式，忽略 event/id/注释行
+        if not line.startswith("data:"):
+            return None
+        data_str = line[5:].lstrip()
+        if data_str == "[DONE]":
+            self.done = True
+            return None
+        try:
+            data = _json_loads(data_str)
+        except ValueError:
+            return None
+
+        delta = _first_choice(data).get("delta") or {}
+        text = delta.get("content") if isinstance(delta, dict) else None
+        if isinstance(text, str) and text:
+            self._pending.append(text)
+            if len(self._pending) >= _COMPACT_EVERY:
+                self._chunks.append("".join(self._pending))
+                self._pending.clear()
+            return text
+        return None
+
+    def finish(self) -> str:
+        """返回完整内容；非 SSE 响应按完整 JSON 解析 choices[0].message.content"""
+        if self._chunks or self._pending:
+            return "".join(self._chunks) + "".join(self._pending)
+        if not self._raw_lines:
+            return ""
+        try:
+            data = _json_loads("".join(self._raw_lines))
+        except ValueError:
+            return ""
+        message = _first_choice(data).get("message") or {}
+        content = message.get("content", "") if isinstance(message, dict) else ""
+        return content if isinstance(content, str) else ""
+
+
+def _first_choice(data) -> dict:
+    if not isinstance(data, dict):
+        return {}
+    choices = data.get("choices")
+    if isinstance(choices, list) and choices and isinstance(choices[0], dict):
+        return choices[0]
+    return {}
@@ -0,0 +1,80 @@
+import json
+from typing import List
+
+from .base import BaseSearchProvider, SearchResult
+from .results import results_from_items
+from .retry import upstream_retrying
+from .upstream import upstream_request
+from ..cache import get_search_cache, search_cache_key
+from ..config import config
+from ..http_client import get_http_client
+from ..logger import log_debug, log_info
+from ..query_analysis import analyze_query
+from ..singleflight import SingleFlight
+from ..tracing import span
+
+# Tavily 单次请求最多返回 20 条结果
+_TAVILY_MAX_RESULTS = 20
+
+_search_flight = SingleFlight()
+
+
+class TavilySearchProvider(BaseSearchProvider):
+    """Tavily 搜索 API：直接返回结构化结果，延迟约 1 秒，适合作为低延迟后端或 Grok 的备用"""
+
+    def __init__(self, api_url: str, api_key: str, search_depth: str = "basic"):
+        super().__init__(api_url.rstrip("/"), api_key)
+        self.search_depth = search_depth
+
+    def get_provider_name(self) -> str:
+        return "Tavily"
+
+    async def search(self, query: str, platform: str = "", min_results: int = 3, max_results: int = 10, ctx=None, bypass_cache: bool = False, prompt_profile: str = "") -> List[SearchResult]:
+        # Tavily 不使用提示词，忽略 prompt_profile
+        cache = get_search_cache()
+        cache_key = search_cache_key(query, platform, min_results, max_results, f"tavily:{self.search_depth}")
+        if not bypass_cache:
+            with span("cache_lookup", cache="search") as attrs:
+                cached = cache.get(cache_key)
+                attrs["hit"] = cached is not None
+            if cached is not None:
+                await log_info(ctx, "Search cache hit", config.debug_enabled)
+                return cached
+
+        async def search_and_cache():
+            results = await self._search_upstream(query, platform, max_results, ctx)
+            if results:
+                cache.set(cache_key, results, analyze_query(query).cache_ttl(config))
+            return results
+
+        return await _search_flight.do(cache_key, search_and_cache)
+
+    async def _search_upstream(self, query: str, platform: str, max_results: int, ctx=None) -> List[SearchResult]:
+        # Tavily 没有平台参数，将关注的平台作为关键词附加到查询中
+        payload = {
+            "query": f"{query} {platform}".strip() if platform else query,
+            "max_results": min(max(max_results, 1), _TAVILY_MAX_RESULTS),
+            "search_depth": self.search_depth,
+            "topic": "news" if analyze_query(query).time_sensitive else "general",
+        }
+        await log_debug(ctx, lambda: f"tavily_payload: {payload}")
+
+        data = await self._execute_with_retry(payload, ctx)
+        with span("parse"):
+            items = data.get("results") if isinstance(data, dict) else None
+            if not isinstance(items, list):
+                return []
+            return results_from_items((item for item in items if isinstance(item, dict)), max_results)
+
+    async def _execute_with_retry(self, payload: dict, ctx=None) -> dict:
+        """执行带重试机制的搜索请求，与 Grok 共用重试策略、限速器与熔断器"""
+        client = get_http_client()
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+        async for attempt in upstream_retrying("tavily"):
+            with attempt, span("attempt", provider="tavily", number=attempt.retry_state.attempt_number):
+                async with upstream_request(client, "tavily", self.api_url, f"{self.api_url}/search", headers, payload, ctx,
+                                            timeout=config.tavily_timeout) as call:
+                    return json.loads(await call.response.aread())
@@ -0,0 +1,87 @@
+import logging
+import time
+from contextlib import asynccontextmanager
+
+from .circuit_breaker import get_circuit_breaker
+from .rate_limiter import get_rate_limiter
+from .retry import parse_retry_after
+from ..config import config
+from ..logger import log_event, log_info
+from ..metrics import (
+    UPSTREAM_BYTES, UPSTREAM_IN_FLIGHT, UPSTREAM_REQUESTS, UPSTREAM_RETRIES, UPSTREAM_STREAM, UPSTREAM_TTFB, ConnectTimer,
+)
+from ..tracing import record_span, span
+
+
+class UpstreamCall:
+    """一次成功的上游请求：响应对象与发送 / 收到响应头的时间（time.monotonic()）"""
+
+    __slots__ = ("response", "sent_at", "headers_at")
+
+    def __init__(self, response, sent_at: float, headers_at: float):
+        self.response = response
+        self.sent_at = sent_at
+        self.headers_at = headers_at
+
+    @property
+    def ttfb(self) -> float:
+        return self.headers_at - self.sent_at
+
+
+@asynccontextmanager
+async def upstream_request(client, provider: str, name: str, url: str, headers: dict, payload: dict, ctx=None,
+                           requeue_throttled: bool = True, **kwargs):
+    """向单个上游端点发送一次 POST 请求，各 Provider 共用
+
+    经过 name 对应的熔断器与限速器：429 交给限速器降速排队，不消耗重试次数（有上限）；
+    记录在途请求数、状态码、TTFB、耗时与字节数指标及追踪阶段。
+    产出状态码为 2xx 的 UpstreamCall，块内读取响应体；块内的异常同样计入熔断器。
+    """
+    breaker = get_circuit_breaker(name)
+    if breaker is not None:
+        breaker.before_request()
+    limiter = get_rate_limiter(name)
+    requeues = 0
+    try:
+        while True:
+            if limiter is not None:
+                with span("rate_limit_wait"):
+                    await limiter.acquire()
+            sent_at = time.monotonic()
+            with UPSTREAM_IN_FLIGHT.track(provider=provider):
+                async with client.stream(
+                    "POST", url, headers=headers, json=payload, extensions={"trace": ConnectTimer(provider)}, **kwargs,
+                ) as response:
+                    headers_at = time.monotonic()
+                    UPSTREAM_REQUESTS.inc(provider=provider, status=str(response.status_code))
+                    UPSTREAM_TTFB.observe(headers_at - sent_at, provider=provider)
+                    record_span("ttfb", sent_at, headers_at, endpoint=url, status=response.status_code)
+                    if response.status_code == 429 and limiter is not None:
+                        limiter.on_throttle(parse_retry_after(response))
+                        if requeue_throttled and requeues < config.rate_limit_max_requeues:
+                            requeues += 1
+                            UPSTREAM_RETRIES.inc(provider=provider, cause="429")
+                            await log_info(ctx, f"Rate limited, requeued ({requeues})", config.debug_enabled)
+                            continue
+                    response.raise_for_status()
+                    if limiter is not None:
+                        limiter.on_success()
+                    try:
+                        yield UpstreamCall(response, sent_at, headers_at)
+                    finally:
+                        elapsed = time.monotonic() - sent_at
+                        UPSTREAM_STREAM.observe(elapsed, provider=provider)
+                        UPSTREAM_BYTES.inc(response.num_bytes_downloaded, provider=provider)
+                        record_span("stream", headers_at, bytes=response.num_bytes_downloaded)
+                    log_event(
+                        "upstream_response", level=logging.DEBUG, endpoint=url,
+                        ttfb_ms=round((headers_at - sent_at) * 1000, 1),
+                        elapsed_ms=round(elapsed * 1000, 1),
+                    )
+                    break
+    except BaseException as exc:
+        if breaker is not None:
+            breaker.record_exception(exc)
+        raise
+    if breaker is not None:
+        breaker.record_success()
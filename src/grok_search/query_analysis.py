@@ -0,0 +1,195 @@
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Tuple
+
+# 时间相关关键词：查询包含这些词时注入当前时间、缩短缓存 TTL，Tavily 使用 news 主题
+_TIME_KEYWORDS_CN = (
+    "当前", "现在", "今天", "明天", "昨天",
+    "本周", "上周", "下周", "这周",
+    "本月", "上月", "下月", "这个月",
+    "今年", "去年", "明年",
+    "最新", "最近", "近期", "刚刚", "刚才",
+    "实时", "即时", "目前",
+)
+_TIME_KEYWORDS_EN = (
+    "current", "currently", "now", "today", "tomorrow", "yesterday",
+    "this week", "last week", "next week",
+    "this month", "last month", "next month",
+    "this year", "last year", "next year",
+    "latest", "recent", "recently", "just now",
+    "real-time", "realtime", "up-to-date",
+)
+
+# 平台提示：匹配文本（小写）-> 平台名
+_PLATFORMS = {
+    "github": "GitHub",
+    "reddit": "Reddit",
+    "twitter": "Twitter",
+    "x.com": "Twitter",
+    "stackoverflow": "Stack Overflow",
+    "stack overflow": "Stack Overflow",
+    "hackernews": "Hacker News",
+    "hacker news": "Hacker News",
+    "youtube": "YouTube",
+    "wikipedia": "Wikipedia",
+    "arxiv": "arXiv",
+    "zhihu": "知乎",
+    "知乎": "知乎",
+    "weibo": "微博",
+    "微博": "微博",
+    "bilibili": "Bilibili",
+    "b站": "Bilibili",
+    "哔哩哔哩": "Bilibili",
+    "小红书": "小红书",
+}
+
+_COMPARE_EN = ("vs", "versus", "compare", "compared", "compares", "comparison", "difference between", "alternatives to", "tradeoffs", "trade-offs")
+_COMPARE_CN = ("对比", "比较", "区别", "差异", "优缺点", "哪个好")
+_QUESTION_EN = ("how", "why", "what", "which", "when", "where", "who")
+_QUESTION_CN = ("如何", "怎么", "怎样", "为什么", "什么", "哪些", "是否")
+
+_OPERATOR_PREFIXES = ("site:", "filetype:", "intitle:", "inurl:")
+
+# 关键词 -> 类别。英文按词（或相邻两词）查表，不会把 know 识别为 now；中文没有分词，用正则在汉字查询中匹配
+_KEYWORDS = {
+    word: kind
+    for kind, words in (
+        ("time", _TIME_KEYWORDS_CN + _TIME_KEYWORDS_EN),
+        ("platform", tuple(_PLATFORMS)),
+        ("compare", _COMPARE_CN + _COMPARE_EN),
+        ("question", _QUESTION_CN + _QUESTION_EN),
+    )
+    for word in words
+}
+
+# 两词短语的首词：只有前一个词在其中时才查两词短语
+_PHRASE_HEADS = frozenset(w.split(" ", 1)[0] for w in _KEYWORDS if " " in w)
+
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9.+#_-]*")
+_HAN_RE = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff]")
+# 长词在前，避免较短的前缀先匹配
+_CJK_KEYWORD_RE = re.compile("|".join(
+    re.escape(word) for word in sorted((w for w in _KEYWORDS if not w.isascii()), key=len, reverse=True)
+))
+_BOOLEAN_RE = re.compile(r"\b(?:AND|OR|NOT)\b")
+
+# 复杂度阈值（按词计，两个汉字约为一个词）
+_SIMPLE_MAX_TERMS = 4
+_COMPLEX_MIN_TERMS = 16
+
+# prompt_profile 为 auto 时各复杂度使用的提示词档位
+_PROFILE_BY_COMPLEXITY = {"simple": "minimal", "moderate": "compact", "complex": "full"}
+
+
+@dataclass(frozen=True)
+class QueryAnalysis:
+    """查询的一次性分析结果：时间敏感性、语言、平台提示与复杂度"""
+
+    time_sensitive: bool
+    # zh / en / mixed / other
+    language: str
+    platforms: Tuple[str, ...]
+    # simple / moderate / complex
+    complexity: str
+    terms: float
+
+    @property
+    def suggested_profile(self) -> str:
+        return _PROFILE_BY_COMPLEXITY[self.complexity]
+
+    def cache_ttl(self, cfg) -> float:
+        """时间敏感的查询使用较短的缓存 TTL"""
+        return cfg.search_cache_time_sensitive_ttl if self.time_sensitive else cfg.search_cache_ttl
+
+    def choose_model(self, default: str, complex_model: str = "") -> str:
+        """复杂查询在配置了 complex_model 时改用该模型"""
+        return complex_model if complex_model and self.complexity == "complex" else default
+
+    def to_dict(self) -> dict:
+        return {
+            "time_sensitive": self.time_sensitive,
+            "language": self.language,
+            "platforms": list(self.platforms),
+            "complexity": self.complexity,
+        }
+
+
+def _lookup_words(words):
+    """连字符复合词（latest-news、this-week）不在关键词表中时按各部分查表；real-time 等整词优先"""
+    for word in words:
+        if "-" in word and word not in _KEYWORDS:
+            yield from (part for part in word.split("-") if part)
+        else:
+            yield word
+
+
+@lru_cache(maxsize=1024)
+def analyze_query(query: str) -> QueryAnalysis:
+    """一次分词后查表分析查询；同一请求内多处调用（缓存键、提示词、TTL）共享结果"""
+    lower = query.lower()
+    words = _WORD_RE.findall(lower)
+    # 纯 ASCII 查询跳过汉字相关的扫描
+    han = 0 if query.isascii() else len(_HAN_RE.findall(query))
+
+    # 英文关键词：逐词查表（含 "this week"、"stack overflow" 等两词短语），中文关键词：仅在含汉字时匹配
+    matches = []
+    previous = ""
+    for word in _lookup_words(words):
+        kind = _KEYWORDS.get(word)
+        if kind is None:
+            if previous in _PHRASE_HEADS and f"{previous} {word}" in _KEYWORDS:
+                word = f"{previous} {word}"
+            elif "." in word:
+                # vs.、github.com 等：去掉句点或域名后缀再查
+                word = word.rstrip(".") or word
+                word = word if word in _KEYWORDS else word.split(".", 1)[0]
+            kind = _KEYWORDS.get(word)
+        if kind is not None:
+            matches.append((kind, word))
+        previous = word
+    if han:
+        matches.extend((_KEYWORDS[m], m) for m in _CJK_KEYWORD_RE.findall(lower))
+
+    time_sensitive = False
+    platforms = []
+    compare = question_words = 0
+    for kind, word in matches:
+        if kind == "time":
+            time_sensitive = True
+        elif kind == "platform":
+            if _PLATFORMS[word] not in platforms:
+                platforms.append(_PLATFORMS[word])
+        elif kind == "compare":
+            compare += 1
+        else:
+            question_words += 1
+
+    question_marks = query.count("?") + query.count("？")
+    operators = query.count('"') // 2
+    if "AND" in query or "OR" in query or "NOT" in query:
+        operators += len(_BOOLEAN_RE.findall(query))
+    if ":" in lower:
+        operators += sum(lower.count(prefix) for prefix in _OPERATOR_PREFIXES)
+    latin = len(words)
+    terms = latin + han / 2
+
+    if han and latin:
+        language = "mixed"
+    elif han:
+        language = "zh"
+    elif latin:
+        language = "en"
+    else:
+        language = "other"
+
+    # 问号按句计数；没有问号时疑问词视为一个问题
+    questions = question_marks or min(question_words, 1)
+    if compare or terms >= _COMPLEX_MIN_TERMS or questions >= 2:
+        complexity = "complex"
+    elif terms <= _SIMPLE_MAX_TERMS and not questions and not operators:
+        complexity = "simple"
+    else:
+        complexity = "moderate"
+
+    return QueryAnalysis(time_sensitive, language, tuple(platforms), complexity, terms)
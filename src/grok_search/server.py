@@ -1,27 +1,31 @@
 import sys
 from pathlib import Path
 
-# 支持直接运行：添加 src 目录到 Python 路径
-src_dir = Path(__file__).parent.parent
-if str(src_dir) not in sys.path:
-    sys.path.insert(0, str(src_dir))
+# 直接运行本文件（如 mcp run server.py）时添加 src 目录到 Python 路径；作为包导入时无需修改
+if not __package__:
+    src_dir = Path(__file__).parent.parent
+    if str(src_dir) not in sys.path:
+        sys.path.insert(0, str(src_dir))
 
 from fastmcp import FastMCP, Context
 
-# 尝试使用绝对导入（支持 mcp run）
-try:
-    from grok_search.providers.grok import GrokSearchProvider
-    from grok_search.utils import format_search_results
-    from grok_search.logger import log_info
-    from grok_search.config import config
-except ImportError:
-    # 降级到相对导入（pip install -e . 后）
-    from .providers.grok import GrokSearchProvider
-    from .utils import format_search_results
-    from .logger import log_info
-    from .config import config
+# 启动时只导入轻量模块；Provider、HTTP 客户端、SQLite 缓存与本地抓取依赖 httpx / tenacity / sqlite3，
+# 在首次调用工具时才导入，缩短 uvx 启动到响应 initialize 的时间
+from grok_search.utils import search_results_to_json, search_results_to_dicts
+from grok_search.logger import log_event, log_info, logger, request_context, shutdown_logging
+from grok_search.config import _FETCH_MODES, config
+from grok_search.http_client import get_http_client, http_client_lifespan
+from grok_search.cache import get_search_cache
+from grok_search.prompts import PROMPT_PROFILES, normalize_prompt_profile
+from grok_search.page_store import RESOURCE_URI_TEMPLATE, get_page_store, paginate, parse_cursor, render_page
+from grok_search.metrics import TOOL_DURATION, TOOL_IN_FLIGHT, TOOL_REQUESTS, render_metrics
+from grok_search.tracing import span, tool_trace
 
 import asyncio
+import signal
+import time
+from contextlib import asynccontextmanager, suppress
+from functools import lru_cache
 
 MCP_INSTRUCTIONS = """
 # Grok Search MCP Usage Guide
@@ -29,10 +33,15 @@ MCP_INSTRUCTIONS = """
 ## Tool Matrix
 | Tool | Parameters | Output | Use Case |
 |------|------------|--------|----------|
-| `web_search` | `query`(required), `platform`/`min_results`/`max_results`(optional) | `[{title,url,content}]` | Multi-source aggregation/Fact checking/Latest news |
-| `web_fetch` | `url`(required) | Structured Markdown | Full content retrieval/Deep analysis |
+| `web_search` | `query`(required), `platform`/`min_results`/`max_results`/`bypass_cache`/`prompt_profile`/`include_timing`(optional) | `[{title,url,description}]` | Multi-source aggregation/Fact checking/Latest news |
+| `web_search_many` | `queries`(required), `platform`/`min_results`/`max_results`/`timeout`/`bypass_cache`/`prompt_profile`(optional) | `[{query,status,elapsed_ms,results|content|error}]` | Batch of related searches in one call |
+| `web_fetch` | `url`(required), `mode`/`bypass_cache`/`prompt_profile`/`include_timing`(optional) | Structured Markdown | Full content retrieval/Deep analysis |
+| `web_fetch_page` | `cursor`(required) | Structured Markdown | Read the next page of a long fetched document |
+| `web_fetch_many` | `urls`(required), `mode`/`deadline`/`bypass_cache`/`prompt_profile`(optional) | `{url: {status,markdown|error}}` | Read a list of pages in one call |
 | `get_config_info` | None | `{api_url,status,test}` | Connection diagnostics |
+| `get_metrics` | None | Prometheus text | Latency, retries and cache hit ratios |
 | `switch_model` | `model`(required) | `{status,previous_model,current_model}` | Switch Grok model |
+| `reload_config` | None | `{status,changes}` | Apply edited settings without restarting |
 | `toggle_builtin_tools` | `action`(optional: on/off/status) | `{blocked,deny_list,file}` | Disable/Enable built-in tools |
 
 ## Execution Strategy
@@ -41,7 +50,8 @@ MCP_INSTRUCTIONS = """
 - **Result Integration**: Cross-validate + **MANDATORY source attribution** `[Title](URL)` + Annotate time-sensitive info with dates
 
 ## Error Recovery
-- Connection failed → Check with `get_config_info`
+- Connection failed → Check with `get_config_info`; after editing settings, apply them with `reload_config`
+- Upstream circuit open → Wait for the reported retry time, or check with `get_config_info`
 - No results → Relax query conditions
 - Timeout → Search alternative sources
 
@@ -50,11 +60,184 @@ MCP_INSTRUCTIONS = """
 ❌ NO output without sources + NO single-attempt abandonment + NO unverified assumptions
 """
 
+def _reload_config(source: str, only_if_changed: bool = False):
+    """重载配置并记录变更；新配置无效时记录警告、保留当前快照并抛出 ValueError"""
+    try:
+        changes = config.reload_if_changed() if only_if_changed else config.reload()
+    except ValueError as e:
+        logger.warning(f"Config reload ({source}) rejected: {e}")
+        raise
+    if changes:
+        logger.info(f"Config reloaded ({source}): {', '.join(changes)}")
+    return changes
+
+
+def _reload_config_quietly(source: str, only_if_changed: bool = False) -> None:
+    with suppress(ValueError):
+        _reload_config(source, only_if_changed)
+
+
+async def _watch_config() -> None:
+    """定期检查 config.json 的修改时间，变化时重载配置"""
+    while True:
+        await asyncio.sleep(config.config_poll_interval)
+        _reload_config_quietly("config.json changed", only_if_changed=True)
+
+
+@asynccontextmanager
+async def _server_lifespan(server):
+    """共享连接池生命周期；配置了多端点时在后台定期探测端点健康状态，并监听配置变更"""
+    async with http_client_lifespan(server) as state:
+        tasks = []
+        try:
+            has_endpoints = bool(config.api_endpoints)
+        except ValueError:
+            has_endpoints = False
+        if has_endpoints:
+            from grok_search.providers.endpoint_pool import get_endpoint_pool, run_health_checks
+
+            tasks.append(asyncio.create_task(run_health_checks(get_endpoint_pool(), get_http_client)))
+        if config.config_poll_interval > 0:
+            tasks.append(asyncio.create_task(_watch_config()))
+
+        # SIGHUP 触发重载（Windows 不支持）
+        loop = asyncio.get_running_loop()
+        sighup = getattr(signal, "SIGHUP", None)
+        if sighup is not None:
+            try:
+                loop.add_signal_handler(sighup, _reload_config_quietly, "SIGHUP")
+            except (NotImplementedError, RuntimeError):
+                sighup = None
+        try:
+            yield state
+        finally:
+            if sighup is not None:
+                loop.remove_signal_handler(sighup)
+            for task in tasks:
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+
+
 mcp = FastMCP(
     "grok-search",
-    instructions=MCP_INSTRUCTIONS
+    instructions=MCP_INSTRUCTIONS,
+    lifespan=_server_lifespan,
 )
 
+try:
+    from fastmcp.server.middleware import Middleware
+except ImportError:
+    # fastmcp < 2.9 不支持中间件，此时日志中不带请求 ID
+    Middleware = None
+
+if Middleware is not None:
+    class _RequestLoggingMiddleware(Middleware):
+        """为每次工具调用绑定请求 ID 与配置快照，记录工具名、结果与耗时，并更新工具指标"""
+
+        async def on_call_tool(self, context, call_next):
+            tool = context.message.name
+            with request_context(), config.bind_snapshot(), TOOL_IN_FLIGHT.track(tool=tool):
+                start = time.perf_counter()
+                status = "error"
+                try:
+                    result = await call_next(context)
+                    status = "ok"
+                    return result
+                finally:
+                    elapsed = time.perf_counter() - start
+                    TOOL_REQUESTS.inc(tool=tool, status=status)
+                    TOOL_DURATION.observe(elapsed, tool=tool)
+                    log_event("tool_call", tool=tool, status=status, elapsed_ms=round(elapsed * 1000, 1))
+
+    mcp.add_middleware(_RequestLoggingMiddleware())
+
+
+@lru_cache(maxsize=8)
+def _get_grok_provider(api_url: str, api_key: str, model: str):
+    """按配置复用 Provider 实例（底层共享同一个连接池与端点池）"""
+    from grok_search.providers.endpoint_pool import get_endpoint_pool
+    from grok_search.providers.grok import GrokSearchProvider
+
+    return GrokSearchProvider(api_url, api_key, model, endpoint_pool=get_endpoint_pool())
+
+
+@lru_cache(maxsize=4)
+def _get_tavily_provider(api_url: str, api_key: str, search_depth: str):
+    from grok_search.providers.tavily import TavilySearchProvider
+
+    return TavilySearchProvider(api_url, api_key, search_depth)
+
+
+@lru_cache(maxsize=8)
+def _warn_missing_tavily_key(routing: str) -> None:
+    """每种路由配置只提示一次"""
+    logger.warning(f"已启用 Tavily（GROK_SEARCH_ROUTING={routing}），但未配置 TAVILY_API_KEY，仅使用 Grok 搜索")
+
+
+def _get_search_provider():
+    """按 GROK_SEARCH_ROUTING 选择搜索 Provider；配置缺失时抛出 ValueError
+
+    启用了 Tavily 但未配置 TAVILY_API_KEY 时记录警告并只使用 Grok。
+    """
+    # 所有选项取自同一个配置快照，避免与并发的重载交错
+    cfg = config.snapshot
+    routing = cfg.search_routing
+    if routing != "grok" and not cfg.tavily_api_key:
+        _warn_missing_tavily_key(routing)
+        routing = "grok"
+    grok_provider = tavily_provider = None
+    if routing != "tavily":
+        grok_provider = _get_grok_provider(cfg.grok_api_url, cfg.grok_api_key, cfg.grok_model)
+    if routing != "grok":
+        tavily_provider = _get_tavily_provider(cfg.tavily_api_url, cfg.tavily_api_key, cfg.tavily_search_depth)
+
+    if routing == "grok":
+        return grok_provider
+    if routing == "tavily":
+        return tavily_provider
+
+    from grok_search.providers.router import FallbackSearchProvider
+
+    if routing == "grok_first":
+        return FallbackSearchProvider(grok_provider, tavily_provider, cfg.search_primary_timeout)
+    return FallbackSearchProvider(tavily_provider, grok_provider, cfg.search_primary_timeout)
+
+
+# 本地抓取返回这些状态码时 Grok 通常也无法获取，不再回退
+_FETCH_TERMINAL_STATUS_CODES = {404, 410}
+
+
+async def _fetch_markdown(url: str, mode: str, bypass_cache: bool, prompt_profile: str = "", ctx=None) -> str:
+    """按 mode 抓取网页：local 仅本地转换，grok 仅由模型抓取，auto 优先本地、必要时回退 Grok
+
+    被地址检查拒绝的 URL（BlockedAddressError）直接抛出，不交给 Grok 抓取。
+    """
+    if mode != "grok":
+        import httpx
+        from grok_search.local_fetch import BlockedAddressError, LocalFetchError, get_local_fetcher
+
+        try:
+            with span("local_fetch") as attrs:
+                page = await get_local_fetcher().fetch(url, ctx, bypass_cache=bypass_cache)
+                attrs["needs_js"] = page.needs_js
+            if mode == "local" or not page.needs_js:
+                return page.markdown
+            await log_info(ctx, f"Page looks JavaScript-rendered, falling back to Grok: {url}", config.debug_enabled)
+        except (LocalFetchError, httpx.HTTPError) as e:
+            # 内网 / 本机地址是访问策略，不是本地抓取能力不足，不能回退到上游模型
+            if mode == "local" or isinstance(e, BlockedAddressError):
+                raise
+            if isinstance(e, httpx.HTTPStatusError) and e.response.status_code in _FETCH_TERMINAL_STATUS_CODES:
+                raise
+            await log_info(ctx, f"Local fetch failed ({type(e).__name__}: {e}), falling back to Grok", config.debug_enabled)
+
+    with span("resolve_config"):
+        cfg = config.snapshot
+        grok_provider = _get_grok_provider(cfg.grok_api_url, cfg.grok_api_key, cfg.grok_model)
+    return await grok_provider.fetch(url, ctx, bypass_cache=bypass_cache, prompt_profile=prompt_profile)
+
+
 @mcp.tool(
     name="web_search",
     description="""
@@ -68,33 +251,134 @@ mcp = FastMCP(
 
     The `min_results` and `max_results` should be the minimum and maximum number of results to return.
 
+    Identical searches are served from a short-lived in-memory cache. Set `bypass_cache` to true
+    to force a fresh search.
+
+    The `prompt_profile` selects the instructions sent to the model: "full" (detailed, default),
+    "compact" or "minimal" (fewer input tokens and a faster first token), or "auto" to pick one
+    from the query's complexity (minimal for short keyword queries, full for comparisons and long
+    multi-part questions). Leave empty to use the configured default.
+
+    Set `include_timing` to true to diagnose a slow call: the response then becomes
+    `{"results": [...], "_timing": {...}}`, where `_timing` lists the spans of the request
+    (config resolution, cache lookup, rate-limit wait, each retry attempt and backoff,
+    connect, time to response headers, first token, stream and parse) with their offsets
+    and durations in milliseconds.
+
     Returns
     -------
     str
-        A JSON-encoded string representing a list of search results. Each result
-        includes at least:
+        A JSON-encoded string representing a list of at most `max_results` search results.
+        Each result includes at least:
         - `url`: the link to the result
         - `title`: a short title
-        - `summary`: a brief description or snippet of the page content.
+        - `description`: a brief description or snippet of the page content.
     """
 )
-async def web_search(query: str, platform: str = "", min_results: int = 3, max_results: int = 10, ctx: Context = None) -> str:
+async def web_search(query: str, platform: str = "", min_results: int = 3, max_results: int = 10, bypass_cache: bool = False, prompt_profile: str = "", include_timing: bool = False, ctx: Context = None) -> str:
+    with tool_trace("web_search", include_timing) as trace:
+        with span("resolve_config"):
+            try:
+                prompt_profile = normalize_prompt_profile(prompt_profile or config.prompt_profile)
+            except ValueError as e:
+                return f"参数错误: {e}"
+            try:
+                search_provider = _get_search_provider()
+            except ValueError as e:
+                error_msg = str(e)
+                if ctx:
+                    await ctx.error(error_msg)
+                return f"配置错误: {error_msg}"
+
+        from grok_search.providers.results import SearchResultParseError
+
+        await log_info(ctx, f"Begin Search: {query}", config.debug_enabled)
+        try:
+            results = await search_provider.search(query, platform, min_results, max_results, ctx, bypass_cache=bypass_cache, prompt_profile=prompt_profile)
+        except SearchResultParseError as e:
+            # 模型未按要求返回 JSON 结果时原样返回其输出，而不是空列表
+            await log_info(ctx, f"Search Finished: {e}, returning raw model output", config.debug_enabled)
+            return e.content or f"搜索失败: {e}"
+        await log_info(ctx, "Search Finished!", config.debug_enabled)
+        if include_timing:
+            import json
+
+            return json.dumps({"results": search_results_to_dicts(results), "_timing": trace.to_dict()}, ensure_ascii=False, separators=(",", ":"))
+        return search_results_to_json(results)
+
+
+@mcp.tool(
+    name="web_search_many",
+    description="""
+    Runs several web searches concurrently and returns the results for each query.
+
+    Use this instead of many separate `web_search` calls when you need results for a batch
+    of related queries. `platform`, `min_results`, `max_results`, `bypass_cache` and
+    `prompt_profile` apply to every query and behave as in `web_search`. Searches run with bounded concurrency; set
+    `timeout` (seconds, 0 = no limit) to cap how long any single query may take.
+
+    Returns
+    -------
+    str
+        A JSON-encoded list with one entry per query, in input order:
+        - `query`: the query string
+        - `status`: "ok", "raw", "error" or "timeout"
+        - `elapsed_ms`: time spent on this query in milliseconds
+        - `results`: list of search results (same shape as `web_search`), when status is "ok"
+        - `content`: the model's raw output, when status is "raw" (it returned no parseable
+          results; `web_search` returns this text as-is in the same case)
+        - `error`: error message, when status is "error" or "timeout"
+    """
+)
+async def web_search_many(queries: list[str], platform: str = "", min_results: int = 3, max_results: int = 10, timeout: float = 0, bypass_cache: bool = False, prompt_profile: str = "", ctx: Context = None) -> str:
+    import json
+
+    from grok_search.providers.results import SearchResultParseError
+
     try:
-        api_url = config.grok_api_url
-        api_key = config.grok_api_key
-        model = config.grok_model
+        prompt_profile = normalize_prompt_profile(prompt_profile or config.prompt_profile)
+    except ValueError as e:
+        return f"参数错误: {e}"
+    try:
+        search_provider = _get_search_provider()
     except ValueError as e:
         error_msg = str(e)
         if ctx:
-            await ctx.report_progress(error_msg)
+            await ctx.error(error_msg)
         return f"配置错误: {error_msg}"
 
-    grok_provider = GrokSearchProvider(api_url, api_key, model)
-
-    await log_info(ctx, f"Begin Search: {query}", config.debug_enabled)
-    results = await grok_provider.search(query, platform, min_results, max_results, ctx)
-    await log_info(ctx, "Search Finished!", config.debug_enabled)
-    return results
+    semaphore = asyncio.Semaphore(max(1, config.batch_concurrency))
+
+    async def run(query: str) -> dict:
+        entry = {"query": query}
+        async with semaphore:
+            start_time = time.perf_counter()
+            try:
+                search = search_provider.search(query, platform, min_results, max_results, ctx, bypass_cache=bypass_cache, prompt_profile=prompt_profile)
+                results = await asyncio.wait_for(search, timeout) if timeout > 0 else await search
+                entry["status"] = "ok"
+                entry["results"] = search_results_to_dicts(results)
+            except asyncio.TimeoutError:
+                entry["status"] = "timeout"
+                entry["error"] = f"查询超时（{timeout} 秒）"
+            except SearchResultParseError as e:
+                # 与 web_search 一致：模型未按要求返回 JSON 结果时保留其原始输出
+                if e.content:
+                    entry["status"] = "raw"
+                    entry["content"] = e.content
+                else:
+                    entry["status"] = "error"
+                    entry["error"] = f"搜索失败: {e}"
+            except Exception as e:
+                entry["status"] = "error"
+                entry["error"] = f"{type(e).__name__}: {str(e)}"
+            entry["elapsed_ms"] = round((time.perf_counter() - start_time) * 1000, 2)
+        return entry
+
+    await log_info(ctx, f"Begin Batch Search: {len(queries)} queries", config.debug_enabled)
+    entries = await asyncio.gather(*(run(query) for query in queries))
+    await log_info(ctx, "Batch Search Finished!", config.debug_enabled)
+    return json.dumps(entries, ensure_ascii=False, separators=(",", ":"))
 
 
 @mcp.tool(
@@ -127,23 +411,163 @@ async def web_search(query: str, platform: str = "", min_results: int = 3, max_r
     - Handles special characters, encoding (UTF-8), and nested structures
     - May not capture dynamically loaded content requiring JavaScript execution
     - Respects the original language without translation
+    - Results are cached on disk per URL and model; set `bypass_cache` to true to refetch
+    - `mode` selects how the page is fetched: "local" downloads the page and converts the HTML
+      to Markdown directly (fast, no model tokens), "grok" asks the Grok model to fetch it, and
+      "auto" (default) converts locally and falls back to Grok for JavaScript-rendered pages,
+      unsupported content types such as PDF, or pages the server cannot download
+    - `prompt_profile` ("full", "compact" or "minimal") selects the model instructions used when
+      the page is fetched through Grok ("auto" uses "full"); leave empty to use the configured default
+    - Long documents are paginated: only the first page is returned, followed by a footer
+      with a `cursor` for `web_fetch_page` (or a `resource://grok-search/fetch/...` URI) to
+      read the following pages
+    - Set `include_timing` to true to append a `_timing: {...}` JSON line listing the spans of
+      the request (local download, cache lookup, retry attempts, connect, time to response
+      headers, first token, stream) with their offsets and durations in milliseconds
     """
 )
-async def web_fetch(url: str, ctx: Context = None) -> str:
+async def web_fetch(url: str, mode: str = "", bypass_cache: bool = False, prompt_profile: str = "", include_timing: bool = False, ctx: Context = None) -> str:
+    mode = (mode or config.fetch_mode).strip().lower()
+    if mode not in _FETCH_MODES:
+        return f"参数错误: mode 必须是 {', '.join(_FETCH_MODES)} 之一"
+    with tool_trace("web_fetch", include_timing) as trace:
+        try:
+            prompt_profile = normalize_prompt_profile(prompt_profile or config.prompt_profile)
+        except ValueError as e:
+            return f"参数错误: {e}"
+        try:
+            await log_info(ctx, f"Begin Fetch: {url}", config.debug_enabled)
+            results = await _fetch_markdown(url, mode, bypass_cache, prompt_profile, ctx)
+        except ValueError as e:
+            error_msg = str(e)
+            if ctx:
+                await ctx.error(error_msg)
+            return f"配置错误: {error_msg}"
+        await log_info(ctx, "Fetch Finished!", config.debug_enabled)
+        output = paginate(url, results)
+        if include_timing:
+            import json
+
+            output += "\n\n_timing: " + json.dumps(trace.to_dict(), ensure_ascii=False, separators=(",", ":"))
+        return output
+
+
+@mcp.tool(
+    name="web_fetch_page",
+    description="""
+    Returns a later page of a long document previously returned by `web_fetch` or `web_fetch_many`.
+
+    When a fetched page is longer than the page size, `web_fetch` returns only the first page,
+    followed by a footer containing a `cursor` for the next page. Pass that cursor here to read
+    the next page. Every page ends with the cursor for the page after it, until the last page.
+    Pages are split at heading boundaries where possible.
+
+    Stored documents expire after a while or when the store is full. If the cursor has
+    expired, call `web_fetch` again.
+
+    Returns
+    -------
+    str
+        The requested page as Markdown, followed by a pagination footer.
+    """
+)
+async def web_fetch_page(cursor: str) -> str:
+    parsed = parse_cursor(cursor)
+    if parsed is None:
+        return f"参数错误: 无效的 cursor: {cursor}"
+    return _read_page(*parsed)
+
+
+@mcp.resource(
+    RESOURCE_URI_TEMPLATE,
+    name="fetched_page",
+    description="A page of a long document fetched with web_fetch (see the footer of each page for the next URI).",
+    mime_type="text/markdown",
+)
+def fetched_page(doc_id: str, page: int) -> str:
+    return _read_page(doc_id, int(page))
+
+
+def _read_page(doc_id: str, page: int) -> str:
+    entry = get_page_store().get_page(doc_id, page)
+    if entry is None:
+        return f"页面不存在或已过期（文档 {doc_id} 第 {page} 页），请重新调用 web_fetch"
+    url, content, total = entry
+    return render_page(doc_id, url, content, page, total)
+
+
+@mcp.tool(
+    name="web_fetch_many",
+    description="""
+    Fetches several URLs concurrently and returns each page as structured Markdown
+    (same conversion, `mode` and `prompt_profile` options as `web_fetch`).
+
+    Fetches run with a global concurrency limit and a per-host limit, so a reading list
+    concentrated on one site does not overload it. Set `deadline` (seconds, 0 = wait for all)
+    to return early with whatever has finished; unfinished URLs are reported with status
+    "timeout". Duplicate URLs are fetched once.
+
+    Returns
+    -------
+    str
+        A JSON-encoded object mapping each URL, in input order, to:
+        - `status`: "ok", "error" or "timeout"
+        - `markdown`: the page content, when status is "ok"
+        - `error`: error message, when status is not "ok"
+    """
+)
+async def web_fetch_many(urls: list[str], mode: str = "", deadline: float = 0, bypass_cache: bool = False, prompt_profile: str = "", ctx: Context = None) -> str:
+    import json
+    from collections import defaultdict
+    from urllib.parse import urlsplit
+
+    mode = (mode or config.fetch_mode).strip().lower()
+    if mode not in _FETCH_MODES:
+        return f"参数错误: mode 必须是 {', '.join(_FETCH_MODES)} 之一"
     try:
-        api_url = config.grok_api_url
-        api_key = config.grok_api_key
-        model = config.grok_model
+        prompt_profile = normalize_prompt_profile(prompt_profile or config.prompt_profile)
     except ValueError as e:
-        error_msg = str(e)
-        if ctx:
-            await ctx.report_progress(error_msg)
-        return f"配置错误: {error_msg}"
-    await log_info(ctx, f"Begin Fetch: {url}", config.debug_enabled)
-    grok_provider = GrokSearchProvider(api_url, api_key, model)
-    results = await grok_provider.fetch(url, ctx)
-    await log_info(ctx, "Fetch Finished!", config.debug_enabled)
-    return results
+        return f"参数错误: {e}"
+    if mode == "grok":
+        try:
+            _get_grok_provider(config.grok_api_url, config.grok_api_key, config.grok_model)
+        except ValueError as e:
+            error_msg = str(e)
+            if ctx:
+                await ctx.error(error_msg)
+            return f"配置错误: {error_msg}"
+
+    global_semaphore = asyncio.Semaphore(max(1, config.batch_concurrency))
+    per_host_limit = max(1, config.batch_per_host_concurrency)
+    host_semaphores = defaultdict(lambda: asyncio.Semaphore(per_host_limit))
+
+    async def run(url: str) -> str:
+        host = (urlsplit(url).hostname or "").lower()
+        # 先占用主机配额再占用全局配额，避免排队中的请求占着全局名额
+        async with host_semaphores[host]:
+            async with global_semaphore:
+                return await _fetch_markdown(url, mode, bypass_cache, prompt_profile, ctx)
+
+    await log_info(ctx, f"Begin Batch Fetch: {len(urls)} urls", config.debug_enabled)
+    tasks = {url: asyncio.ensure_future(run(url)) for url in dict.fromkeys(urls)}
+    if tasks:
+        _, pending = await asyncio.wait(tasks.values(), timeout=deadline if deadline > 0 else None)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    output = {}
+    for url, task in tasks.items():
+        if task.cancelled():
+            output[url] = {"status": "timeout", "error": f"未在 {deadline} 秒内完成"}
+        elif task.exception() is not None:
+            e = task.exception()
+            output[url] = {"status": "error", "error": f"{type(e).__name__}: {str(e)}"}
+        else:
+            output[url] = {"status": "ok", "markdown": paginate(url, task.result())}
+    await log_info(ctx, "Batch Fetch Finished!", config.debug_enabled)
+    return json.dumps(output, ensure_ascii=False, separators=(",", ":"))
 
 
 @mcp.tool(
@@ -168,6 +592,11 @@ async def web_fetch(url: str, ctx: Context = None) -> str:
         - `log_level`: Current logging level
         - `log_dir`: Directory where logs are stored
         - `config_status`: Overall configuration status (✅ complete or ❌ error)
+        - `search_cache`: In-memory web_search cache statistics (entries, bytes, hits, misses, hit_ratio)
+        - `fetch_cache`: On-disk web_fetch cache statistics (path, entries, bytes, hits, misses), or null when disabled
+        - `page_store`: In-memory store of paginated web_fetch documents (entries, bytes, hits, misses, evictions)
+        - `rate_limiter`: Per-endpoint adaptive rate limiter state (current rate, queue depth, 429 count, pause)
+        - `circuit_breaker`: Per-endpoint circuit breaker state (closed/open/half_open, recent failures)
         - `connection_test`: Result of testing API connectivity to /models endpoint
           - `status`: Connection status
           - `message`: Status message with model count
@@ -184,80 +613,43 @@ async def web_fetch(url: str, ctx: Context = None) -> str:
 )
 async def get_config_info() -> str:
     import json
-    import httpx
+    from grok_search.fetch_cache import get_fetch_cache
+    from grok_search.providers.circuit_breaker import get_circuit_breaker_stats
+    from grok_search.providers.endpoint_pool import get_endpoint_pool, probe_models
+    from grok_search.providers.rate_limiter import get_rate_limiter_stats
 
     config_info = config.get_config_info()
 
     # 添加连接测试
-    test_result = {
-        "status": "未测试",
-        "message": "",
-        "response_time_ms": 0
-    }
-
     try:
         api_url = config.grok_api_url
         api_key = config.grok_api_key
-
-        # 构建 /models 端点 URL
-        models_url = f"{api_url.rstrip('/')}/models"
-
-        # 发送测试请求
-        import time
-        start_time = time.time()
-
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(
-                models_url,
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json"
-                }
-            )
-
-            response_time = (time.time() - start_time) * 1000  # 转换为毫秒
-
-            if response.status_code == 200:
-                test_result["status"] = "✅ 连接成功"
-                test_result["message"] = f"成功获取模型列表 (HTTP {response.status_code})"
-                test_result["response_time_ms"] = round(response_time, 2)
-
-                # 尝试解析返回的模型列表
-                try:
-                    models_data = response.json()
-                    if "data" in models_data and isinstance(models_data["data"], list):
-                        model_count = len(models_data["data"])
-                        test_result["message"] += f"，共 {model_count} 个模型"
-
-                        # 提取所有模型的 ID/名称
-                        model_names = []
-                        for model in models_data["data"]:
-                            if isinstance(model, dict) and "id" in model:
-                                model_names.append(model["id"])
-
-                        if model_names:
-                            test_result["available_models"] = model_names
-                except:
-                    pass
-            else:
-                test_result["status"] = "⚠️ 连接异常"
-                test_result["message"] = f"HTTP {response.status_code}: {response.text[:100]}"
-                test_result["response_time_ms"] = round(response_time, 2)
-
-    except httpx.TimeoutException:
-        test_result["status"] = "❌ 连接超时"
-        test_result["message"] = "请求超时（10秒），请检查网络连接或 API URL"
-    except httpx.RequestError as e:
-        test_result["status"] = "❌ 连接失败"
-        test_result["message"] = f"网络错误: {str(e)}"
+        # 复用共享连接池，仅对本次探测收紧超时
+        _, test_result = await probe_models(get_http_client(), api_url, api_key)
     except ValueError as e:
-        test_result["status"] = "❌ 配置错误"
-        test_result["message"] = str(e)
-    except Exception as e:
-        test_result["status"] = "❌ 测试失败"
-        test_result["message"] = f"未知错误: {str(e)}"
+        test_result = {
+            "status": "❌ 配置错误",
+            "message": str(e),
+            "response_time_ms": 0
+        }
 
     config_info["connection_test"] = test_result
+    config_info["search_cache"] = get_search_cache().stats()
+    config_info["page_store"] = get_page_store().stats()
+    config_info["prompt_profiles"] = {name: profile.stats() for name, profile in PROMPT_PROFILES.items()}
+    fetch_cache = get_fetch_cache()
+    try:
+        config_info["fetch_cache"] = await fetch_cache.astats() if fetch_cache else None
+    except Exception as e:
+        config_info["fetch_cache"] = {"error": str(e)}
+    config_info["rate_limiter"] = get_rate_limiter_stats()
+    config_info["circuit_breaker"] = get_circuit_breaker_stats()
+    try:
+        pool = get_endpoint_pool()
+    except ValueError:
+        pool = None
+    if pool is not None:
+        config_info["endpoints"] = pool.stats()
 
     return json.dumps(config_info, ensure_ascii=False, indent=2)
 
@@ -326,6 +718,88 @@ async def switch_model(model: str) -> str:
         return json.dumps(result, ensure_ascii=False, indent=2)
 
 
+@mcp.tool(
+    name="reload_config",
+    description="""
+    Reloads the server configuration from environment variables and ~/.config/grok-search/config.json
+    without restarting the server.
+
+    Settings are read once into an immutable snapshot; this tool builds a new snapshot, validates it
+    and swaps it in atomically. Each tool call is bound to the snapshot current when it started, so
+    requests already running keep the values they started with. The server also reloads on SIGHUP
+    and when config.json is modified.
+
+    Returns
+    -------
+    str
+        A JSON-encoded string containing:
+        - `status`: Success or error status
+        - `changes`: Changed settings as `{name: {old, new, restart_required}}` (API keys masked)
+        - `message`: Status message
+
+    Notes
+    -----
+    - Environment variables take precedence over keys of the same name in config.json
+    - Settings marked `restart_required` (connection pool, cache sizes, logging, ...) are read
+      when their component is created and take effect after a restart
+    - If the new configuration is invalid, the current configuration is kept
+    """
+)
+async def reload_config() -> str:
+    import json
+
+    try:
+        changes = _reload_config("reload_config tool")
+    except ValueError as e:
+        result = {
+            "status": "❌ 失败",
+            "message": f"配置无效，继续使用当前配置: {str(e)}"
+        }
+        return json.dumps(result, ensure_ascii=False, indent=2)
+
+    pending = [name for name, change in changes.items() if change["restart_required"]]
+    message = f"已重载配置，{len(changes)} 项变更" if changes else "配置未变化"
+    if pending:
+        message += f"；以下配置需重启后生效: {', '.join(pending)}"
+    result = {
+        "status": "✅ 成功",
+        "changes": changes,
+        "message": message
+    }
+    return json.dumps(result, ensure_ascii=False, indent=2)
+
+
+if hasattr(mcp, "custom_route"):
+    @mcp.custom_route("/metrics", methods=["GET"])
+    async def metrics_endpoint(request):
+        """HTTP / SSE 模式下供 Prometheus 抓取的指标端点"""
+        from starlette.responses import PlainTextResponse
+
+        return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@mcp.tool(
+    name="get_metrics",
+    description="""
+    Returns the server's performance metrics in Prometheus text format.
+
+    In HTTP/SSE mode the same data is served at GET /metrics for Prometheus to scrape; this tool
+    exposes it in stdio mode as well.
+
+    Metrics include:
+    - Tool calls: request counts by tool and status, latency histograms, in-flight calls
+    - Upstream requests: counts by status code, connect time, time to response headers,
+      time to first streamed token, total stream duration, response bytes, in-flight requests
+    - Upstream retries by cause (429, 5xx, timeout, protocol_error, network, failover)
+    - Cache hits, misses and hit ratio for the search cache, fetch cache and page store
+
+    Counters and histograms accumulate since the server process started.
+    """
+)
+async def get_metrics() -> str:
+    return render_metrics()
+
+
 @mcp.tool(
     name="toggle_builtin_tools",
     description="""
@@ -385,7 +859,7 @@ async def toggle_builtin_tools(action: str = "status") -> str:
 
 
 def main():
-    import signal
+    import inspect
     import os
     import threading
     import argparse
@@ -409,6 +883,7 @@ def main():
     # 信号处理（仅主线程）
     if threading.current_thread() is threading.main_thread():
         def handle_shutdown(signum, frame):
+            shutdown_logging()
             os._exit(0)
         signal.signal(signal.SIGINT, handle_shutdown)
         if sys.platform != 'win32':
@@ -416,7 +891,6 @@ def main():
 
     # Windows 父进程监控（仅 stdio 模式需要）
     if sys.platform == 'win32' and args.transport == "stdio":
-        import time
         import ctypes
         parent_pid = os.getppid()
 
@@ -435,6 +909,7 @@ def main():
         def monitor_parent():
             while True:
                 if not is_parent_alive(parent_pid):
+                    shutdown_logging()
                     os._exit(0)
                 time.sleep(2)
 
@@ -442,7 +917,11 @@ def main():
 
     try:
         if args.transport == "stdio":
-            mcp.run(transport="stdio")
+            # stdio 模式下横幅只会写入客户端不展示的 stderr，且可能触发版本检查请求，跳过以加快首次响应
+            run_kwargs = {}
+            if "show_banner" in inspect.signature(mcp.run).parameters:
+                run_kwargs["show_banner"] = False
+            mcp.run(transport="stdio", **run_kwargs)
         else:
             print(f"Starting {args.transport.upper()} server on {args.host}:{args.port}")
             mcp.run(transport=args.transport, host=args.host, port=args.port)
@@ -450,6 +929,7 @@ def main():
         pass
     finally:
         if args.transport == "stdio":
+            shutdown_logging()
             os._exit(0)
 
 
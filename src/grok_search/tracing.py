@@ -0,0 +1,89 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from .config import config
+from .logger import log_event
+
+
+class Trace:
+    """单次工具调用的耗时分解：按发生顺序记录各阶段的起止时间（相对调用开始的毫秒数）"""
+
+    __slots__ = ("tool", "started", "spans")
+
+    def __init__(self, tool: str):
+        self.tool = tool
+        self.started = time.monotonic()
+        self.spans: List[Dict[str, Any]] = []
+
+    def add(self, name: str, start: float, end: Optional[float] = None, **attrs) -> None:
+        end = time.monotonic() if end is None else end
+        entry = {
+            "name": name,
+            "start_ms": round((start - self.started) * 1000, 1),
+            "duration_ms": round((end - start) * 1000, 1),
+        }
+        entry.update((k, v) for k, v in attrs.items() if v is not None)
+        self.spans.append(entry)
+
+    @property
+    def elapsed_ms(self) -> float:
+        return round((time.monotonic() - self.started) * 1000, 1)
+
+    def to_dict(self) -> dict:
+        return {"tool": self.tool, "total_ms": self.elapsed_ms, "spans": sorted(self.spans, key=lambda s: s["start_ms"])}
+
+
+# 当前工具调用的 Trace；未开启追踪时为 None，span / record_span 均为空操作
+_current: ContextVar[Optional[Trace]] = ContextVar("grok_search_trace", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """记录代码块的耗时；产出的字典可在块内补充属性（如状态码），异常时记录异常类型"""
+    trace = _current.get()
+    if trace is None:
+        yield attrs
+        return
+    start = time.monotonic()
+    try:
+        yield attrs
+    except BaseException as exc:
+        attrs.setdefault("error", type(exc).__name__)
+        raise
+    finally:
+        trace.add(name, start, **attrs)
+
+
+def record_span(name: str, start: float, end: Optional[float] = None, **attrs) -> None:
+    """记录已测得起止时间（time.monotonic()）的阶段，如 TTFB、首个 token"""
+    trace = _current.get()
+    if trace is not None:
+        trace.add(name, start, end, **attrs)
+
+
+@contextmanager
+def tool_trace(tool: str, include_timing: bool = False):
+    """为工具调用开启追踪
+
+    include_timing 为真、GROK_DEBUG 开启或设置了 GROK_TRACE_SLOW_MS 时才记录；
+    调用结束后在调试模式下或耗时超过阈值时写入日志（带请求 ID）。产出 Trace 或 None。
+    """
+    slow_ms = config.trace_slow_ms
+    if not (include_timing or config.debug_enabled or slow_ms > 0):
+        yield None
+        return
+    trace = Trace(tool)
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+        elapsed_ms = trace.elapsed_ms
+        if config.debug_enabled or (slow_ms > 0 and elapsed_ms >= slow_ms):
+            log_event("trace", f"{tool} timing breakdown", tool=tool, elapsed_ms=elapsed_ms, spans=trace.to_dict()["spans"])
@@ -1,30 +1,72 @@
+import json
 from typing import List
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 from .providers.base import SearchResult
 
-
-def format_search_results(results: List[SearchResult]) -> str:
-    if not results:
-        return "No results found."
-
-    formatted = []
-    for i, result in enumerate(results, 1):
-        parts = [f"## Result {i}: {result.title}"]
-        
-        if result.url:
-            parts.append(f"**URL:** {result.url}")
-        
-        if result.snippet:
-            parts.append(f"**Summary:** {result.snippet}")
-        
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# 常见的追踪参数，不影响页面内容
+_TRACKING_PARAMS = frozenset({
+    "gclid", "dclid", "gbraid", "wbraid", "fbclid", "msclkid", "yclid", "igshid", "twclid",
+    "mc_cid", "mc_eid", "_hsenc", "_hsmi", "mkt_tok", "spm", "scm", "ref_src", "ref_url",
+})
+_TRACKING_PREFIXES = ("utm_",)
+
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in _TRACKING_PARAMS or name.startswith(_TRACKING_PREFIXES)
+
+
+def canonicalize_url(url: str) -> str:
+    """规范化 URL：小写协议与主机名，去掉默认端口、追踪参数与片段，补全空路径"""
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+        port = parts.port
+    except ValueError:
+        return url
+    if not parts.scheme or not parts.netloc:
+        return url
+
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if ":" in host:
+        host = f"[{host}]"
+    if port is not None and port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    if parts.username:
+        userinfo = parts.username + (f":{parts.password}" if parts.password else "")
+        host = f"{userinfo}@{host}"
+
+    query = parts.query
+    if query:
+        params = parse_qsl(query, keep_blank_values=True)
+        kept = [(k, v) for k, v in params if not _is_tracking_param(k)]
+        if len(kept) != len(params):
+            query = urlencode(kept)
+
+    # 单页应用的路由片段（#/path、#!/path）决定页面内容，需保留
+    fragment = parts.fragment if parts.fragment.startswith(("/", "!")) else ""
+    return urlunsplit((scheme, host, parts.path or "/", query, fragment))
+
+
+def search_results_to_dicts(results: List[SearchResult]) -> List[dict]:
+    """转换为 web_search 返回的结果对象，字段与 search_prompt 约定一致，空字段省略"""
+    items = []
+    for result in results:
+        item = {"title": result.title, "url": result.url, "description": result.snippet}
         if result.source:
-            parts.append(f"**Source:** {result.source}")
-        
+            item["source"] = result.source
         if result.published_date:
-            parts.append(f"**Published:** {result.published_date}")
-        
-        formatted.append("\n".join(parts))
+            item["published_date"] = result.published_date
+        items.append(item)
+    return items
+
 
-    return "\n\n---\n\n".join(formatted)
+def search_results_to_json(results: List[SearchResult]) -> str:
+    """序列化为紧凑的 JSON 数组"""
+    return json.dumps(search_results_to_dicts(results), ensure_ascii=False, separators=(",", ":"))
 
 fetch_prompt = """
 # Profile: Web Content Fetcher
@@ -0,0 +1,47 @@
+import argparse
+import sys
+import threading
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from grok_search.config import Config
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+from mock_upstream import MockUpstreamHandler  # noqa: E402
+
+_CONFIG_ENV = (
+    "GROK_API_URL", "GROK_API_KEY", "GROK_API_ENDPOINTS", "GROK_SEARCH_ROUTING", "GROK_SEARCH_PRIMARY_TIMEOUT",
+    "GROK_FETCH_MODE", "GROK_PROMPT_PROFILE", "GROK_LOG_LEVEL", "TAVILY_ENABLED", "TAVILY_API_KEY", "TAVILY_API_URL",
+)
+
+
+@pytest.fixture
+def fresh_config(tmp_path, monkeypatch):
+    """全局配置改为读取临时目录中的 config.json，测试结束后恢复原快照"""
+    for name in _CONFIG_ENV:
+        monkeypatch.delenv(name, raising=False)
+    cfg = Config()
+    monkeypatch.setattr(cfg, "_config_file", tmp_path / "config.json")
+    monkeypatch.setattr(cfg, "_snapshot", None)
+    monkeypatch.setattr(cfg, "_rejected_mtime", None)
+    return cfg
+
+
+@pytest.fixture(scope="session")
+def stub_server():
+    """在后台线程启动 benchmarks/mock_upstream.py 的桩服务，产出其地址"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockUpstreamHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def stub_url(stub_server):
+    """桩服务地址；每个测试开始时恢复默认模拟参数（无延迟）"""
+    MockUpstreamHandler.configure(argparse.Namespace(token_delay=0.0, tavily_delay=0.0))
+    return stub_server
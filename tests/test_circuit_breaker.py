@@ -0,0 +1,77 @@
+import asyncio
+
+import httpx
+import pytest
+
+from grok_search.providers.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+def make_breaker() -> CircuitBreaker:
+    return CircuitBreaker("https://api.example", failure_rate=0.5, min_requests=4, window=60.0, open_seconds=30.0)
+
+
+def status_error(status: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://api.example/chat/completions")
+    return httpx.HTTPStatusError(f"HTTP {status}", request=request, response=httpx.Response(status, request=request))
+
+
+def half_open(breaker: CircuitBreaker) -> None:
+    breaker._open()
+    breaker._opened_at -= breaker.open_seconds
+    breaker.before_request()
+    assert breaker.state == HALF_OPEN
+
+
+def test_opens_when_failure_rate_reaches_threshold():
+    breaker = make_breaker()
+    breaker.record_success()
+    breaker.record_exception(httpx.ConnectError("refused"))
+    breaker.record_exception(status_error(503))
+    assert breaker.state == CLOSED
+    breaker.record_exception(httpx.ReadTimeout("slow"))
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    assert not breaker.is_available()
+
+
+def test_client_errors_and_429_count_as_success():
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record_exception(status_error(429))
+        breaker.record_exception(status_error(400))
+    assert breaker.state == CLOSED
+
+
+def test_half_open_after_cooldown_admits_single_probe():
+    breaker = make_breaker()
+    breaker._open()
+    assert not breaker.is_available()
+    breaker._opened_at -= breaker.open_seconds
+    assert breaker.is_available()
+    breaker.before_request()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.is_available()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+
+
+def test_probe_success_closes_and_failure_reopens():
+    breaker = make_breaker()
+    half_open(breaker)
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+    half_open(breaker)
+    breaker.record_exception(httpx.ConnectError("refused"))
+    assert breaker.state == OPEN
+    assert breaker.opened_total == 3
+
+
+def test_cancelled_probe_releases_slot():
+    breaker = make_breaker()
+    half_open(breaker)
+    breaker.record_exception(asyncio.CancelledError())
+    assert breaker.state == HALF_OPEN
+    assert breaker.is_available()
+    breaker.before_request()
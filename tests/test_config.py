@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from grok_search.config import ConfigSnapshot
+
+
+@pytest.mark.parametrize("name, value", [
+    ("GROK_API_ENDPOINTS", "[not json"),
+    ("GROK_API_ENDPOINTS", "https://a.example|key|heavy"),
+    ("GROK_SEARCH_ROUTING", "round_robin"),
+    ("GROK_FETCH_MODE", "remote"),
+    ("GROK_PROMPT_PROFILE", "tiny"),
+    ("GROK_LOG_LEVEL", "verbose"),
+])
+def test_reload_rejects_invalid_value_and_keeps_snapshot(fresh_config, monkeypatch, name, value):
+    old = fresh_config.snapshot
+    monkeypatch.setenv(name, value)
+    with pytest.raises(ValueError, match=name):
+        fresh_config.reload()
+    assert fresh_config.snapshot is old
+
+
+def test_initial_load_records_errors_for_diagnosis(fresh_config, monkeypatch):
+    monkeypatch.setenv("GROK_FETCH_MODE", "remote")
+    monkeypatch.setenv("GROK_SEARCH_ROUTING", "round_robin")
+    assert len(fresh_config.snapshot.errors) == 2
+    assert "GROK_FETCH_MODE" in fresh_config.get_config_info()["config_status"]
+
+
+def test_strict_load_reports_every_error():
+    environ = {"GROK_FETCH_MODE": "remote", "GROK_PROMPT_PROFILE": "tiny"}
+    with pytest.raises(ValueError) as excinfo:
+        ConfigSnapshot.load(environ, {}, None)
+    assert "GROK_FETCH_MODE" in str(excinfo.value) and "GROK_PROMPT_PROFILE" in str(excinfo.value)
+
+
+def test_valid_reload_swaps_snapshot(fresh_config, monkeypatch):
+    assert fresh_config.prompt_profile == "full"
+    monkeypatch.setenv("GROK_PROMPT_PROFILE", "Auto")
+    changes = fresh_config.reload()
+    assert changes["GROK_PROMPT_PROFILE"]["new"] == "auto"
+    assert fresh_config.prompt_profile == "auto"
+
+
+def test_bound_snapshot_survives_reload_in_other_request(fresh_config, monkeypatch):
+    async def request(started, reloaded):
+        with fresh_config.bind_snapshot():
+            started.set()
+            await reloaded.wait()
+            return fresh_config.fetch_mode
+
+    async def main():
+        started, reloaded = asyncio.Event(), asyncio.Event()
+        task = asyncio.create_task(request(started, reloaded))
+        await started.wait()
+        monkeypatch.setenv("GROK_FETCH_MODE", "local")
+        fresh_config.reload()
+        reloaded.set()
+        return await task
+
+    assert asyncio.run(main()) == "auto"
+    assert fresh_config.fetch_mode == "local"
+
+
+def test_reload_inside_bound_request_sees_new_values(fresh_config, monkeypatch):
+    with fresh_config.bind_snapshot():
+        monkeypatch.setenv("GROK_FETCH_MODE", "grok")
+        fresh_config.reload()
+        assert fresh_config.fetch_mode == "grok"
@@ -0,0 +1,60 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from grok_search.providers.endpoint_pool import Endpoint, EndpointPool
+
+
+def status_error(status: int, headers: dict = None) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://a.example/chat/completions")
+    response = httpx.Response(status, headers=headers, request=request)
+    return httpx.HTTPStatusError(f"HTTP {status}", request=request, response=response)
+
+
+def check_health(pool: EndpointPool, status: int = 200) -> None:
+    transport = httpx.MockTransport(lambda request: httpx.Response(status, json={"data": []}))
+
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            await pool.check_health(client)
+
+    asyncio.run(run())
+
+
+@pytest.fixture
+def pool():
+    return EndpointPool([Endpoint("https://a.example", "key-a"), Endpoint("https://b.example", "key-b")], eject_seconds=30.0)
+
+
+def test_healthy_probe_restores_endpoint_ejected_for_errors(pool):
+    endpoint = pool.endpoints[0]
+    assert pool.report_exception(endpoint, status_error(503))
+    assert not endpoint.available(time.monotonic())
+    check_health(pool)
+    assert endpoint.available(time.monotonic())
+    assert endpoint.last_error == ""
+
+
+def test_healthy_probe_keeps_retry_after_ejection(pool):
+    endpoint = pool.endpoints[0]
+    assert pool.report_exception(endpoint, status_error(429, {"Retry-After": "120"}))
+    assert endpoint.ejected_until - time.monotonic() > 100
+    check_health(pool)
+    assert not endpoint.available(time.monotonic())
+    assert endpoint.last_error == "HTTP 429"
+    assert pool.select() is pool.endpoints[1]
+
+
+def test_failed_probe_does_not_shorten_ejection(pool):
+    endpoint = pool.endpoints[0]
+    pool.report_exception(endpoint, status_error(429, {"Retry-After": "120"}))
+    until = endpoint.ejected_until
+    check_health(pool, status=500)
+    assert endpoint.ejected_until == until
+
+
+def test_non_ejecting_status_is_ignored(pool):
+    assert not pool.report_exception(pool.endpoints[0], status_error(400))
+    assert pool.endpoints[0].available(time.monotonic())
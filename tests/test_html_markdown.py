@@ -0,0 +1,96 @@
+import asyncio
+
+import httpx
+import pytest
+
+from grok_search.html_markdown import HTMLToMarkdown, html_to_markdown
+from grok_search.local_fetch import LocalFetcher, _detect_charset
+
+
+def test_headings_and_paragraphs():
+    html = "<h1>Title</h1><p>Intro  text</p><h3> Sub <em>part</em> </h3><p>Body</p>"
+    assert html_to_markdown(html) == "# Title\n\nIntro text\n\n### Sub *part*\n\nBody\n"
+
+
+def test_table_with_header_pipes_and_colspan():
+    html = (
+        "<table><thead><tr><th>A</th><th>B</th><th>C</th></tr></thead>"
+        "<tr><td>1</td><td>x|y</td><td>line<br>two</td></tr>"
+        "<tr><td colspan=2>wide</td><td>3</td></tr></table>"
+    )
+    assert html_to_markdown(html) == (
+        "| A | B | C |\n|---|---|---|\n| 1 | x\\|y | line<br>two |\n| wide |  | 3 |\n"
+    )
+
+
+def test_nested_table_is_flattened_into_cell():
+    html = "<table><tr><td><table><tr><td>in</td><td>x</td></tr><tr><td>2</td></tr></table></td><td>c2</td></tr></table>"
+    assert html_to_markdown(html) == "| in x<br>2 | c2 |\n|---|---|\n"
+
+
+def test_code_block_keeps_language_and_whitespace():
+    html = '<pre><code class="language-python">def f():\n    return "```"\n</code></pre><p>x <code>a`b</code></p>'
+    assert html_to_markdown(html) == '````python\ndef f():\n    return "```"\n````\n\nx `` a`b ``\n'
+
+
+def test_nested_and_ordered_lists():
+    html = '<ol start="3"><li>x</li><li>y<ul><li>z</li></ul></li></ol><p>after</p>'
+    assert html_to_markdown(html) == "3. x\n4. y\n   - z\n\nafter\n"
+
+
+def test_list_item_paragraphs_stay_indented():
+    html = "<ul><li><p>a</p><p>b <strong>bold</strong></p></li><li>c<ul><li><p>d</p><p><em>e</em></p></li></ul></li></ul>"
+    assert html_to_markdown(html) == "- a\n  b **bold**\n- c\n  - d\n    *e*\n"
+
+
+def test_links_and_images_resolve_relative_urls():
+    html = (
+        '<p><a href="/x" title="X">link</a> <a href="javascript:void(0)">js</a> '
+        '<img data-src="lazy.png" src="placeholder.gif" alt="pic"></p>'
+    )
+    assert html_to_markdown(html, "https://e.com/d/") == '[link](https://e.com/x "X") js ![pic](https://e.com/d/lazy.png)\n'
+
+
+def test_script_style_and_skip_tags_are_removed():
+    converter = HTMLToMarkdown()
+    converter.feed("<p>a<script>bad()</script><style>.x{}</style> b</p><noscript>enable js</noscript><p>c</p>")
+    assert converter.close() == "a b\n\nc\n"
+    assert converter.script_count == 1
+
+
+@pytest.mark.parametrize("tag", ["<embed src=\"movie.swf\">", "<embed src=\"movie.swf\"/>", "<svg/>", "<iframe src=\"x\" />"])
+def test_void_and_self_closing_skip_tags_do_not_swallow_content(tag):
+    html = f"<p>before</p>{tag}<p>after all the content</p><h2>More</h2>"
+    assert html_to_markdown(html) == "before\n\nafter all the content\n\n## More\n"
+
+
+def test_metadata_is_collected():
+    converter = HTMLToMarkdown()
+    converter.feed('<html lang="zh"><head><title> Page </title><meta name="description" content="Desc"></head><body>x</body></html>')
+    converter.close()
+    assert (converter.title, converter.lang, converter.meta) == ("Page", "zh", {"description": "Desc"})
+
+
+@pytest.mark.parametrize("content_type, head, expected", [
+    ("text/html; charset=GBK", b"", "gbk"),
+    ("text/html", b'<meta charset="shift_jis">', "shift_jis"),
+    ("text/html", b"\xef\xbb\xbf<p>", "utf-8-sig"),
+    ("text/html; charset=bogus", b"", "utf-8"),
+])
+def test_detect_charset(content_type, head, expected):
+    assert _detect_charset(content_type, head) == expected
+
+
+def test_read_body_decodes_meta_charset_across_chunks():
+    html = '<html><head><meta charset="gb2312"></head><body>' + "中文内容" * 2000 + "</body></html>"
+    body = html.encode("gb2312")
+
+    async def chunks():
+        for i in range(0, len(body), 1000):
+            yield body[i:i + 1000]
+
+    response = httpx.Response(200, content=chunks())
+    parts = []
+    truncated = asyncio.run(LocalFetcher._read_body(response, "text/html", parts.append))
+    assert not truncated
+    assert "".join(parts) == html
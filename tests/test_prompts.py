@@ -0,0 +1,31 @@
+import pytest
+
+from grok_search.prompts import AUTO_PROFILE, PROMPT_PROFILES, get_prompt_profile, normalize_prompt_profile
+from grok_search.providers.grok import GrokSearchProvider
+
+
+@pytest.mark.parametrize("profile", PROMPT_PROFILES.values(), ids=PROMPT_PROFILES.keys())
+def test_system_prompts_within_token_budget(profile):
+    stats = profile.stats()
+    assert stats["search_tokens"] <= profile.token_budget
+    assert stats["fetch_tokens"] <= profile.token_budget
+
+
+def test_budgets_shrink_with_profile():
+    budgets = [PROMPT_PROFILES[name].token_budget for name in ("full", "compact", "minimal")]
+    assert budgets == sorted(budgets, reverse=True)
+
+
+@pytest.mark.parametrize("profile", PROMPT_PROFILES.values(), ids=PROMPT_PROFILES.keys())
+def test_system_prompt_is_a_stable_prefix(profile):
+    provider = GrokSearchProvider("https://api.example.com/v1", "key", "grok-4-fast")
+    first = provider.build_search_payload("python asyncio", "", 3, 10, profile)
+    second = provider.build_search_payload("latest news today", "x.com", 1, 5, profile)
+    assert first["messages"][0] == second["messages"][0] == {"role": "system", "content": profile.search}
+
+
+def test_auto_profile_uses_suggestion():
+    assert normalize_prompt_profile(" Auto ") == AUTO_PROFILE
+    assert get_prompt_profile(AUTO_PROFILE, "minimal") is PROMPT_PROFILES["minimal"]
+    with pytest.raises(ValueError):
+        normalize_prompt_profile("tiny")
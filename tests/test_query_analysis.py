@@ -0,0 +1,46 @@
+import pytest
+
+from grok_search.prompts import PROMPT_PROFILES
+from grok_search.providers.grok import GrokSearchProvider
+from grok_search.query_analysis import analyze_query
+
+
+@pytest.mark.parametrize("query", [
+    "latest-news on python",
+    "python release this-week",
+    "real-time stock prices",
+    "up-to-date rust roadmap",
+    "今天的新闻",
+    "最新 Python 版本",
+])
+def test_time_sensitive_queries(query):
+    assert analyze_query(query).time_sensitive
+
+
+@pytest.mark.parametrize("query", ["what do you know about asyncio", "snowflake schema", "pre-trained models"])
+def test_time_keywords_match_whole_words_only(query):
+    assert not analyze_query(query).time_sensitive
+
+
+def test_platforms_and_language():
+    analysis = analyze_query("GitHub 和 知乎 上的 asyncio 教程 on stack overflow")
+    assert set(analysis.platforms) == {"GitHub", "知乎", "Stack Overflow"}
+    assert analysis.language == "mixed"
+
+
+@pytest.mark.parametrize("query, complexity", [
+    ("asyncio gather", "simple"),
+    ("how does asyncio gather handle exceptions", "moderate"),
+    ("fastapi vs flask", "complex"),
+    ("why is it slow? how to fix it?", "complex"),
+])
+def test_complexity(query, complexity):
+    assert analyze_query(query).complexity == complexity
+
+
+def test_detected_platforms_are_not_injected_into_prompt():
+    provider = GrokSearchProvider("https://api.example.com/v1", "key", "grok-4-fast")
+    payload = provider.build_search_payload("asyncio issues on github", "", 3, 10, PROMPT_PROFILES["full"])
+    assert "focus on these platform" not in payload["messages"][-1]["content"]
+    payload = provider.build_search_payload("asyncio issues", "reddit.com", 3, 10, PROMPT_PROFILES["full"])
+    assert "focus on these platform: reddit.com" in payload["messages"][-1]["content"]
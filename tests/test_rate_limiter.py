@@ -0,0 +1,111 @@
+import argparse
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from grok_search.providers.rate_limiter import AdaptiveRateLimiter, _limiters, get_rate_limiter
+from grok_search.providers.upstream import upstream_request
+from mock_upstream import MockUpstreamHandler
+
+
+def make_limiter(**kwargs) -> AdaptiveRateLimiter:
+    options = dict(initial_rate=10.0, min_rate=1.0, max_rate=20.0, burst=1)
+    options.update(kwargs)
+    return AdaptiveRateLimiter(**options)
+
+
+def test_throttle_halves_rate_once_per_cooldown_window():
+    limiter = make_limiter()
+    limiter.on_throttle()
+    limiter.on_throttle()
+    assert limiter.rate == 5.0
+    assert limiter.throttled == 2
+    limiter._last_decrease -= 1.0
+    limiter.on_throttle()
+    assert limiter.rate == 2.5
+
+
+def test_rate_stays_within_bounds():
+    limiter = make_limiter(initial_rate=1.5)
+    limiter.on_throttle()
+    assert limiter.rate == 1.0
+    for _ in range(100):
+        limiter.on_success()
+    assert limiter.rate == 20.0
+
+
+def test_success_recovers_rate_additively():
+    limiter = make_limiter()
+    limiter.on_throttle()
+    limiter.on_success()
+    limiter.on_success()
+    assert limiter.rate == 6.0
+
+
+def test_retry_after_pauses_the_bucket():
+    limiter = make_limiter(burst=5)
+    limiter.on_throttle(retry_after=0.2)
+
+    async def main():
+        start = time.monotonic()
+        await limiter.acquire()
+        return time.monotonic() - start
+
+    assert asyncio.run(main()) >= 0.19
+
+
+def test_cancelled_waiter_refunds_its_slot():
+    limiter = make_limiter(initial_rate=1.0)
+
+    async def main():
+        await limiter.acquire()
+        reserved = limiter._next_slot
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        assert limiter._next_slot == pytest.approx(reserved + 1.0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert limiter._next_slot == pytest.approx(reserved)
+        assert limiter.queue_depth == 0
+
+    asyncio.run(main())
+
+
+def test_waiter_requeued_by_retry_after_does_not_leak_slot():
+    limiter = make_limiter(initial_rate=20.0)
+
+    async def main():
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        limiter.on_throttle(retry_after=0.1)
+        await waiter
+        # 重新排队后只占用 Retry-After 之后的一个时间槽
+        return limiter._next_slot - limiter._blocked_until
+
+    assert asyncio.run(main()) == pytest.approx(1.0 / limiter.rate)
+
+
+@pytest.fixture
+def throttling_stub(fresh_config, monkeypatch, stub_url):
+    MockUpstreamHandler.configure(argparse.Namespace(error_rate=1.0, error_status="429", retry_after=0))
+    monkeypatch.setenv("GROK_RATE_LIMIT_MAX_REQUEUES", "2")
+    monkeypatch.setenv("GROK_BREAKER_ENABLED", "false")
+    yield stub_url
+    _limiters.pop(stub_url, None)
+
+
+def test_requeues_on_429_up_to_cap(throttling_stub):
+    async def main():
+        async with httpx.AsyncClient() as client:
+            async with upstream_request(client, "test", throttling_stub, f"{throttling_stub}/search", {}, {}):
+                pass
+
+    with pytest.raises(httpx.HTTPStatusError) as excinfo:
+        asyncio.run(main())
+    assert excinfo.value.response.status_code == 429
+    assert MockUpstreamHandler.stats.snapshot()["requests"] == 3
+    assert get_rate_limiter(throttling_stub).throttled == 3
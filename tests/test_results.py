@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from grok_search.providers.json_stream import IncrementalJSONArrayParser
+from grok_search.providers.results import SearchResultCollector, SearchResultParseError, parse_search_results
+
+RESULTS = [
+    {"title": "a", "url": "https://a.com"},
+    {"title": "b", "url": "https://b.com/page"},
+]
+PROSE_THEN_JSON = 'See [1] for details. [{"title":"a","url":"https://a.com"}]'
+
+
+def feed_chunks(text: str, size: int) -> list:
+    parser = IncrementalJSONArrayParser()
+    for i in range(0, len(text), size):
+        parser.feed(text[i:i + size])
+    return parser.items
+
+
+def test_skips_bracketed_prose_before_array():
+    results = parse_search_results(PROSE_THEN_JSON)
+    assert [r.url for r in results] == ["https://a.com/"]
+
+
+def test_skips_markdown_links_and_empty_arrays():
+    content = "Sources [here](https://x.com) and [] below:\n" + json.dumps(RESULTS)
+    assert [r.title for r in parse_search_results(content)] == ["a", "b"]
+
+
+def test_restarts_after_array_without_objects():
+    content = 'Options: [{not json}] then ' + json.dumps(RESULTS)
+    assert len(parse_search_results(content)) == 2
+
+
+@pytest.mark.parametrize("size", [1, 2, 7])
+def test_stream_chunks_split_array_start(size):
+    assert feed_chunks(PROSE_THEN_JSON, size) == [RESULTS[0]]
+
+
+def test_fenced_and_wrapped_output():
+    fenced = "Here you go:\n```json\n" + json.dumps(RESULTS) + "\n```"
+    wrapped = json.dumps({"results": RESULTS})
+    assert len(parse_search_results(fenced)) == 2
+    assert len(parse_search_results(wrapped)) == 2
+
+
+def test_explicit_empty_array_returns_no_results():
+    assert parse_search_results("[]") == []
+
+
+@pytest.mark.parametrize("content", ["I could not find anything relevant. See [1].", "", "[1, 2, 3]"])
+def test_unparseable_output_raises_with_raw_content(content):
+    with pytest.raises(SearchResultParseError) as excinfo:
+        parse_search_results(content)
+    assert excinfo.value.content == content
+
+
+def test_collector_stops_early_after_bracketed_prose():
+    collector = SearchResultCollector(max_results=1)
+    chunks = ["See [", "1] for details. [", '{"title":"a","url":"https://a.com"},', '{"title":"b"']
+    enough = [collector.feed(chunk) for chunk in chunks]
+    assert enough == [False, False, True, True]
+    assert collector.items == [RESULTS[0]]
+
+
+def test_collector_ignores_prose_only_output():
+    collector = SearchResultCollector(max_results=1)
+    assert not collector.feed("No results [1] were found.")
+    assert collector.items == []
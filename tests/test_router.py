@@ -0,0 +1,130 @@
+import argparse
+import asyncio
+
+import pytest
+
+from grok_search import server
+from grok_search.providers.base import BaseSearchProvider, SearchResult
+from grok_search.providers.circuit_breaker import CircuitOpenError, _breakers, get_circuit_breaker
+from grok_search.providers.grok import GrokSearchProvider
+from grok_search.providers.results import SearchResultParseError
+from grok_search.providers.router import FallbackSearchProvider
+from grok_search.providers.tavily import TavilySearchProvider
+from mock_upstream import MockUpstreamHandler
+
+
+class StubProvider(BaseSearchProvider):
+    """按设定返回结果、抛出异常或延迟的 Provider"""
+
+    def __init__(self, results=(), error=None, delay=0.0):
+        super().__init__("stub://", "")
+        self.results = list(results)
+        self.error = error
+        self.delay = delay
+        self.calls = 0
+
+    def get_provider_name(self) -> str:
+        return "Stub"
+
+    async def search(self, query, platform="", min_results=3, max_results=10, ctx=None, bypass_cache=False, prompt_profile=""):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.results
+
+
+def search(provider, query="python asyncio", max_results=5):
+    return asyncio.run(provider.search(query, "", 1, max_results, bypass_cache=True))
+
+
+@pytest.fixture
+def routed_config(fresh_config, monkeypatch, stub_url):
+    monkeypatch.setenv("GROK_API_URL", stub_url)
+    monkeypatch.setenv("GROK_API_KEY", "sk-test-12345678")
+    monkeypatch.setenv("TAVILY_ENABLED", "true")
+    monkeypatch.setenv("TAVILY_API_URL", stub_url)
+    monkeypatch.setenv("TAVILY_API_KEY", "tvly-test-12345678")
+    return fresh_config
+
+
+def test_tavily_search_against_stub(stub_url):
+    results = search(TavilySearchProvider(stub_url, "tvly-test"), max_results=3)
+    assert [r.title for r in results] == [f"Result {i} for python asyncio" for i in range(3)]
+    assert results[0].snippet == "Snippet 0 about python asyncio"
+    assert results[0].url == "https://example.com/0"
+
+
+@pytest.mark.parametrize("routing, primary, fallback", [
+    ("grok", GrokSearchProvider, None),
+    ("tavily", TavilySearchProvider, None),
+    ("grok_first", GrokSearchProvider, TavilySearchProvider),
+    ("tavily_first", TavilySearchProvider, GrokSearchProvider),
+])
+def test_routing_modes(routed_config, monkeypatch, routing, primary, fallback):
+    monkeypatch.setenv("GROK_SEARCH_ROUTING", routing)
+    provider = server._get_search_provider()
+    if fallback is None:
+        assert isinstance(provider, primary)
+    else:
+        assert isinstance(provider, FallbackSearchProvider)
+        assert (type(provider.primary), type(provider.fallback)) == (primary, fallback)
+    assert search(provider)
+
+
+def test_routing_ignores_tavily_when_disabled(routed_config, monkeypatch):
+    monkeypatch.setenv("TAVILY_ENABLED", "false")
+    monkeypatch.setenv("GROK_SEARCH_ROUTING", "tavily")
+    assert isinstance(server._get_search_provider(), GrokSearchProvider)
+
+
+def test_missing_tavily_key_uses_grok_only(routed_config, monkeypatch):
+    monkeypatch.delenv("TAVILY_API_KEY")
+    monkeypatch.setenv("GROK_SEARCH_ROUTING", "tavily_first")
+    warned = server._warn_missing_tavily_key.cache_info().misses
+    provider = server._get_search_provider()
+    assert isinstance(provider, GrokSearchProvider)
+    assert server._warn_missing_tavily_key.cache_info().misses == warned + 1
+    assert search(provider)
+
+
+def test_falls_back_to_tavily_when_grok_times_out(stub_url):
+    MockUpstreamHandler.configure(argparse.Namespace(token_delay=0.0, tavily_delay=0.0, ttfb=1.0))
+    grok = GrokSearchProvider(stub_url, "sk-test", "grok-4-fast")
+    provider = FallbackSearchProvider(grok, TavilySearchProvider(stub_url, "tvly-test"), primary_timeout=0.2)
+    results = search(provider)
+    assert results and results[0].title == "Result 0 for python asyncio"
+
+
+def test_falls_back_to_tavily_when_grok_circuit_is_open(stub_url):
+    breaker = get_circuit_breaker(stub_url)
+    breaker._open()
+    try:
+        grok = GrokSearchProvider(stub_url, "sk-test", "grok-4-fast")
+        with pytest.raises(CircuitOpenError):
+            search(grok)
+        # 同一桩服务换用主机名，Tavily 使用另一个熔断器
+        tavily_url = stub_url.replace("127.0.0.1", "localhost")
+        provider = FallbackSearchProvider(grok, TavilySearchProvider(tavily_url, "tvly-test"))
+        assert search(provider)
+    finally:
+        _breakers.pop(stub_url, None)
+
+
+@pytest.mark.parametrize("primary", [
+    StubProvider(results=[]),
+    StubProvider(error=RuntimeError("upstream broke")),
+    StubProvider(error=SearchResultParseError("I could not find anything.")),
+], ids=["empty", "error", "unparseable"])
+def test_falls_back_on_empty_results_or_error(primary):
+    fallback = StubProvider(results=[SearchResult("t", "https://t.example", "s")])
+    results = search(FallbackSearchProvider(primary, fallback))
+    assert [r.url for r in results] == ["https://t.example"]
+    assert (primary.calls, fallback.calls) == (1, 1)
+
+
+def test_primary_results_skip_fallback():
+    primary = StubProvider(results=[SearchResult("p", "https://p.example", "s")])
+    fallback = StubProvider(results=[SearchResult("t", "https://t.example", "s")])
+    assert search(FallbackSearchProvider(primary, fallback, primary_timeout=1.0))[0].url == "https://p.example"
+    assert fallback.calls == 0
@@ -0,0 +1,79 @@
+import asyncio
+import json
+
+import pytest
+
+from grok_search import server
+from grok_search.providers.base import BaseSearchProvider, SearchResult
+from grok_search.providers.results import SearchResultParseError
+
+RAW_OUTPUT = "I could not find anything relevant. See [1]."
+
+
+class ScriptedProvider(BaseSearchProvider):
+    """按查询返回预设结果或抛出预设异常"""
+
+    def __init__(self, outcomes: dict):
+        super().__init__("stub://", "")
+        self.outcomes = outcomes
+
+    def get_provider_name(self) -> str:
+        return "Scripted"
+
+    async def search(self, query, platform="", min_results=3, max_results=10, ctx=None, bypass_cache=False, prompt_profile=""):
+        outcome = self.outcomes[query]
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def provider(fresh_config, monkeypatch):
+    provider = ScriptedProvider({
+        "ok": [SearchResult("a", "https://a.example/", "s")],
+        "prose": SearchResultParseError(RAW_OUTPUT),
+        "empty": SearchResultParseError(""),
+        "broken": RuntimeError("upstream broke"),
+    })
+    monkeypatch.setattr(server, "_get_search_provider", lambda: provider)
+    return provider
+
+
+def test_web_search_returns_raw_output_when_unparseable(provider):
+    assert asyncio.run(server.web_search("prose")) == RAW_OUTPUT
+    assert asyncio.run(server.web_search("empty")).startswith("搜索失败")
+
+
+def test_web_search_many_keeps_raw_output_like_web_search(provider):
+    entries = json.loads(asyncio.run(server.web_search_many(["ok", "prose", "empty", "broken"])))
+    assert [e["status"] for e in entries] == ["ok", "raw", "error", "error"]
+    assert entries[0]["results"][0]["url"] == "https://a.example/"
+    assert entries[1]["content"] == RAW_OUTPUT
+    assert entries[2]["error"].startswith("搜索失败")
+    assert entries[3]["error"] == "RuntimeError: upstream broke"
+
+
+class RecordingContext:
+    """记录发送给客户端的日志消息"""
+
+    def __init__(self):
+        self.messages = []
+
+    async def info(self, message):
+        self.messages.append(("info", message))
+
+    async def error(self, message):
+        self.messages.append(("error", message))
+
+
+@pytest.mark.parametrize("call", [
+    lambda ctx: server.web_search("q", ctx=ctx),
+    lambda ctx: server.web_search_many(["q"], ctx=ctx),
+    lambda ctx: server.web_fetch("https://example.com/", mode="grok", ctx=ctx),
+    lambda ctx: server.web_fetch_many(["https://example.com/"], mode="grok", ctx=ctx),
+], ids=["web_search", "web_search_many", "web_fetch", "web_fetch_many"])
+def test_config_error_is_logged_to_client(fresh_config, call):
+    ctx = RecordingContext()
+    assert asyncio.run(call(ctx)).startswith("配置错误")
+    errors = [message for level, message in ctx.messages if level == "error"]
+    assert len(errors) == 1 and "Grok API URL 未配置" in errors[0]
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from grok_search.singleflight import SingleFlight
+
+
+class Upstream:
+    """可控的上游调用：记录调用次数，等待 release 后返回结果或抛出异常"""
+
+    def __init__(self, result="value", error=None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.cancelled = False
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def test_concurrent_calls_share_one_upstream_call_and_key_is_removed():
+    async def main():
+        flight, upstream = SingleFlight(), Upstream()
+        waiters = [asyncio.create_task(flight.do("k", upstream)) for _ in range(5)]
+        await asyncio.sleep(0)
+        assert len(flight) == 1
+        upstream.release.set()
+        assert await asyncio.gather(*waiters) == ["value"] * 5
+        assert upstream.calls == 1
+        assert len(flight) == 0
+
+    asyncio.run(main())
+
+
+def test_leaving_waiter_does_not_cancel_shared_task():
+    async def main():
+        flight, upstream = SingleFlight(), Upstream()
+        leaving = asyncio.create_task(flight.do("k", upstream))
+        staying = asyncio.create_task(flight.do("k", upstream))
+        await asyncio.sleep(0)
+        leaving.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leaving
+        assert not upstream.cancelled
+        upstream.release.set()
+        assert await staying == "value"
+        assert upstream.calls == 1
+
+    asyncio.run(main())
+
+
+def test_last_waiter_leaving_cancels_task_and_forgets_key():
+    async def main():
+        flight, upstream = SingleFlight(), Upstream()
+        waiter = asyncio.create_task(flight.do("k", upstream))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.sleep(0)
+        assert upstream.cancelled
+        assert len(flight) == 0
+
+    asyncio.run(main())
+
+
+def test_failure_is_delivered_to_every_waiter_and_not_reused():
+    async def main():
+        flight, failing = SingleFlight(), Upstream(error=RuntimeError("upstream broke"))
+        waiters = [asyncio.create_task(flight.do("k", failing)) for _ in range(3)]
+        await asyncio.sleep(0)
+        failing.release.set()
+        outcomes = await asyncio.gather(*waiters, return_exceptions=True)
+        assert all(isinstance(e, RuntimeError) and str(e) == "upstream broke" for e in outcomes)
+        assert failing.calls == 1
+        assert len(flight) == 0
+
+        retry = Upstream(result="recovered")
+        retry.release.set()
+        assert await flight.do("k", retry) == "recovered"
+        assert retry.calls == 1
+
+    asyncio.run(main())
+
+
+def test_different_keys_run_independently():
+    async def main():
+        flight, a, b = SingleFlight(), Upstream("a"), Upstream("b")
+        first = asyncio.create_task(flight.do("a", a))
+        second = asyncio.create_task(flight.do("b", b))
+        await asyncio.sleep(0)
+        assert len(flight) == 2
+        a.release.set()
+        b.release.set()
+        assert await asyncio.gather(first, second) == ["a", "b"]
+
+    asyncio.run(main())